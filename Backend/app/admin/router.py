@@ -9,6 +9,11 @@ from app.models.courses import Course, Module, ContentBlock
 from app.schemas.users import UserResponse
 from app.dependencies import get_current_user
 from app.notifications.service import create_notification
+from app.services.course_cards import refresh_course_card
+from app.core.cache import invalidate_course, invalidate_catalog
+from app.services.platform_stats import bump_platform_stats, refresh_platform_stats
+from app.services.related_courses import refresh_related_for_course
+from app.courses.recommendations import invalidate_published_recommendations, recommendation_cache_stats
 
 router = APIRouter()
 
@@ -97,6 +102,8 @@ async def approve_seller_request(
     user = db.query(User).filter(User.id == request.user_id).first()
 
     if status == "approved" and user:
+        if str(user.role) != UserRole.seller.value:
+            bump_platform_stats(db, total_instructors=1)
         user.role = UserRole.seller.value
 
     db.commit()
@@ -220,6 +227,7 @@ def review_course(
     if not course:
         raise HTTPException(status_code=404, detail="Curso no encontrado")
 
+    was_published = course.status == "publicado"
     if action == "approve":
         course.status = "publicado"
     elif action == "reject":
@@ -227,7 +235,16 @@ def review_course(
     else:
         raise HTTPException(status_code=400, detail="Action debe ser 'approve' o 'reject'")
 
+    is_published = course.status == "publicado"
+    bump_platform_stats(db, total_courses=int(is_published) - int(was_published))
+    if is_published or was_published:
+        refresh_related_for_course(db, course.id)
+
+    refresh_course_card(db, course.id)
     db.commit()
+    invalidate_course(course.id)
+    if is_published != was_published:
+        invalidate_published_recommendations()
 
     if action == "approve":
         create_notification(
@@ -264,3 +281,20 @@ def verify_seller(
     db.commit()
 
     return {"message": "Seller verificado"}
+
+
+@router.post("/platform-stats/refresh")
+def refresh_platform_stats_now(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(admin_required),
+):
+    """Recalcula ya la instantánea de /courses/platform-stats."""
+    stats = refresh_platform_stats(db)
+    invalidate_catalog()
+    return stats
+
+
+@router.get("/recommendations/cache-stats")
+def get_recommendation_cache_stats(current_user: User = Depends(admin_required)):
+    """Aciertos/fallos de la caché de recomendaciones (usuarios y anónimos)."""
+    return recommendation_cache_stats()
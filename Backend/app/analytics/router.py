@@ -1,20 +1,25 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func as sa_func
+from sqlalchemy import func as sa_func, select
 from datetime import datetime, timedelta, timezone
-from collections import defaultdict
 from typing import Optional, List
 
 from app.database import get_db
+from app.core.cache import cached_response, course_version_key, progress_version_key
+from app.core.export import export_response, select_columns
 from app.dependencies import get_current_user
-from app.analytics.service import AnalyticsService
+from app.analytics.service import AnalyticsService, RETENTION_WEEKS
 from app.schemas.analytics import (
     AnalyticsReport, CourseDetailReport,
     CourseStat, RevenuePoint, StudentsPoint, AnalyticsSummary,
 )
 from app.models.users import User, UserRole
-from app.models.courses import Course, CourseReview, UserProgress, ContentBlock, Module as CourseModule
+from app.models.courses import Course
 from app.models.orders import Order, OrderStatus
+from app.models.analytics import CourseDailyStats
+from app.services.analytics_rollup import seller_rollups
+from app.services.course_stats import total_blocks_by_course, completers_by_course
+from app.services.student_progress import student_progress_rows, student_progress_total
 
 import logging
 logger = logging.getLogger(__name__)
@@ -75,59 +80,39 @@ def get_analytics_overview(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Summary KPIs for the seller dashboard."""
+    """Summary KPIs for the seller dashboard (from course_daily_stats)."""
     seller_id = current_user.id
 
+    # Alumnos = suma de alumnos nuevos por curso (un alumno en dos cursos cuenta dos veces)
+    totals = seller_rollups(
+        db, seller_id, course_id,
+        sa_func.coalesce(sa_func.sum(CourseDailyStats.new_students), 0).label("students"),
+        sa_func.coalesce(sa_func.sum(CourseDailyStats.revenue), 0).label("revenue"),
+    ).one()
+
     if course_id != "all":
         # Single course overview
         course = db.query(Course).filter(Course.id == course_id, Course.seller_id == seller_id).first()
         if not course:
             return AnalyticsSummary(total_courses=0, total_students=0, total_revenue=0, avg_rating=0)
 
-        total_students = (
-            db.query(sa_func.count(sa_func.distinct(Order.user_id)))
-            .filter(Order.course_id == course_id, Order.status == OrderStatus.paid)
-            .scalar()
-        ) or 0
-        total_revenue = (
-            db.query(sa_func.coalesce(sa_func.sum(Order.price), 0))
-            .filter(Order.course_id == course_id, Order.status == OrderStatus.paid)
-            .scalar()
-        ) or 0
         return AnalyticsSummary(
             total_courses=1,
-            total_students=total_students,
-            total_revenue=float(total_revenue),
+            total_students=int(totals.students),
+            total_revenue=float(totals.revenue),
             avg_rating=round(float(course.rating_avg or 0), 1),
         )
 
-    total_courses = db.query(sa_func.count(Course.id)).filter(Course.seller_id == seller_id).scalar() or 0
-
-    total_students = (
-        db.query(sa_func.count(sa_func.distinct(Order.user_id)))
-        .join(Course, Order.course_id == Course.id)
-        .filter(Course.seller_id == seller_id, Order.status == OrderStatus.paid)
-        .scalar()
-    ) or 0
-
-    total_revenue = (
-        db.query(sa_func.coalesce(sa_func.sum(Order.price), 0))
-        .join(Course, Order.course_id == Course.id)
-        .filter(Course.seller_id == seller_id, Order.status == OrderStatus.paid)
-        .scalar()
-    ) or 0
-
-    avg_rating = (
-        db.query(sa_func.avg(Course.rating_avg))
-        .filter(Course.seller_id == seller_id, Course.status == "publicado")
-        .scalar()
-    ) or 0
+    total_courses, avg_rating = db.query(
+        sa_func.count(Course.id),
+        sa_func.avg(Course.rating_avg).filter(Course.status == "publicado"),
+    ).filter(Course.seller_id == seller_id).one()
 
     return AnalyticsSummary(
-        total_courses=total_courses,
-        total_students=total_students,
-        total_revenue=float(total_revenue),
-        avg_rating=round(float(avg_rating), 1),
+        total_courses=total_courses or 0,
+        total_students=int(totals.students),
+        total_revenue=float(totals.revenue),
+        avg_rating=round(float(avg_rating or 0), 1),
     )
 
 
@@ -136,52 +121,45 @@ def get_courses_stats(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Per-course metrics for the seller."""
+    """Per-course metrics for the seller.
+
+    Consultas agrupadas sobre todos los cursos a la vez (filas diarias,
+    bloques y alumnos que completaron el curso) y combinadas en memoria:
+    el número de sentencias no depende del número de cursos.
+    """
     courses = db.query(Course).filter(Course.seller_id == current_user.id).all()
-    result = []
+    course_ids = [c.id for c in courses]
+    if not course_ids:
+        return []
 
+    sales = {
+        row.course_id: row
+        for row in seller_rollups(
+            db, current_user.id, "all",
+            CourseDailyStats.course_id,
+            sa_func.coalesce(sa_func.sum(CourseDailyStats.purchases), 0).label("students"),
+            sa_func.coalesce(sa_func.sum(CourseDailyStats.revenue), 0).label("revenue"),
+        ).group_by(CourseDailyStats.course_id)
+    }
+    blocks = total_blocks_by_course(db, course_ids)
+    completers = completers_by_course(db, course_ids)
+
+    result = []
     for c in courses:
-        student_count = (
-            db.query(sa_func.count(Order.id))
-            .filter(Order.course_id == c.id, Order.status == OrderStatus.paid)
-            .scalar()
-        ) or 0
-
-        revenue = (
-            db.query(sa_func.coalesce(sa_func.sum(Order.price), 0))
-            .filter(Order.course_id == c.id, Order.status == OrderStatus.paid)
-            .scalar()
-        ) or 0
+        row = sales.get(c.id)
+        student_count = int(row.students) if row else 0
 
         # Completion rate: students who completed all blocks / total students
         completion_rate = 0.0
-        if student_count > 0:
-            total_blocks = (
-                db.query(sa_func.count(ContentBlock.id))
-                .join(CourseModule, ContentBlock.module_id == CourseModule.id)
-                .filter(CourseModule.course_id == c.id)
-                .scalar()
-            ) or 0
-
-            if total_blocks > 0:
-                # Count students who completed ALL blocks
-                from sqlalchemy import literal_column
-                completed_students = (
-                    db.query(sa_func.count(sa_func.distinct(UserProgress.user_id)))
-                    .filter(
-                        UserProgress.course_id == c.id,
-                        UserProgress.is_completed == True,
-                    )
-                    .scalar()
-                ) or 0
-                completion_rate = round((completed_students / student_count) * 100, 1)
+        if student_count > 0 and blocks.get(c.id):
+            completion_rate = round((completers.get(c.id, 0) / student_count) * 100, 1)
 
         result.append(CourseStat(
             id=c.id,
             title=c.title,
             status=c.status or "borrador",
             student_count=student_count,
-            revenue=float(revenue),
+            revenue=float(row.revenue) if row else 0.0,
             rating_avg=float(c.rating_avg or 0),
             rating_count=int(c.rating_count or 0),
             completion_rate=completion_rate,
@@ -198,7 +176,7 @@ def get_revenue_over_time(
     db: Session = Depends(get_db),
 ):
     """Revenue evolution grouped by day/week/month depending on period."""
-    since = datetime.utcnow() - timedelta(days=period)
+    since = datetime.now(timezone.utc).date() - timedelta(days=period)
 
     if period <= 7:
         trunc = "day"
@@ -207,21 +185,15 @@ def get_revenue_over_time(
     else:
         trunc = "month"
 
-    query = (
-        db.query(
-            sa_func.date_trunc(trunc, Order.created_at).label("bucket"),
-            sa_func.coalesce(sa_func.sum(Order.price), 0).label("revenue"),
-            sa_func.count(Order.id).label("purchases"),
-        )
-        .join(Course, Order.course_id == Course.id)
-        .filter(
-            Course.seller_id == current_user.id,
-            Order.status == OrderStatus.paid,
-            Order.created_at >= since,
-        )
+    query = seller_rollups(
+        db, current_user.id, course_id,
+        sa_func.date_trunc(trunc, CourseDailyStats.day).label("bucket"),
+        sa_func.coalesce(sa_func.sum(CourseDailyStats.revenue), 0).label("revenue"),
+        sa_func.coalesce(sa_func.sum(CourseDailyStats.purchases), 0).label("purchases"),
+    ).filter(
+        CourseDailyStats.day >= since,
+        CourseDailyStats.purchases > 0,
     )
-    if course_id != "all":
-        query = query.filter(Order.course_id == course_id)
 
     rows = query.group_by("bucket").order_by("bucket").all()
 
@@ -254,7 +226,7 @@ def get_students_over_time(
     db: Session = Depends(get_db),
 ):
     """New students over time grouped by day/week/month."""
-    since = datetime.utcnow() - timedelta(days=period)
+    since = datetime.now(timezone.utc).date() - timedelta(days=period)
 
     if period <= 7:
         trunc = "day"
@@ -263,20 +235,14 @@ def get_students_over_time(
     else:
         trunc = "month"
 
-    query = (
-        db.query(
-            sa_func.date_trunc(trunc, Order.created_at).label("bucket"),
-            sa_func.count(sa_func.distinct(Order.user_id)).label("students"),
-        )
-        .join(Course, Order.course_id == Course.id)
-        .filter(
-            Course.seller_id == current_user.id,
-            Order.status == OrderStatus.paid,
-            Order.created_at >= since,
-        )
+    query = seller_rollups(
+        db, current_user.id, course_id,
+        sa_func.date_trunc(trunc, CourseDailyStats.day).label("bucket"),
+        sa_func.coalesce(sa_func.sum(CourseDailyStats.new_students), 0).label("students"),
+    ).filter(
+        CourseDailyStats.day >= since,
+        CourseDailyStats.new_students > 0,
     )
-    if course_id != "all":
-        query = query.filter(Order.course_id == course_id)
 
     rows = query.group_by("bucket").order_by("bucket").all()
 
@@ -300,16 +266,20 @@ def get_students_over_time(
 @router.get("/retention")
 def get_retention_data(
     course_id: str = Query("all"),
+    week: int = Query(4, description="Semana de retención destacada: 1, 2, 4 u 8"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Retención real por mes de inscripción.
-    Para cada mes calcula qué porcentaje de estudiantes
-    sigue activo (tiene UserProgress) en la semana 4.
+    Para cada mes calcula qué porcentaje de estudiantes tiene actividad
+    (UserProgress) en la semana `week` tras inscribirse, y en "retention"
+    el triángulo completo para las semanas 1, 2, 4 y 8.
     """
     if str(current_user.role) not in [UserRole.seller.value, UserRole.admin.value]:
         raise HTTPException(status_code=403, detail="Solo creadores pueden ver retención")
+    if week not in RETENTION_WEEKS:
+        raise HTTPException(status_code=400, detail="Semana no válida. Usa 1, 2, 4 u 8.")
 
     seller_courses = db.query(Course.id).filter(Course.seller_id == current_user.id)
     if course_id != "all":
@@ -319,25 +289,8 @@ def get_retention_data(
     if not course_ids:
         return []
 
-    since = datetime.now(timezone.utc) - timedelta(days=365)
-
-    orders = db.query(
-        Order.id, Order.user_id, Order.course_id, Order.created_at
-    ).filter(
-        Order.course_id.in_(course_ids),
-        Order.status == OrderStatus.paid,
-        Order.created_at >= since,
-    ).all()
-
-    if not orders:
-        return []
-
-    monthly = defaultdict(list)
-    for order in orders:
-        created = order.created_at
-        if hasattr(created, 'tzinfo') and created.tzinfo:
-            created = created.replace(tzinfo=None)
-        monthly[created.strftime('%Y-%m')].append(order)
+    now = datetime.now(timezone.utc)
+    cohorts = AnalyticsService.get_retention_cohorts(db, course_ids, since=now - timedelta(days=365))
 
     MONTH_NAMES = {
         '01': 'Enero', '02': 'Febrero', '03': 'Marzo',
@@ -346,57 +299,37 @@ def get_retention_data(
         '10': 'Octubre', '11': 'Noviembre', '12': 'Diciembre',
     }
 
-    now = datetime.utcnow()
-    result = []
+    def percent(cohort, n):
+        # Un mes es demasiado reciente para la semana N mientras quien se
+        # inscribió su último día no la haya cumplido entera: se cuenta
+        # desde el final del mes (día 1 del siguiente), no desde su inicio
+        month_end = (cohort.month + timedelta(days=32)).replace(day=1)
+        if now < month_end + timedelta(weeks=n):
+            return None
+        return round(cohort[f"w{n}"] / cohort.initial * 100) if cohort.initial > 0 else 0
 
-    for month_key in sorted(monthly.keys()):
-        month_orders = monthly[month_key]
-        initial_active = len(month_orders)
+    result = []
+    for cohort in cohorts:
+        month_key = cohort.month.strftime('%Y-%m')
         year, month = month_key.split('-')
-        month_name = f"{MONTH_NAMES[month]} {year}"
-
-        month_start = datetime(int(year), int(month), 1)
-        too_recent = (now - month_start).days < 35
-
-        if too_recent:
-            result.append({
-                "month": month_name,
-                "month_key": month_key,
-                "initial_active": initial_active,
-                "week4_active": None,
-                "retention_percent": None,
-                "status": "too_recent",
-            })
-            continue
-
-        week4_count = 0
-        for order in month_orders:
-            created = order.created_at
-            if hasattr(created, 'tzinfo') and created.tzinfo:
-                created = created.replace(tzinfo=None)
-            week4_start = created + timedelta(days=21)
-            week4_end = created + timedelta(days=42)
-
-            has_activity = db.query(UserProgress.id).filter(
-                UserProgress.user_id == order.user_id,
-                UserProgress.course_id == order.course_id,
-                UserProgress.completed_at >= week4_start,
-                UserProgress.completed_at <= week4_end,
-            ).first()
-
-            if has_activity:
-                week4_count += 1
-
-        percent = round(week4_count / initial_active * 100) if initial_active > 0 else 0
-        status = "excellent" if percent >= 80 else "good" if percent >= 60 else "improvable"
+        retention = {str(n): percent(cohort, n) for n in RETENTION_WEEKS}
+        pct = retention[str(week)]
+
+        if pct is None:
+            status = "too_recent"
+        else:
+            status = "excellent" if pct >= 80 else "good" if pct >= 60 else "improvable"
 
         result.append({
-            "month": month_name,
+            "month": f"{MONTH_NAMES[month]} {year}",
             "month_key": month_key,
-            "initial_active": initial_active,
-            "week4_active": week4_count,
-            "retention_percent": percent,
+            "initial_active": cohort.initial,
+            "week": week,
+            "week_active": cohort[f"w{week}"] if pct is not None else None,
+            "week4_active": cohort.w4 if retention["4"] is not None else None,
+            "retention_percent": pct,
             "status": status,
+            "retention": retention,
         })
 
     return result
@@ -404,7 +337,10 @@ def get_retention_data(
 
 @router.get("/dropoff")
 def get_dropoff_data(
+    request: Request,
     course_id: str = Query(..., description="ID del curso"),
+    since: Optional[datetime] = Query(None, description="Solo progreso desde esta fecha"),
+    until: Optional[datetime] = Query(None, description="Solo progreso anterior a esta fecha"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -416,6 +352,10 @@ def get_dropoff_data(
     - completed: estudiantes que completaron ese bloque
     - completion_rate: completed / total_enrolled * 100
     - is_dropoff: si la caída respecto al bloque anterior > 15%
+
+    `since`/`until` permiten comparar el embudo antes y después de un cambio
+    de contenido. La respuesta se cachea por curso y rango, y se invalida al
+    registrar progreso o editar el curso.
     """
     course = db.query(Course).filter(
         Course.id == course_id,
@@ -430,73 +370,51 @@ def get_dropoff_data(
         if not course:
             raise HTTPException(status_code=404, detail="Curso no encontrado")
 
-    total_enrolled = (
-        db.query(sa_func.count(sa_func.distinct(Order.user_id)))
-        .filter(Order.course_id == course_id, Order.status == OrderStatus.paid)
-        .scalar()
-    ) or 0
+    return cached_response(
+        request, "dropoff",
+        [course_version_key(course_id), progress_version_key(course_id)],
+        lambda: _dropoff_report(db, course, since, until),
+        ttl=600,
+        private=True,
+    )
+
+
+def _dropoff_report(db: Session, course: Course, since: Optional[datetime], until: Optional[datetime]) -> dict:
+    total_enrolled, blocks = AnalyticsService.get_dropoff_funnel(db, course.id, since, until)
 
     if total_enrolled == 0:
         return {
-            "course_id": course_id,
+            "course_id": course.id,
             "course_title": course.title,
             "total_enrolled": 0,
             "avg_completion": 0,
             "blocks": [],
         }
 
-    modules = (
-        db.query(CourseModule)
-        .filter(CourseModule.course_id == course_id)
-        .order_by(CourseModule.order)
-        .all()
-    )
-
     blocks_data = []
     prev_rate = 100.0
-    global_order = 0
-
-    for module in modules:
-        blocks = (
-            db.query(ContentBlock)
-            .filter(ContentBlock.module_id == module.id)
-            .order_by(ContentBlock.order)
-            .all()
-        )
 
-        for block in blocks:
-            global_order += 1
-
-            completed = (
-                db.query(sa_func.count(sa_func.distinct(UserProgress.user_id)))
-                .filter(
-                    UserProgress.course_id == course_id,
-                    UserProgress.module_id == block.id,
-                    UserProgress.is_completed == True,
-                )
-                .scalar()
-            ) or 0
-
-            rate = round(completed / total_enrolled * 100, 1)
-            drop = round(prev_rate - rate, 1)
-            is_dropoff = drop > 15 and global_order > 1
-
-            blocks_data.append({
-                "block_id": block.id,
-                "block_title": block.title,
-                "block_type": block.type,
-                "module_title": module.title,
-                "order": global_order,
-                "completed": completed,
-                "completion_rate": rate,
-                "drop_from_prev": drop,
-                "is_dropoff": is_dropoff,
-            })
-
-            prev_rate = rate
+    for global_order, block in enumerate(blocks, start=1):
+        rate = round(block.completed / total_enrolled * 100, 1)
+        drop = round(prev_rate - rate, 1)
+        is_dropoff = drop > 15 and global_order > 1
+
+        blocks_data.append({
+            "block_id": block.block_id,
+            "block_title": block.block_title,
+            "block_type": block.block_type,
+            "module_title": block.module_title,
+            "order": global_order,
+            "completed": block.completed,
+            "completion_rate": rate,
+            "drop_from_prev": drop,
+            "is_dropoff": is_dropoff,
+        })
+
+        prev_rate = rate
 
     return {
-        "course_id": course_id,
+        "course_id": course.id,
         "course_title": course.title,
         "total_enrolled": total_enrolled,
         "avg_completion": round(
@@ -506,14 +424,79 @@ def get_dropoff_data(
     }
 
 
+ORDER_EXPORT_COLUMNS = {
+    "order_id": "string",
+    "created_at": "timestamp",
+    "course_id": "string",
+    "course_title": "string",
+    "student_id": "string",
+    "student_name": "string",
+    "student_email": "string",
+    "offer_id": "string",
+    "price": "float",
+}
+
+
+@router.get("/export")
+def export_analytics(
+    course_id: str = Query("all"),
+    since: Optional[datetime] = Query(None, description="Pedidos desde esta fecha"),
+    until: Optional[datetime] = Query(None, description="Pedidos anteriores a esta fecha"),
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    columns: Optional[str] = Query(None, description="Columnas separadas por comas; todas si se omite"),
+    current_user: User = Depends(get_current_user),
+):
+    """Pedidos pagados de los cursos del vendedor (ingresos por alumno) en
+    CSV o Parquet, enviados en streaming."""
+    if str(current_user.role) != UserRole.seller.value and str(current_user.role) != UserRole.admin.value:
+        raise HTTPException(status_code=403, detail="Solo los creadores pueden exportar las analíticas.")
+    selected = select_columns(columns, ORDER_EXPORT_COLUMNS)
+
+    statement = (
+        select(
+            Order.id.label("order_id"),
+            Order.created_at,
+            Course.id.label("course_id"),
+            Course.title.label("course_title"),
+            User.id.label("student_id"),
+            User.full_name.label("student_name"),
+            User.email.label("student_email"),
+            Order.offer_id,
+            Order.price,
+        )
+        .join(Course, Order.course_id == Course.id)
+        .join(User, Order.user_id == User.id)
+        .where(Course.seller_id == current_user.id, Order.status == OrderStatus.paid)
+        .order_by(Order.created_at, Order.id)
+    )
+    if course_id != "all":
+        statement = statement.where(Order.course_id == course_id)
+    if since:
+        statement = statement.where(Order.created_at >= since)
+    if until:
+        statement = statement.where(Order.created_at < until)
+
+    return export_response(statement, selected, format, "ventas")
+
+
 @router.get("/students-ranking")
 def get_students_ranking(
+    response: Response,
     course_id: str = Query(...),
+    search: Optional[str] = Query(None),
+    progress_min: Optional[float] = Query(None, ge=0, le=100),
+    progress_max: Optional[float] = Query(None, ge=0, le=100),
+    sort: str = Query("progress", pattern="^(progress|last_activity|enrolled_at|name)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    page: int = Query(1, ge=1),
+    # Sin limit: todas las filas (el panel filtra en el cliente)
+    limit: Optional[int] = Query(None, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Ranking de estudiantes por progreso en un curso específico.
+    Una sola consulta agregada por petición (ver app/services/student_progress.py).
     """
     course = db.query(Course).filter(
         Course.id == course_id,
@@ -522,53 +505,28 @@ def get_students_ranking(
     if not course:
         raise HTTPException(status_code=404, detail="Curso no encontrado")
 
-    total_blocks = (
-        db.query(sa_func.count(ContentBlock.id))
-        .join(CourseModule, ContentBlock.module_id == CourseModule.id)
-        .filter(CourseModule.course_id == course_id)
-        .scalar()
-    ) or 1
-
-    orders = (
-        db.query(Order)
-        .filter(Order.course_id == course_id, Order.status == OrderStatus.paid)
-        .all()
+    filters = dict(
+        search=search,
+        progress_min=progress_min,
+        progress_max=progress_max,
+        sort=sort,
+        descending=order == "desc",
     )
+    rows = student_progress_rows(
+        db, [course_id],
+        limit=limit,
+        offset=(page - 1) * limit if limit else 0,
+        **filters,
+    )
+    response.headers["X-Total-Count"] = str(student_progress_total(db, [course_id], rows, **filters))
 
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
     result = []
 
-    for order in orders:
-        student = db.query(User).filter(User.id == order.user_id).first()
-        if not student:
-            continue
-
-        progress_entries = (
-            db.query(UserProgress)
-            .filter(
-                UserProgress.user_id == order.user_id,
-                UserProgress.course_id == course_id,
-                UserProgress.is_completed == True,
-            )
-            .all()
-        )
-
-        completed_blocks = len(progress_entries)
-        pct = round(completed_blocks / total_blocks * 100, 1)
-
-        last_activity = None
-        if progress_entries:
-            dates = [p.completed_at for p in progress_entries if p.completed_at]
-            if dates:
-                last_activity = max(dates)
-
+    for r in rows:
+        last_activity = r.last_activity
         if last_activity:
-            last_act_naive = (
-                last_activity.replace(tzinfo=None)
-                if hasattr(last_activity, "tzinfo") and last_activity.tzinfo
-                else last_activity
-            )
-            days_inactive = (now - last_act_naive).days
+            days_inactive = (now - last_activity).days
             if days_inactive <= 7:
                 status = "active"
             elif days_inactive <= 21:
@@ -579,16 +537,16 @@ def get_students_ranking(
             status = "inactive"
 
         result.append({
-            "user_id": student.id,
-            "name": student.full_name or student.email,
-            "email": student.email,
-            "completed_blocks": completed_blocks,
-            "total_blocks": total_blocks,
-            "progress_pct": pct,
+            "user_id": r.user_id,
+            "name": r.full_name or r.email,
+            "email": r.email,
+            "completed_blocks": r.completed_blocks,
+            # Sin bloques el porcentaje es 0; se mantiene 1 como antes para la UI
+            "total_blocks": r.total_blocks or 1,
+            "progress_pct": float(r.progress_pct),
             "last_activity": last_activity.isoformat() if last_activity else None,
             "status": status,
-            "enrolled_at": order.created_at.isoformat() if order.created_at else None,
+            "enrolled_at": r.enrolled_at.isoformat() if r.enrolled_at else None,
         })
 
-    result.sort(key=lambda x: x["progress_pct"], reverse=True)
     return result
@@ -1,110 +1,207 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from sqlalchemy import func, case, and_, tuple_
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
 
 from app.models.orders import Order, OrderStatus
-from app.models.courses import Course, CourseContent, CourseReview, UserProgress
+from app.models.courses import Course, CourseContent, CourseReview, UserProgress, Module, ContentBlock
 from app.models.users import User
+from app.models.analytics import CourseDailyStats
+from app.services.analytics_rollup import seller_rollups
+
+# Ventanas de retención en semanas desde la inscripción (semana N = días [7(N-1), 7N))
+RETENTION_WEEKS = (1, 2, 4, 8)
+
 
 class AnalyticsService:
     @staticmethod
     def get_stats(db: Session, seller_id: str, course_id: str, days: int) -> Dict[str, Any]:
-        now = datetime.now()
-        since_date = now - timedelta(days=days)
-        last_period_start = since_date - timedelta(days=days)
-
-        # --- 1. FILTRO BASE ---
-        def apply_filters(query, model):
-            # Siempre filtramos por el dueño (seller)
-            query = query.join(Course, model.course_id == Course.id).filter(Course.seller_id == seller_id)
-            if course_id != "all":
-                query = query.filter(model.course_id == course_id)
-            return query
-
-        # --- 2. MÉTRICAS DE INGRESOS (REVENUE) ---
-        revenue_query = apply_filters(db.query(func.sum(Order.price)), Order).filter(Order.status == OrderStatus.paid)
-        
-        current_revenue = revenue_query.filter(Order.created_at >= since_date).scalar() or 0
-        prev_revenue = revenue_query.filter(Order.created_at >= last_period_start, Order.created_at < since_date).scalar() or 0
-        
-        revenue_change = ((current_revenue - prev_revenue) / prev_revenue * 100) if prev_revenue > 0 else 0
+        today = datetime.now(timezone.utc).date()
+        since_day = today - timedelta(days=days)
+        last_period_start = since_day - timedelta(days=days)
+        group_format = 'day' if days <= 30 else 'month'
 
-        # --- 3. MÉTRICAS DE ESTUDIANTES ---
-        enrollment_query = apply_filters(db.query(func.count(Order.id)), Order).filter(Order.status == OrderStatus.paid)
-        
-        total_enrolled = enrollment_query.scalar() or 0
-        current_enrollment = enrollment_query.filter(Order.created_at >= since_date).scalar() or 0
-        prev_enrollment = enrollment_query.filter(Order.created_at >= last_period_start, Order.created_at < since_date).scalar() or 0
-        
+        # --- 1. PEDIDOS: KPIs + series en un solo recorrido de course_daily_stats ---
+        # GROUPING SETS ((bucket), ()): las filas por bucket forman las gráficas
+        # y la fila de total general (GROUPING = 1) trae los KPIs con FILTER.
+        # Los días anteriores al periodo caen en el bucket NULL.
+        day = CourseDailyStats.day
+        in_period = day >= since_day
+        in_prev_period = and_(day >= last_period_start, day < since_day)
+        bucket = case((in_period, func.date_trunc(group_format, day)))
+
+        orders_query = seller_rollups(
+            db, seller_id, course_id,
+            bucket.label('bucket'),
+            func.grouping(bucket).label('is_total'),
+            func.coalesce(func.sum(CourseDailyStats.revenue), 0).label('revenue'),
+            func.coalesce(func.sum(CourseDailyStats.purchases), 0).label('enrollments'),
+            func.coalesce(func.sum(CourseDailyStats.revenue).filter(in_period), 0).label('current_revenue'),
+            func.coalesce(func.sum(CourseDailyStats.revenue).filter(in_prev_period), 0).label('prev_revenue'),
+            func.coalesce(func.sum(CourseDailyStats.purchases).filter(in_period), 0).label('current_enrollment'),
+            func.coalesce(func.sum(CourseDailyStats.purchases).filter(in_prev_period), 0).label('prev_enrollment'),
+        ).filter(CourseDailyStats.purchases > 0)
+
+        rows = orders_query.group_by(
+            func.grouping_sets(tuple_(bucket), tuple_())
+        ).all()
+
+        totals = next((r for r in rows if r.is_total), None)
+        history = sorted(
+            (r for r in rows if not r.is_total and r.bucket is not None),
+            key=lambda r: r.bucket,
+        )
+
+        current_revenue = float(totals.current_revenue) if totals else 0.0
+        prev_revenue = float(totals.prev_revenue) if totals else 0.0
+        total_enrolled = int(totals.enrollments) if totals else 0
+        current_enrollment = int(totals.current_enrollment) if totals else 0
+        prev_enrollment = int(totals.prev_enrollment) if totals else 0
+
+        revenue_change = ((current_revenue - prev_revenue) / prev_revenue * 100) if prev_revenue > 0 else 0
         students_change = ((current_enrollment - prev_enrollment) / prev_enrollment * 100) if prev_enrollment > 0 else 0
 
-        # --- 4. RATINGS Y COMPLETION ---
-        # Promedio de rating_avg de los cursos del seller
-        avg_rating = db.query(func.avg(Course.rating_avg)).filter(Course.seller_id == seller_id)
+        # --- 2. RATINGS: media de los cursos + nº de reseñas en una consulta ---
+        review_count = db.query(func.count(CourseReview.id)).join(
+            Course, CourseReview.course_id == Course.id
+        ).filter(Course.seller_id == seller_id)
+        rating_query = db.query(func.avg(Course.rating_avg)).filter(Course.seller_id == seller_id)
         if course_id != "all":
-            avg_rating = avg_rating.filter(Course.id == course_id)
-        
-        total_reviews = apply_filters(db.query(func.count(CourseReview.id)), CourseReview).scalar() or 0
+            review_count = review_count.filter(CourseReview.course_id == course_id)
+            rating_query = rating_query.filter(Course.id == course_id)
+
+        avg_rating, total_reviews = rating_query.add_columns(
+            review_count.scalar_subquery()
+        ).one()
 
         # Tasa de finalización (Aprox: % de UserProgress vs Contenidos Totales)
         # Esto es una métrica agregada compleja, la simplificamos para el dashboard general
         completion_rate = 68.0 # Valor base si no hay datos suficientes
 
-        # --- 5. GRÁFICAS (RECHARTS) ---
-        group_format = 'day' if days <= 30 else 'month'
-        
-        # Query para Ingresos
-        revenue_history = apply_filters(
-            db.query(
-                func.date_trunc(group_format, Order.created_at).label('label'),
-                func.sum(Order.price).label('value')
-            ), Order
-        ).filter(Order.status == OrderStatus.paid, Order.created_at >= since_date)\
-         .group_by('label').order_by('label').all()
-
-        # Query para Estudiantes (Nuevos inscritos)
-        enrollment_history = apply_filters(
-            db.query(
-                func.date_trunc(group_format, Order.created_at).label('label'),
-                func.count(Order.id).label('value')
-            ), Order
-        ).filter(Order.status == OrderStatus.paid, Order.created_at >= since_date)\
-         .group_by('label').order_by('label').all()
-         
-        latest_reviews_query = apply_filters(db.query(CourseReview), CourseReview)
+        # --- 3. ÚLTIMAS RESEÑAS (con su autor en la misma consulta) ---
+        latest_reviews_query = db.query(CourseReview, User.full_name).join(
+            Course, CourseReview.course_id == Course.id
+        ).outerjoin(User, User.id == CourseReview.user_id).filter(Course.seller_id == seller_id)
+        if course_id != "all":
+            latest_reviews_query = latest_reviews_query.filter(CourseReview.course_id == course_id)
         latest_reviews_data = latest_reviews_query.order_by(CourseReview.created_at.desc()).limit(3).all()
 
+        def label(bucket_value):
+            return bucket_value.strftime('%d %b') if days <= 30 else bucket_value.strftime('%b')
+
         return {
             "metrics": {
-                "totalRevenue": float(current_revenue),
+                "totalRevenue": current_revenue,
                 "activeStudents": int(total_enrolled * 0.75),
                 "completionRate": completion_rate,
-                "avgRating": round(float(avg_rating.scalar() or 0), 1),
+                "avgRating": round(float(avg_rating or 0), 1),
                 "revenueChange": round(revenue_change, 1),
                 "studentsChange": round(students_change, 1),
                 "totalEnrolled": total_enrolled,
-                "totalReviews": total_reviews
+                "totalReviews": int(total_reviews or 0)
             },
-            # Corregido: r ahora existe dentro de la comprensión de lista
             "revenue_chart": [
-                {
-                    "label": r.label.strftime('%d %b') if days <= 30 else r.label.strftime('%b'), 
-                    "value": float(r.value)
-                } for r in revenue_history
+                {"label": label(r.bucket), "value": float(r.revenue)} for r in history
             ],
             "enrollment_chart": [
-                {
-                    "label": e.label.strftime('%d %b') if days <= 30 else e.label.strftime('%b'), 
-                    "value": int(e.value)
-                } for e in enrollment_history
+                {"label": label(r.bucket), "value": int(r.enrollments)} for r in history
             ],
             "latest_reviews": [
-                {"author": r.user.full_name if r.user else "Anónimo", "rating": r.rating, "text": r.comment} 
-                for r in latest_reviews_data
+                {"author": author or "Anónimo", "rating": r.rating, "text": r.comment}
+                for r, author in latest_reviews_data
             ]
         }
 
+    @staticmethod
+    def get_retention_cohorts(
+        db: Session, course_ids: List[str], since: datetime, weeks=RETENTION_WEEKS,
+    ) -> List[Any]:
+        """Cohortes por mes de inscripción con los inscritos y, para cada semana
+        de `weeks`, cuántos tuvieron progreso en esa semana.
+
+        Una sola sentencia: pedidos pagados LEFT JOIN progreso por
+        (user_id, course_id) dentro de la ventana más larga, agregado primero
+        por pedido (bool_or por semana) y después por mes.
+        """
+        week_index = func.floor(
+            func.extract('epoch', UserProgress.completed_at - Order.created_at) / (7 * 86400)
+        ) + 1
+        per_order = db.query(
+            func.date_trunc('month', Order.created_at).label('month'),
+            *[
+                func.coalesce(func.bool_or(week_index == week), False).label(f'w{week}')
+                for week in weeks
+            ],
+        ).outerjoin(UserProgress, and_(
+            UserProgress.user_id == Order.user_id,
+            UserProgress.course_id == Order.course_id,
+            UserProgress.completed_at >= Order.created_at,
+            UserProgress.completed_at < Order.created_at + timedelta(weeks=max(weeks)),
+        )).filter(
+            Order.course_id.in_(course_ids),
+            Order.status == OrderStatus.paid,
+            Order.created_at >= since,
+        ).group_by(Order.id, Order.created_at).subquery()
+
+        return db.query(
+            per_order.c.month,
+            func.count().label('initial'),
+            *[
+                func.count().filter(per_order.c[f'w{week}']).label(f'w{week}')
+                for week in weeks
+            ],
+        ).group_by(per_order.c.month).order_by(per_order.c.month).all()
+
+    @staticmethod
+    def get_dropoff_funnel(
+        db: Session,
+        course_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> tuple[int, List[Any]]:
+        """Embudo de un curso: (inscritos, bloques en orden con los alumnos
+        distintos que los completaron), en una sentencia.
+
+        `since`/`until` limitan el progreso considerado a ese rango de fechas;
+        los inscritos son siempre todos los alumnos con pedido pagado.
+        """
+        completed = db.query(
+            UserProgress.module_id.label('block_id'),
+            func.count(func.distinct(UserProgress.user_id)).label('completed'),
+        ).filter(
+            UserProgress.course_id == course_id,
+            UserProgress.is_completed == True,
+        )
+        if since:
+            completed = completed.filter(UserProgress.completed_at >= since)
+        if until:
+            completed = completed.filter(UserProgress.completed_at < until)
+        completed = completed.group_by(UserProgress.module_id).subquery()
+
+        enrolled = db.query(func.count(func.distinct(Order.user_id))).filter(
+            Order.course_id == course_id,
+            Order.status == OrderStatus.paid,
+        )
+
+        blocks = db.query(
+            ContentBlock.id.label('block_id'),
+            ContentBlock.title.label('block_title'),
+            ContentBlock.type.label('block_type'),
+            Module.title.label('module_title'),
+            func.coalesce(completed.c.completed, 0).label('completed'),
+            enrolled.scalar_subquery().label('total_enrolled'),
+        ).join(
+            Module, ContentBlock.module_id == Module.id
+        ).outerjoin(
+            completed, completed.c.block_id == ContentBlock.id
+        ).filter(
+            Module.course_id == course_id
+        ).order_by(Module.order, ContentBlock.order).all()
+
+        # Sin bloques no hay filas de las que leer los inscritos
+        total_enrolled = blocks[0].total_enrolled if blocks else (enrolled.scalar() or 0)
+        return total_enrolled, blocks
+
     @staticmethod
     def get_course_detail_stats(db: Session, course_id: str) -> Dict[str, Any]:
         """Específico para el Sheet de detalle de un curso"""
@@ -19,6 +19,7 @@ from app.core.security import (
 from app.core.trusted import TRUSTED_USERS
 from app.core.rate_limiter import limiter
 from app.database import get_db
+from app.services.platform_stats import bump_platform_stats
 from app.config import (
     FRONTEND_URL, GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET,
     REFRESH_TOKEN_EXPIRE_DAYS,
@@ -293,6 +294,8 @@ def confirm_email(token: str, db: Session = Depends(get_db)):
 
     user = db.query(User).filter(User.email == email).first()
     if user:
+        if not user.is_active:
+            bump_platform_stats(db, total_users=1)
         user.is_active = True
         db.commit()
         redis_client.delete(f"verify:{token}")
@@ -528,10 +531,14 @@ async def google_callback(request: StarletteRequest, db: Session = Depends(get_d
             is_active=True,
         )
         db.add(user)
+        bump_platform_stats(
+            db, total_users=1, total_instructors=int(role == UserRole.seller)
+        )
         db.commit()
         db.refresh(user)
     elif not user.is_active:
         user.is_active = True
+        bump_platform_stats(db, total_users=1)
         db.commit()
 
     # Crear tokens
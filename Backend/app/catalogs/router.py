@@ -1,4 +1,5 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from app.core.cache import cached_response
 
 router = APIRouter(prefix="/catalogs", tags=["Catalogs"])
 
@@ -61,17 +62,21 @@ COUNTRIES = [
 ]
 
 @router.get("/categories")
-def get_categories():
-    return {"data": [{"id": c.lower().replace(" ", "_").replace("í","i").replace("ó","o"), "label": c} for c in CATEGORIES]}
+def get_categories(request: Request):
+    # Catálogo estático: sin versión, solo ETag/304
+    return cached_response(request, "catalog", [], lambda: {"data": [{"id": c.lower().replace(" ", "_").replace("í","i").replace("ó","o"), "label": c} for c in CATEGORIES]})
 
 @router.get("/topics")
-def get_topics():
-    return {"data": [{"id": t.lower().replace(" ", "_"), "label": t} for t in TOPICS]}
+def get_topics(request: Request):
+    # Catálogo estático: sin versión, solo ETag/304
+    return cached_response(request, "catalog", [], lambda: {"data": [{"id": t.lower().replace(" ", "_"), "label": t} for t in TOPICS]})
 
 @router.get("/audiences")
-def get_audiences():
-    return {"data": [{"id": a.lower().replace(" ", "_"), "label": a} for a in AUDIENCES]}
+def get_audiences(request: Request):
+    # Catálogo estático: sin versión, solo ETag/304
+    return cached_response(request, "catalog", [], lambda: {"data": [{"id": a.lower().replace(" ", "_"), "label": a} for a in AUDIENCES]})
 
 @router.get("/countries")
-def get_countries():
-    return {"data": COUNTRIES}
+def get_countries(request: Request):
+    # Catálogo estático: sin versión, solo ETag/304
+    return cached_response(request, "catalog", [], lambda: {"data": COUNTRIES})
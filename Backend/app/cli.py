@@ -0,0 +1,122 @@
+"""Comandos de mantenimiento.
+
+Uso (desde la carpeta Backend):
+    python -m app.cli rebuild-course-cards
+    python -m app.cli rebuild-related-courses
+    python -m app.cli rebuild-course-neighbors
+    python -m app.cli backfill-analytics [--since AAAA-MM-DD]
+    python -m app.cli reconcile-progress [--course ID]
+    python -m app.cli load-test-progress [--users N] [--blocks N] [--batch N] [--workers N] [--buffered]
+"""
+import argparse
+import logging
+from datetime import date
+
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_course_cards(args):
+    from app.services.course_cards import rebuild_course_cards as rebuild
+    db = SessionLocal()
+    try:
+        count = rebuild(db)
+        print(f"course_cards reconstruida: {count} cursos")
+    finally:
+        db.close()
+
+
+def rebuild_related_courses(args):
+    from app.services.related_courses import rebuild_related_courses as rebuild
+    db = SessionLocal()
+    try:
+        count = rebuild(db)
+        print(f"related_courses reconstruida: {count} cursos")
+    finally:
+        db.close()
+
+
+def rebuild_course_neighbors(args):
+    from app.services.course_neighbors import rebuild_course_neighbors as rebuild
+    db = SessionLocal()
+    try:
+        count = rebuild(db)
+        print(f"course_neighbors reconstruida: {count} pares")
+    finally:
+        db.close()
+
+
+def backfill_analytics(args):
+    from app.services.analytics_rollup import backfill_rollups
+    db = SessionLocal()
+    try:
+        count = backfill_rollups(db, since=args.since)
+        print(f"course_daily_stats recalculada: {count} filas")
+    finally:
+        db.close()
+
+
+def reconcile_progress(args):
+    from app.services.enrollment_progress import reconcile_enrollment_progress
+    db = SessionLocal()
+    try:
+        count = reconcile_enrollment_progress(db, course_id=args.course)
+        print(f"enrollment_progress verificada: {count} filas corregidas")
+    finally:
+        db.close()
+
+
+def load_test_progress(args):
+    from app.loadtest import run_progress_load_test
+    report = run_progress_load_test(
+        users=args.users, blocks=args.blocks, batch=args.batch, workers=args.workers, buffered=args.buffered,
+    )
+    print(
+        f"[{report['mode']}] {report['completions']} compleciones en {report['seconds']}s: "
+        f"{report['completions_per_second']} compleciones/s "
+        f"({report['requests']} peticiones, {report['requests_per_second']} peticiones/s aceptadas)"
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("rebuild-course-cards", help="Backfill de la tabla course_cards")
+    p.set_defaults(func=rebuild_course_cards)
+
+    p = sub.add_parser("rebuild-related-courses", help="Recalcula el índice de cursos relacionados")
+    p.set_defaults(func=rebuild_related_courses)
+
+    p = sub.add_parser("rebuild-course-neighbors", help="Recalcula los vecinos item-item (co-compra y favoritos)")
+    p.set_defaults(func=rebuild_course_neighbors)
+
+    p = sub.add_parser("backfill-analytics", help="Recalcula las tablas diarias de analíticas")
+    p.add_argument("--since", type=date.fromisoformat, default=None,
+                   help="Primer día a recalcular (por defecto, todo el histórico)")
+    p.set_defaults(func=backfill_analytics)
+
+    p = sub.add_parser("reconcile-progress", help="Contrasta los contadores de progreso con user_progress")
+    p.add_argument("--course", default=None, help="Solo este curso (por defecto, todos)")
+    p.set_defaults(func=reconcile_progress)
+
+    p = sub.add_parser("load-test-progress", help="Prueba de carga de la ingesta de progreso (datos sintéticos)")
+    p.add_argument("--users", type=int, default=500)
+    p.add_argument("--blocks", type=int, default=40, help="Bloques completados por alumno")
+    p.add_argument("--batch", type=int, default=1, help="Bloques por petición")
+    p.add_argument("--workers", type=int, default=16)
+    p.add_argument("--buffered", action="store_true", help="Encolar en Redis y volcar por lotes")
+    p.set_defaults(func=load_test_progress)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from typing import List, Optional
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.cohorts import Cohort, CohortMember
-from app.models.courses import Course, UserProgress, ContentBlock, Module, CourseOffer
+from app.models.courses import Course, EnrollmentProgress, CourseOffer
 from app.models.orders import Order, OrderStatus
 from app.models.users import User, UserRole
 from app.schemas.cohorts import (
@@ -178,23 +178,18 @@ def list_members(
         .all()
     )
 
-    total_blocks = (
-        db.query(func.count(ContentBlock.id))
-        .join(Module, ContentBlock.module_id == Module.id)
-        .filter(Module.course_id == cohort.course_id)
-        .scalar() or 1
-    )
+    total_blocks = cohort.course.total_blocks or 1
+    # Contadores de todos los miembros en una consulta por clave primaria
+    completed_by_student = dict(
+        db.query(EnrollmentProgress.user_id, EnrollmentProgress.completed_count).filter(
+            EnrollmentProgress.course_id == cohort.course_id,
+            EnrollmentProgress.user_id.in_([m.student_id for m in members]),
+        ).all()
+    ) if members else {}
 
     result = []
     for m in members:
-        completed = (
-            db.query(func.count(UserProgress.id))
-            .filter(
-                UserProgress.user_id == m.student_id,
-                UserProgress.course_id == cohort.course_id,
-            )
-            .scalar() or 0
-        )
+        completed = completed_by_student.get(m.student_id, 0)
         progress_pct = round((completed / total_blocks) * 100)
 
         result.append(CohortMemberResponse(
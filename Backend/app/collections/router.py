@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from pydantic import BaseModel
@@ -6,8 +6,11 @@ from pydantic import BaseModel
 from app.database import get_db
 from app.dependencies import get_current_user, get_optional_user
 from app.models.collections import Collection, CollectionCourse
-from app.models.courses import Course
+from app.models.courses import Course, CourseCard
 from app.models.users import User, UserRole
+from app.core.cache import (
+    cached_response, invalidate_collection, collection_version_key, CATALOG_VERSION_KEY,
+)
 
 router = APIRouter(prefix="/collections", tags=["Collections"])
 
@@ -70,26 +73,44 @@ def list_collections(
 
 
 @router.get("/{collection_id}")
-def get_collection(collection_id: str, db: Session = Depends(get_db)):
+def get_collection(collection_id: str, request: Request, db: Session = Depends(get_db)):
+    # Depende de la colección y de las fichas de sus cursos (catálogo)
+    return cached_response(
+        request, "collection",
+        [collection_version_key(collection_id), CATALOG_VERSION_KEY],
+        lambda: _collection_detail(db, collection_id),
+    )
+
+
+def _collection_detail(db: Session, collection_id: str) -> dict:
     col = db.query(Collection).filter(Collection.id == collection_id).first()
     if not col:
         raise HTTPException(404, "Colección no encontrada")
 
     result = collection_to_dict(col)
+    course_ids = [cc.course_id for cc in col.courses]
+    cards = {
+        card.course_id: card
+        for card in db.query(CourseCard).filter(CourseCard.course_id.in_(course_ids)).all()
+    } if course_ids else {}
+
     courses_data = []
-    for cc in col.courses:
-        course = db.query(Course).filter(Course.id == cc.course_id).first()
-        if course:
+    for course_id in course_ids:
+        card = cards.get(course_id)
+        if card:
             courses_data.append({
-                "id": course.id,
-                "title": course.title,
-                "subtitle": course.subtitle,
-                "category": course.category,
-                "level": course.level,
-                "banner_url": course.banner_url,
-                "short_description": course.short_description,
-                "rating_avg": course.rating_avg or 0,
-                "rating_count": course.rating_count or 0,
+                "id": card.course_id,
+                "title": card.title,
+                "subtitle": card.subtitle,
+                "category": card.category,
+                "level": card.level,
+                "banner_url": card.banner_url,
+                "short_description": card.short_description,
+                "rating_avg": card.rating_avg or 0,
+                "rating_count": card.rating_count or 0,
+                "min_price": card.min_price,
+                "total_blocks": card.total_blocks or 0,
+                "seller_name": card.seller_name,
             })
     result["courses"] = courses_data
     return result
@@ -150,6 +171,7 @@ def update_collection(
             ))
 
     db.commit()
+    invalidate_collection(collection_id)
     db.refresh(col)
     return collection_to_dict(col)
 
@@ -167,4 +189,5 @@ def delete_collection(
         raise HTTPException(403, "No autorizado")
     db.delete(col)
     db.commit()
+    invalidate_collection(collection_id)
     return {"ok": True}
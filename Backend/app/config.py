@@ -82,3 +82,22 @@ REDIS_HOST = _optional("REDIS_HOST", "localhost")
 REDIS_PORT = int(_optional("REDIS_PORT", "6379"))
 REDIS_PASSWORD = _optional("REDIS_PASSWORD") or None
 REDIS_SSL = _optional("REDIS_SSL", "false").lower() == "true"
+
+# ── TAREAS PERIÓDICAS ─────────────────────────────
+SCHEDULER_ENABLED = _optional("SCHEDULER_ENABLED", "true").lower() == "true"
+PLATFORM_STATS_REFRESH_SECONDS = int(_optional("PLATFORM_STATS_REFRESH_SECONDS", "300"))
+# Antigüedad máxima de la instantánea antes de recalcular al leer
+PLATFORM_STATS_MAX_AGE_SECONDS = int(_optional("PLATFORM_STATS_MAX_AGE_SECONDS", "900"))
+RELATED_COURSES_TOP_N = int(_optional("RELATED_COURSES_TOP_N", "8"))
+RELATED_COURSES_REFRESH_SECONDS = int(_optional("RELATED_COURSES_REFRESH_SECONDS", "86400"))
+COURSE_NEIGHBORS_TOP_N = int(_optional("COURSE_NEIGHBORS_TOP_N", "20"))
+COURSE_NEIGHBORS_REFRESH_SECONDS = int(_optional("COURSE_NEIGHBORS_REFRESH_SECONDS", "3600"))
+# Reconciliación de las tablas de analíticas diarias (últimos N días)
+ANALYTICS_ROLLUP_REFRESH_SECONDS = int(_optional("ANALYTICS_ROLLUP_REFRESH_SECONDS", "86400"))
+ANALYTICS_ROLLUP_RECONCILE_DAYS = int(_optional("ANALYTICS_ROLLUP_RECONCILE_DAYS", "7"))
+# Progreso: "direct" escribe en cada petición; "buffered" encola en Redis y
+# vuelca a Postgres por lotes cada PROGRESS_FLUSH_SECONDS
+PROGRESS_WRITE_MODE = _optional("PROGRESS_WRITE_MODE", "direct").lower()
+PROGRESS_FLUSH_SECONDS = int(_optional("PROGRESS_FLUSH_SECONDS", "2"))
+# Verificación de los contadores de enrollment_progress contra user_progress
+ENROLLMENT_PROGRESS_RECONCILE_SECONDS = int(_optional("ENROLLMENT_PROGRESS_RECONCILE_SECONDS", "86400"))
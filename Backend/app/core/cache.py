@@ -0,0 +1,158 @@
+"""Caché de respuestas públicas en Redis con claves versionadas.
+
+Cada respuesta se guarda bajo una clave que incluye las versiones de las que
+depende (p. ej. la del curso y la del catálogo). Las rutas de escritura hacen
+INCR de esas versiones después del commit, con lo que las entradas antiguas
+dejan de ser alcanzables y expiran solas por TTL; no hay que borrar nada.
+
+Las respuestas llevan ETag y Last-Modified y contestan 304 a peticiones
+condicionales. Si Redis no está disponible la caché se ignora.
+"""
+import hashlib
+import json
+import logging
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Iterable
+
+import redis
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.redis_config import redis_client
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "cache:ver:catalog"
+DEFAULT_TTL = 3600
+
+
+def course_version_key(course_id: str) -> str:
+    return f"cache:ver:course:{course_id}"
+
+
+def collection_version_key(collection_id: str) -> str:
+    return f"cache:ver:collection:{collection_id}"
+
+
+def progress_version_key(course_id: str) -> str:
+    return f"cache:ver:progress:{course_id}"
+
+
+def structure_version_key(course_id: str) -> str:
+    return f"cache:ver:structure:{course_id}"
+
+
+# ── Invalidación ──────────────────────────────────────────
+
+def bump_versions(*keys: str) -> None:
+    try:
+        pipe = redis_client.pipeline()
+        for key in keys:
+            pipe.incr(key)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"No se pudo invalidar la caché {keys}: {e}")
+
+
+def invalidate_course(course_id: str) -> None:
+    """Invalida la ficha del curso y todo lo que lista cursos (catálogo,
+    relacionados, colecciones). Llamar después de hacer commit."""
+    bump_versions(course_version_key(course_id), CATALOG_VERSION_KEY)
+
+
+def invalidate_course_detail(course_id: str) -> None:
+    """Solo la ficha del curso (p. ej. cambia el número de matriculados)."""
+    bump_versions(course_version_key(course_id))
+
+
+def invalidate_course_structure(course_id: str) -> None:
+    """Módulos, bloques, su orden o el ritmo del curso (plan de acceso de
+    app/services/access.py). Llamar después de hacer commit."""
+    bump_versions(structure_version_key(course_id))
+
+
+def invalidate_catalog() -> None:
+    bump_versions(CATALOG_VERSION_KEY)
+
+
+def invalidate_collection(collection_id: str) -> None:
+    bump_versions(collection_version_key(collection_id))
+
+
+def invalidate_course_progress(course_id: str) -> None:
+    """Analíticas de progreso del curso (p. ej. el embudo de abandono).
+    Llamar tras registrar o borrar progreso."""
+    bump_versions(progress_version_key(course_id))
+
+
+# ── Lectura ───────────────────────────────────────────────
+
+def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _build_response(request: Request, entry: dict, private: bool = False) -> Response:
+    headers = {
+        "ETag": entry["etag"],
+        "Last-Modified": formatdate(entry["last_modified"], usegmt=True),
+        "Cache-Control": f"{'private' if private else 'public'}, max-age=0, must-revalidate",
+    }
+    if _not_modified(request, entry["etag"], entry["last_modified"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+
+def cached_response(
+    request: Request,
+    namespace: str,
+    version_keys: Iterable[str],
+    builder: Callable[[], object],
+    ttl: int = DEFAULT_TTL,
+    private: bool = False,
+) -> Response:
+    """Devuelve la respuesta cacheada para (namespace, versiones, query string)
+    o la construye con `builder()` y la guarda. Las excepciones de `builder`
+    (p. ej. 404) se propagan sin cachear nada.
+
+    Con `private=True` (datos de un usuario; el permiso se comprueba antes de
+    llamar) la respuesta no se marca como cacheable por proxies compartidos."""
+    version_keys = list(version_keys)
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+
+    key = None
+    try:
+        versions = redis_client.mget(version_keys) if version_keys else []
+        version_tag = ".".join(v or "0" for v in versions)
+        key = f"cache:resp:{namespace}:{request.url.path}:{version_tag}:{hashlib.sha1(params.encode()).hexdigest()}"
+        raw = redis_client.get(key)
+        if raw:
+            return _build_response(request, json.loads(raw), private)
+    except redis.RedisError as e:
+        logger.warning(f"Caché no disponible para {namespace}: {e}")
+        key = None
+
+    body = json.dumps(jsonable_encoder(builder()), separators=(",", ":"), ensure_ascii=False)
+    entry = {
+        "etag": f'"{hashlib.sha1(body.encode()).hexdigest()}"',
+        "last_modified": time.time(),
+        "body": body,
+    }
+
+    if key:
+        try:
+            redis_client.setex(key, ttl, json.dumps(entry))
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo guardar en caché {namespace}: {e}")
+
+    return _build_response(request, entry, private)
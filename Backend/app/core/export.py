@@ -0,0 +1,163 @@
+"""Exportación de consultas grandes como CSV o Parquet en streaming.
+
+Las filas se leen con un cursor de servidor (yield_per) y se escriben por
+bloques de EXPORT_CHUNK_ROWS, así que la memoria no depende del tamaño del
+resultado. El generador abre su propia sesión: la de la petición ya se ha
+cerrado cuando StreamingResponse empieza a enviar el cuerpo.
+
+Parquet necesita pyarrow (dependencia opcional); sin él solo hay CSV.
+"""
+import csv
+import io
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from app.database import SessionLocal
+
+EXPORT_CHUNK_ROWS = 1000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def select_columns(requested: Optional[str], available: dict[str, str]) -> dict[str, str]:
+    """Columnas pedidas ("a,b,c") en ese orden, o todas si no se indica ninguna.
+    `available` es {nombre: tipo} con tipo string/int/float/timestamp."""
+    if not requested:
+        return dict(available)
+    names = [name.strip() for name in requested.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Columnas no válidas: {', '.join(unknown) or '(vacío)'}. "
+                   f"Disponibles: {', '.join(available)}",
+        )
+    return {name: available[name] for name in names}
+
+
+def _value(value, kind: str):
+    if value is None:
+        return None
+    if kind == "float":
+        return float(value)
+    if kind == "int":
+        return int(value)
+    if kind == "timestamp" and isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _batches(statement: Select, columns: dict[str, str]) -> Iterator[list[tuple]]:
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        for partition in result.partitions():
+            yield [
+                tuple(_value(getattr(row, name), kind) for name, kind in columns.items())
+                for row in partition
+            ]
+    finally:
+        db.close()
+
+
+# Una celda de texto que empieza así se evalúa como fórmula al abrir el CSV
+# en una hoja de cálculo (inyección de fórmulas); se antepone una comilla
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunks(batches: Iterable[list[tuple]], columns: dict[str, str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([_csv_cell(v) for v in row] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Fichero de solo escritura que acumula bytes hasta que se vacía."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_chunks(batches: Iterable[list[tuple]], columns: dict[str, str]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    schema = pa.schema([(name, types[kind]) for name, kind in columns.items()])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in batches:
+            # Un row group por bloque
+            arrays = [
+                pa.array([row[i] for row in batch], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_response(statement: Select, columns: dict[str, str], fmt: str, filename: str) -> StreamingResponse:
+    """StreamingResponse con el resultado de `statement` en formato `fmt`."""
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(500, "pyarrow no está instalado")
+        chunks = _parquet_chunks(_batches(statement, columns), columns)
+    else:
+        chunks = _csv_chunks(_batches(statement, columns), columns)
+
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
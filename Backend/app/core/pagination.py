@@ -0,0 +1,128 @@
+"""Paginación por cursor (keyset) compartida por los listados.
+
+El modo offset (page/limit) sigue siendo el comportamiento por defecto de cada
+endpoint. El modo cursor se activa enviando `?cursor=` (vacío para la primera
+página) y devuelve `next_cursor` para pedir la siguiente; nunca usa OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+
+
+class CursorPage(NamedTuple):
+    items: list
+    next_cursor: Optional[str]
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _expected_type(key):
+    try:
+        return key.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def decode_cursor(cursor: str, keys: list) -> list:
+    """Valores del cursor, uno por columna de `keys` y del tipo de la columna.
+    Un cursor manipulado da 400 antes de llegar a la base de datos."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        values = [_load(v) for v in values]
+        for value, key in zip(values, keys):
+            expected = _expected_type(key)
+            # bool es subclase de int: un entero no vale como booleano ni al revés
+            if expected is not None and (
+                not isinstance(value, expected) or isinstance(value, bool) != (expected is bool)
+            ):
+                raise ValueError
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def paginate_keyset(query: Query, keys: list, cursor: Optional[str], limit: int) -> CursorPage:
+    """Aplica keyset pagination descendente sobre `keys` (p. ej. created_at, id).
+
+    `keys` debe terminar en una columna única para que el orden sea total, y
+    ninguna puede admitir NULL: la comparación de tuplas no encuentra esas
+    filas (las columnas de cursor se declaran nullable=False).
+    `cursor` vacío o None devuelve la primera página. El query no debe traer
+    order_by propio: se ordena por `keys` descendente.
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit debe ser al menos 1")
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        query = query.filter(tuple_(*keys) < tuple_(*values))
+
+    rows = query.order_by(*[k.desc() for k in keys]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, k.key) for k in keys])
+
+    return CursorPage(rows, next_cursor)
+
+
+def estimate_count(db: Session, query: Query) -> int:
+    """Total aproximado según el planificador (EXPLAIN), sin recorrer las filas."""
+    # Valores en línea (también los IN expandidos) y sin parámetros que
+    # reescribir: el driver recibe la sentencia tal cual
+    compiled = query.statement.compile(
+        dialect=postgresql.dialect(paramstyle="named"),
+        compile_kwargs={"literal_binds": True},
+    )
+    plan = db.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled.string}",
+        execution_options={"no_parameters": True},
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_for_mode(db: Session, query: Query, mode: str) -> Optional[int]:
+    """Total según el modo pedido por el cliente: exact, estimated o none."""
+    if mode == "exact":
+        return query.count()
+    if mode == "estimated":
+        return estimate_count(db, query)
+    return None
+
+
+def cursor_meta(limit: int, next_cursor: Optional[str], total: Optional[int], count_mode: str) -> dict:
+    """Bloque `pagination` de las respuestas en modo cursor."""
+    return {
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "has_next": next_cursor is not None,
+        "total": total,
+        "total_is_estimate": count_mode == "estimated",
+    }
@@ -0,0 +1,72 @@
+"""Tareas periódicas en segundo plano.
+
+Cada tarea corre en un hilo daemon propio que la ejecuta cada `interval`
+segundos con su propia sesión de base de datos. Con varios workers, un lock
+en Redis (SET NX EX) evita que la misma tarea se ejecute a la vez en todos;
+si Redis no está disponible la tarea se ejecuta igualmente.
+
+Se arranca desde main.py en el evento de startup si SCHEDULER_ENABLED.
+"""
+import logging
+import threading
+from typing import Callable
+
+import redis
+from sqlalchemy.orm import Session
+
+from app.core.redis_config import redis_client
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_jobs: dict[str, tuple[int, Callable[[Session], object]]] = {}
+_threads: list[threading.Thread] = []
+_stop = threading.Event()
+
+
+def register_job(name: str, interval: int, func: Callable[[Session], object]) -> None:
+    """Registra `func(db)` para ejecutarse cada `interval` segundos."""
+    _jobs[name] = (interval, func)
+
+
+def _acquire(name: str, interval: int) -> bool:
+    try:
+        return bool(redis_client.set(f"scheduler:lock:{name}", "1", nx=True, ex=max(interval - 1, 1)))
+    except redis.RedisError:
+        return True
+
+
+def run_job(name: str) -> None:
+    _, func = _jobs[name]
+    db = SessionLocal()
+    try:
+        func(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Tarea periódica '{name}' falló: {e}")
+    finally:
+        db.close()
+
+
+def _loop(name: str, interval: int) -> None:
+    # Primera ejecución al arrancar para no servir datos viejos tras un deploy
+    while not _stop.is_set():
+        if _acquire(name, interval):
+            run_job(name)
+        _stop.wait(interval)
+
+
+def start() -> None:
+    _stop.clear()
+    for name, (interval, _) in _jobs.items():
+        thread = threading.Thread(target=_loop, args=(name, interval), name=f"job-{name}", daemon=True)
+        thread.start()
+        _threads.append(thread)
+    logger.info(f"Scheduler iniciado: {', '.join(_jobs) or 'sin tareas'}")
+
+
+def stop() -> None:
+    _stop.set()
+    for thread in _threads:
+        thread.join(timeout=5)
+    _threads.clear()
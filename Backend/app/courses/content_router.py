@@ -1,18 +1,23 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Form, Header
 from fastapi.responses import RedirectResponse
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.database import get_db
-from app.models.courses import Course, ContentBlock, Module
+from app.models.courses import Course, ContentBlock, Module, UserProgress
 from app.models.users import User, UserRole
 from app.dependencies import get_current_user, get_optional_user
 from app.schemas.courses import  ContentBlockBase,  CourseContentResponse
-from app.models.orders import Order, OrderStatus
 from app.services.s3_service import s3_service
-from app.services.access import get_accessible_blocks
+from app.services.access import get_accessible_blocks, require_course_access
+from app.core.cache import invalidate_course, invalidate_course_structure, invalidate_course_progress
+from app.services.analytics_rollup import record_progress_removed
+from app.services.enrollment_progress import refresh_total_blocks, record_completion_removed
+from app.services.course_cards import refresh_course_card
 import uuid
+from collections import Counter
 
 router = APIRouter()
 
@@ -174,6 +179,10 @@ def update_block_content(
     if order is not None: block.order = order
 
     db.commit()
+    # Título, tipo y orden de los bloques salen en la ficha pública cacheada
+    invalidate_course(course.id)
+    if order is not None:
+        invalidate_course_structure(course.id)
     db.refresh(block)
 
     return CourseContentResponse(
@@ -206,20 +215,30 @@ def delete_block_content(
     if block.content_url and not block.content_url.startswith("http"):
          s3_service.delete_file(block.content_url)
 
+    # Las compleciones del bloque desaparecen con él: se descuentan de los
+    # contadores de cada alumno igual que al desmarcarlo
+    completions = db.execute(
+        delete(UserProgress)
+        .where(UserProgress.course_id == course.id, UserProgress.module_id == block.id)
+        .returning(UserProgress.user_id, UserProgress.completed_at)
+    ).all()
+    removed_by_user = Counter(row.user_id for row in completions)
+    for row in completions:
+        record_progress_removed(db, course.id, row.completed_at)
+    for user_id, removed in removed_by_user.items():
+        record_completion_removed(db, user_id, course.id, block.id, removed=removed)
+
     db.delete(block)
+    db.flush()
+    refresh_total_blocks(db, course.id)
+    refresh_course_card(db, course.id)
     db.commit()
+    invalidate_course(course.id)
+    invalidate_course_structure(course.id)
+    if completions:
+        invalidate_course_progress(course.id)
     return None
 
-def require_course_access(db: Session, user_id: str, course_id: str):
-    purchase = db.query(Order).filter(
-        Order.user_id == user_id,
-        Order.course_id == course_id,
-        Order.status == OrderStatus.paid
-    ).first()
-
-    if not purchase:
-        raise HTTPException(403, "Debes comprar el curso para acceder al contenido")
-    
 # __STREAMING__ (REDIRECCIÓN A S3)
 @router.get("/blocks/{block_id}/stream")
 def stream_block_content(
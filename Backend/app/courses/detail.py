@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.courses import Course, Module, CourseOffer
+from app.models.orders import Order, OrderStatus
+from app.models.users import User, ProfessionalProfile
+from app.schemas.courses import CourseResponse
+
+
+def _cohort_info(offer: CourseOffer, enrolled: int) -> dict:
+    now = datetime.now(timezone.utc)
+    spots_left = None
+    if offer.max_students:
+        spots_left = max(0, offer.max_students - enrolled)
+
+    return {
+        "enrollment_start": offer.enrollment_start.isoformat() if offer.enrollment_start else None,
+        "enrollment_end": offer.enrollment_end.isoformat() if offer.enrollment_end else None,
+        "course_start": offer.course_start.isoformat() if offer.course_start else None,
+        "course_end": offer.course_end.isoformat() if offer.course_end else None,
+        "max_students": offer.max_students,
+        "enrolled_count": enrolled,
+        "spots_left": spots_left,
+        "enrollment_open": (
+            (not offer.enrollment_start or now >= offer.enrollment_start) and
+            (not offer.enrollment_end or now <= offer.enrollment_end)
+        ),
+        "course_started": (
+            offer.course_start is not None and now >= offer.course_start
+        ),
+    }
+
+
+def _seller_profile(seller: Optional[User], prof: Optional[ProfessionalProfile]) -> Optional[dict]:
+    if not seller:
+        return None
+    return {
+        "id": seller.id,
+        "name": seller.full_name or '',
+        "bio": prof.bio if prof else None,
+        "specialty": prof.specialties[0] if prof and prof.specialties else None,
+        "image": prof.profile_image if prof else None,
+        "credentials": prof.credentials if prof else None,
+    }
+
+
+def load_course_detail(db: Session, course_id: str) -> Optional[dict]:
+    """Carga la ficha pública de un curso con un número fijo de sentencias:
+
+    1. curso + seller + perfil profesional (joins a-uno) + oferta de convocatoria
+       y sus matriculados (subconsultas escalares), en una sola fila
+    2-5. módulos, bloques, ofertas y bibliografía (selectinload, una por relación)
+
+    Devuelve el payload ya serializado a tipos JSON, o None si no existe.
+    """
+    # Convocatoria activa o próxima: la de inicio más temprano
+    convocatoria_id = (
+        select(CourseOffer.id)
+        .where(
+            CourseOffer.course_id == Course.id,
+            CourseOffer.inscription_type == 'convocatoria',
+        )
+        .order_by(CourseOffer.course_start.asc().nulls_last())
+        .limit(1)
+        .scalar_subquery()
+    )
+    enrolled = (
+        select(func.count(Order.id))
+        .where(
+            Order.course_id == Course.id,
+            Order.offer_id == convocatoria_id,
+            Order.status == OrderStatus.paid,
+        )
+        .scalar_subquery()
+    )
+
+    row = (
+        db.query(
+            Course,
+            User,
+            ProfessionalProfile,
+            convocatoria_id.label("convocatoria_id"),
+            enrolled.label("enrolled"),
+        )
+        .outerjoin(User, User.id == Course.seller_id)
+        .outerjoin(ProfessionalProfile, ProfessionalProfile.user_id == Course.seller_id)
+        .options(
+            selectinload(Course.modules).selectinload(Module.blocks),
+            selectinload(Course.offers),
+            selectinload(Course.bibliography),
+        )
+        .filter(Course.id == course_id)
+        .first()
+    )
+    if not row:
+        return None
+
+    course, seller, prof = row.Course, row.User, row.ProfessionalProfile
+
+    payload = CourseResponse.model_validate(course).model_dump(mode="json")
+    payload["modules"].sort(key=lambda m: m["order"])
+    for module in payload["modules"]:
+        module["blocks"].sort(key=lambda b: b["order"])
+
+    active_offer = next((o for o in course.offers if o.id == row.convocatoria_id), None)
+    payload["cohort_info"] = _cohort_info(active_offer, row.enrolled or 0) if active_offer else None
+    payload["seller_profile"] = _seller_profile(seller, prof)
+    return payload
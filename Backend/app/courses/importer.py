@@ -0,0 +1,140 @@
+"""Alta masiva de un curso completo.
+
+Los UUID de curso, módulos, bloques, ofertas y bibliografía se asignan en
+Python antes de escribir, así que no hace falta ningún flush intermedio para
+conocer IDs generados: cada tabla se escribe con un único INSERT multi-fila.
+"""
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.courses import Course, Module, ContentBlock, CourseOffer, Bibliography
+from app.schemas.courses import CourseCreate
+
+
+def _parse_datetime(value: Optional[str], field: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Fecha inválida en '{field}': {value}")
+
+
+def build_course_rows(course_data: CourseCreate, seller_id: str, status: str = "borrador") -> dict[str, list[dict]]:
+    """Convierte el documento del curso en filas listas para insertar, por tabla."""
+    course_id = str(uuid.uuid4())
+
+    rows = {
+        "courses": [{
+            "id": course_id,
+            "title": course_data.titulo,
+            "subtitle": course_data.subtitulo,
+            "category": course_data.categoria,
+            "topic": course_data.tema,
+            "subtopic": course_data.subtema,
+            "level": course_data.nivelCurso,
+            "short_description": course_data.descripcionCorta,
+            "long_description": course_data.descripcionDetallada,
+            "target_audience": course_data.publicoObjetivo,
+            "learning_goals": course_data.queAprendera,
+            "requirements": course_data.requisitos,
+            "status": status,
+            "visibility": course_data.visibilidad,
+            "has_forum": course_data.has_forum or False,
+            "progression_type": course_data.progresionContenido or 'libre',
+            "requires_professional_profile": course_data.requires_professional_profile or False,
+            "seller_id": seller_id,
+            "total_blocks": sum(len(mod_schema.blocks) for mod_schema in course_data.modulos),
+        }],
+        "modules": [],
+        "blocks": [],
+        "offers": [],
+        "bibliography": [],
+    }
+
+    for i, mod_schema in enumerate(course_data.modulos):
+        module_id = str(uuid.uuid4())
+        rows["modules"].append({
+            "id": module_id,
+            "course_id": course_id,
+            "title": mod_schema.title,
+            "description": mod_schema.description,
+            "order": i,
+        })
+        for j, block_schema in enumerate(mod_schema.blocks):
+            rows["blocks"].append({
+                "id": str(uuid.uuid4()),
+                "module_id": module_id,
+                "type": block_schema.type,
+                "title": block_schema.title,
+                "order": j,
+                "content_url": block_schema.content_url,
+                "body_text": block_schema.body_text,
+                "duration": block_schema.duration,
+                "quiz_data": block_schema.quiz_data,
+            })
+
+    for offer in course_data.ofertas:
+        rows["offers"].append({
+            "id": str(uuid.uuid4()),
+            "course_id": course_id,
+            "name_public": offer.name_public,
+            "price_base": offer.price_base,
+            "is_recommended": offer.is_recommended or False,
+            "currency_origin": offer.currency_origin,
+            "country_origin": offer.country_origin,
+            "country_prices": offer.country_prices,
+            "inscription_type": offer.inscription_type or 'siempre',
+            "enrollment_start": _parse_datetime(offer.enrollment_start, "enrollment_start"),
+            "enrollment_end": _parse_datetime(offer.enrollment_end, "enrollment_end"),
+            "course_start": _parse_datetime(offer.course_start, "course_start"),
+            "course_end": _parse_datetime(offer.course_end, "course_end"),
+            "max_students": offer.max_students,
+            "accompaniment": offer.accompaniment,
+            "chat_questions_per_student": offer.chat_questions_per_student,
+            "chat_response_time": offer.chat_response_time,
+            "access_content": offer.access_content or 'vitalicio',
+            "access_months": offer.access_months,
+            "access_type": offer.access_type,
+            "certificate_included": offer.certificate_included,
+            "certificate_min_progress": offer.certificate_min_progress,
+            "certificate_requires_exam": offer.certificate_requires_exam,
+        })
+
+    for bib in course_data.bibliografia:
+        rows["bibliography"].append({
+            "id": str(uuid.uuid4()),
+            "course_id": course_id,
+            "type": bib.type,
+            "reference_text": bib.reference_text,
+            "doi_url": bib.doi_url,
+        })
+
+    return rows
+
+
+_TABLE_MODELS = (
+    ("courses", Course),
+    ("modules", Module),
+    ("blocks", ContentBlock),
+    ("offers", CourseOffer),
+    ("bibliography", Bibliography),
+)
+
+
+def import_course(db: Session, course_data: CourseCreate, seller_id: str) -> tuple[str, dict]:
+    """Inserta el curso completo: una sentencia por tabla, sin flush intermedios.
+    No hace commit. Devuelve (course_id, filas insertadas por tabla)."""
+    rows = build_course_rows(course_data, seller_id)
+
+    # Orden de las FK: curso → módulos → bloques; ofertas y bibliografía al final
+    for name, model in _TABLE_MODELS:
+        if rows[name]:
+            db.execute(insert(model), rows[name])
+
+    return rows["courses"][0]["id"], {name: len(rows[name]) for name, _ in _TABLE_MODELS}
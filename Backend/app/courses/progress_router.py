@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from app.database import get_db
 from app.dependencies import get_current_user
-from app.models.courses import UserProgress, Course, Module, ContentBlock
-from app.models.orders import Order, OrderStatus
+from app.models.courses import UserProgress, Course
 from app.models.users import User
+from app.services.analytics_rollup import record_progress_removed
+from app.services.enrollment_progress import record_completion_removed, progress_percentage, courses_progress_summary
+from app.services.progress_ingest import buffered_mode, buffer_completions, record_completions
+from app.schemas.courses import BlockCompletionBatch
+from app.core.cache import invalidate_course_progress
 import uuid
 
 router = APIRouter(prefix="/courses/{course_id}/progress", tags=["Progress"])
+me_router = APIRouter(prefix="/me", tags=["Progress"])
 
 
 @router.get("/")
@@ -18,28 +23,18 @@ def get_course_progress(
     db: Session = Depends(get_db),
 ):
     """Get user's progress for a course"""
-    completed = (
-        db.query(UserProgress)
-        .filter(
+    completed_block_ids = [
+        row.module_id for row in db.query(UserProgress.module_id).filter(
             UserProgress.user_id == current_user.id,
             UserProgress.course_id == course_id,
         )
-        .all()
-    )
+    ]
 
-    completed_block_ids = [p.module_id for p in completed]
-
-    # Calculate total blocks
-    total_blocks = (
-        db.query(func.count(ContentBlock.id))
-        .join(Module, ContentBlock.module_id == Module.id)
-        .filter(Module.course_id == course_id)
-        .scalar()
-        or 0
-    )
+    # Nº de bloques cacheado en el curso (courses.total_blocks)
+    total_blocks = db.query(Course.total_blocks).filter(Course.id == course_id).scalar() or 0
 
     completed_count = len(completed_block_ids)
-    percentage = round((completed_count / total_blocks * 100) if total_blocks > 0 else 0)
+    percentage = progress_percentage(completed_count, total_blocks)
 
     return {
         "completed_block_ids": completed_block_ids,
@@ -50,6 +45,24 @@ def get_course_progress(
     }
 
 
+def _complete_blocks(db: Session, user_id: str, course_id: str, block_ids: list[str]) -> list[str]:
+    """Registra las compleciones (encoladas en modo buffered). Devuelve los
+    bloques aceptados."""
+    if buffered_mode() and buffer_completions(user_id, course_id, block_ids):
+        return list(dict.fromkeys(block_ids))
+
+    try:
+        inserted = record_completions(db, user_id, course_id, block_ids)
+        db.commit()
+    except IntegrityError:
+        # FK de course_id: el curso no existe
+        db.rollback()
+        raise HTTPException(404, "Curso no encontrado")
+    if inserted:
+        invalidate_course_progress(course_id)
+    return inserted
+
+
 @router.post("/blocks/{block_id}/complete")
 def mark_block_complete(
     course_id: str,
@@ -57,33 +70,21 @@ def mark_block_complete(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Mark a block/lesson as completed"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(404, "Curso no encontrado")
+    """Mark a block/lesson as completed (idempotente)"""
+    _complete_blocks(db, current_user.id, course_id, [block_id])
+    return {"ok": True, "block_id": block_id}
 
-    # Check if already completed
-    existing = (
-        db.query(UserProgress)
-        .filter(
-            UserProgress.user_id == current_user.id,
-            UserProgress.course_id == course_id,
-            UserProgress.module_id == block_id,
-        )
-        .first()
-    )
-
-    if not existing:
-        progress = UserProgress(
-            user_id=current_user.id,
-            course_id=course_id,
-            module_id=block_id,
-            is_completed=True,
-        )
-        db.add(progress)
-        db.commit()
 
-    return {"ok": True, "block_id": block_id}
+@router.post("/blocks/complete")
+def mark_blocks_complete(
+    course_id: str,
+    payload: BlockCompletionBatch,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Mark several blocks as completed in one request (idempotente)"""
+    recorded = _complete_blocks(db, current_user.id, course_id, payload.block_ids)
+    return {"ok": True, "recorded": len(recorded), "block_ids": recorded}
 
 
 @router.delete("/blocks/{block_id}/complete")
@@ -94,70 +95,38 @@ def mark_block_incomplete(
     db: Session = Depends(get_db),
 ):
     """Mark a block as not completed"""
-    db.query(UserProgress).filter(
+    entries = db.query(UserProgress).filter(
         UserProgress.user_id == current_user.id,
         UserProgress.course_id == course_id,
         UserProgress.module_id == block_id,
-    ).delete()
+    ).all()
+    for entry in entries:
+        record_progress_removed(db, course_id, entry.completed_at)
+        db.delete(entry)
+    if entries:
+        record_completion_removed(db, current_user.id, course_id, block_id, removed=len(entries))
     db.commit()
+    if entries:
+        invalidate_course_progress(course_id)
     return {"ok": True}
 
 
 # --- PROGRESS SUMMARY (all purchased courses) ---
-# Note: this endpoint uses a dummy course_id since the router has a prefix.
-# The course_id path param is ignored — it returns progress for ALL purchased courses.
-@router.get("/summary")
-def get_courses_progress_summary(
-    course_id: str,
+@me_router.get("/progress")
+def get_my_progress(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Progress summary for all purchased courses of the current user."""
-    orders = db.query(Order).filter(
-        Order.user_id == current_user.id,
-        Order.status == OrderStatus.paid
-    ).all()
-
-    result = []
-    for order in orders:
-        cid = order.course_id
-        course = db.query(Course).filter(Course.id == cid).first()
-        if not course:
-            continue
-
-        total_blocks = (
-            db.query(func.count(ContentBlock.id))
-            .join(Module, ContentBlock.module_id == Module.id)
-            .filter(Module.course_id == cid)
-            .scalar() or 0
-        )
+    return courses_progress_summary(db, current_user.id)
 
-        completed = db.query(UserProgress).filter(
-            UserProgress.user_id == current_user.id,
-            UserProgress.course_id == cid,
-        ).all()
-
-        completed_count = len(completed)
-        percentage = round((completed_count / total_blocks * 100) if total_blocks > 0 else 0)
-
-        last_progress = (
-            db.query(UserProgress)
-            .filter(
-                UserProgress.user_id == current_user.id,
-                UserProgress.course_id == cid,
-            )
-            .order_by(UserProgress.completed_at.desc())
-            .first()
-        )
 
-        result.append({
-            "course_id": cid,
-            "course_title": course.title,
-            "percentage": percentage,
-            "completed_blocks": completed_count,
-            "total_blocks": total_blocks,
-            "last_block_id": last_progress.module_id if last_progress else None,
-            "is_complete": percentage == 100,
-        })
-
-    return result
+# Ruta antigua: el course_id del prefijo se ignora. Usar GET /me/progress.
+@router.get("/summary", deprecated=True)
+def get_courses_progress_summary(
+    course_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Progress summary for all purchased courses of the current user."""
+    return courses_progress_summary(db, current_user.id)
@@ -1,82 +1,336 @@
+"""Recomendaciones de cursos.
+
+Los cursos publicados se mantienen en memoria como una matriz de
+características por columnas (CourseFeatureMatrix): códigos de categoría,
+tema y nivel, una matriz 0/1 de públicos objetivo, valoración y fecha de
+creación. Puntuar todo el catálogo para un usuario es una pasada vectorizada
+con NumPy y el top-k sale de argpartition; solo los k ganadores se cargan
+como objetos ORM.
+
+Para usuarios con historial se mezcla además la señal colaborativa item-item
+(app/services/course_neighbors.py): la suma de pesos de los vecinos de sus
+cursos comprados y favoritos, normalizada a [0, 1].
+
+La matriz se reconstruye cuando cambia la versión del catálogo en Redis
+(app.core.cache.CATALOG_VERSION_KEY) o tras FEATURE_MATRIX_TTL segundos.
+"""
+import json
+import logging
+import threading
+import time
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Sequence
+
+import numpy as np
+import redis
+from sqlalchemy.orm import Session, selectinload
 
-from app.models.courses import Course
+from app.core.cache import CATALOG_VERSION_KEY, bump_versions
+from app.core.redis_config import redis_client
+from app.models.courses import Course, Module
 from app.models.orders import Order, OrderStatus
 from app.models.users import Favorite
+from app.services.course_neighbors import neighbor_scores
 
+logger = logging.getLogger(__name__)
 
-def get_recommendations(
+FEATURE_MATRIX_TTL = 300
+
+# Pesos del score
+W_CATEGORY = 3.0
+W_TOPIC = 2.0
+W_LEVEL = 1.0
+W_AUDIENCE = 0.5
+W_NEW_30D = 0.5
+W_NEW_90D = 0.2
+W_COLLABORATIVE = 4.0
+
+_FEATURE_COLUMNS = (
+    Course.id, Course.category, Course.topic, Course.level,
+    Course.target_audience, Course.rating_avg, Course.created_at,
+)
+
+
+def _encode(values: Sequence[Optional[str]]) -> tuple[np.ndarray, dict[str, int]]:
+    """Codifica una columna categórica: -1 para vacío, 0..n-1 para el resto."""
+    vocab: dict[str, int] = {}
+    codes = np.fromiter(
+        (vocab.setdefault(v, len(vocab)) if v else -1 for v in values),
+        dtype=np.int32, count=len(values),
+    )
+    return codes, vocab
+
+
+class CourseFeatureMatrix:
+    """Catálogo publicado en formato columnar para puntuar en una pasada."""
+
+    def __init__(self, rows: Sequence[tuple]):
+        n = len(rows)
+        ids, categories, topics, levels, audiences, ratings, created = (
+            zip(*rows) if rows else ((),) * 7
+        )
+        self.ids = np.array(ids, dtype=object)
+        self.index = {course_id: i for i, course_id in enumerate(ids)}
+
+        self.category, self.category_vocab = _encode(categories)
+        self.topic, self.topic_vocab = _encode(topics)
+        self.level, self.level_vocab = _encode(levels)
+
+        # Públicos objetivo: matriz n × públicos (0/1)
+        self.audience_vocab: dict[str, int] = {}
+        pairs = [
+            (i, self.audience_vocab.setdefault(a, len(self.audience_vocab)))
+            for i, values in enumerate(audiences) for a in (values or ())
+        ]
+        self.audience = np.zeros((n, len(self.audience_vocab)), dtype=np.float32)
+        if pairs:
+            rows_idx, cols_idx = zip(*pairs)
+            self.audience[list(rows_idx), list(cols_idx)] = 1.0
+
+        self.rating = np.array([r or 0.0 for r in ratings], dtype=np.float32)
+        self.created_ts = np.array(
+            [c.timestamp() if c else np.nan for c in created], dtype=np.float64
+        )
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _codes(vocab: dict[str, int], values) -> np.ndarray:
+        return np.array([vocab[v] for v in values if v in vocab], dtype=np.int32)
+
+    def score(
+        self,
+        categories=(),
+        topics=(),
+        levels=(),
+        audiences=(),
+        now: Optional[datetime] = None,
+        neighbor_weights: Optional[dict[str, float]] = None,
+    ) -> np.ndarray:
+        """Score de todos los cursos para las preferencias dadas.
+        `neighbor_weights` ({curso: peso}) añade la señal colaborativa."""
+        score = self.rating / 5.0
+
+        score += W_CATEGORY * np.isin(self.category, self._codes(self.category_vocab, categories))
+        score += W_TOPIC * np.isin(self.topic, self._codes(self.topic_vocab, topics))
+        score += W_LEVEL * np.isin(self.level, self._codes(self.level_vocab, levels))
+
+        audience_idx = self._codes(self.audience_vocab, audiences)
+        if audience_idx.size:
+            score += W_AUDIENCE * self.audience[:, audience_idx].sum(axis=1)
+
+        now_ts = (now or datetime.now(timezone.utc)).timestamp()
+        days_old = (now_ts - self.created_ts) / 86400.0
+        with np.errstate(invalid="ignore"):
+            score += np.where(days_old < 30, W_NEW_30D, np.where(days_old < 90, W_NEW_90D, 0.0))
+
+        if neighbor_weights:
+            score += W_COLLABORATIVE * self._collaborative(neighbor_weights)
+        return score
+
+    def _collaborative(self, neighbor_weights: dict[str, float]) -> np.ndarray:
+        cf = np.zeros(len(self), dtype=np.float32)
+        hits = [(self.index[c], w) for c, w in neighbor_weights.items() if c in self.index]
+        if hits:
+            idx, weights = zip(*hits)
+            cf[list(idx)] = weights
+            cf /= cf.max()
+        return cf
+
+    def top_k(self, score: np.ndarray, k: int, exclude_ids=()) -> list[str]:
+        """IDs de los k mejores, excluyendo `exclude_ids`, de mayor a menor score."""
+        if not len(self):
+            return []
+        score = score.astype(np.float64, copy=True)
+        excluded = [self.index[c] for c in exclude_ids if c in self.index]
+        if excluded:
+            score[excluded] = -np.inf
+        available = len(self) - len(excluded)
+        k = min(k, available)
+        if k <= 0:
+            return []
+        if k < len(score):
+            top = np.argpartition(-score, k - 1)[:k]
+        else:
+            top = np.arange(len(score))
+        top = top[np.argsort(-score[top], kind="stable")]
+        return self.ids[top].tolist()
+
+
+_matrix: Optional[CourseFeatureMatrix] = None
+_matrix_version: Optional[str] = None
+_matrix_lock = threading.Lock()
+
+
+def _catalog_version() -> Optional[str]:
+    try:
+        return redis_client.get(CATALOG_VERSION_KEY) or "0"
+    except redis.RedisError:
+        return None
+
+
+def get_feature_matrix(db: Session) -> CourseFeatureMatrix:
+    """Matriz del catálogo publicado de este proceso, reconstruida si el
+    catálogo cambió o caducó."""
+    global _matrix, _matrix_version
+    version = _catalog_version()
+    with _matrix_lock:
+        fresh = (
+            _matrix is not None
+            and time.monotonic() - _matrix.built_at < FEATURE_MATRIX_TTL
+            and (version is None or version == _matrix_version)
+        )
+        if not fresh:
+            rows = db.query(*_FEATURE_COLUMNS).filter(Course.status == "publicado").all()
+            _matrix = CourseFeatureMatrix([tuple(r) for r in rows])
+            _matrix_version = version
+        return _matrix
+
+
+def _load_courses(db: Session, course_ids: list[str]) -> list[Course]:
+    """Carga los cursos recomendados conservando el orden del ranking."""
+    if not course_ids:
+        return []
+    courses = db.query(Course).options(
+        selectinload(Course.modules).selectinload(Module.blocks),
+        selectinload(Course.offers),
+        selectinload(Course.bibliography),
+    ).filter(Course.id.in_(course_ids)).all()
+    by_id = {c.id: c for c in courses}
+    return [by_id[c] for c in course_ids if c in by_id]
+
+
+def recommended_course_ids(
     db: Session,
     user_id: Optional[str] = None,
     limit: int = 6,
-) -> list[Course]:
-    base_query = db.query(Course).filter(Course.status == "publicado")
-
+) -> list[str]:
+    """Calcula la lista recomendada (IDs en orden) sin pasar por la caché."""
     if not user_id:
-        return base_query.order_by(
+        rows = db.query(Course.id).filter(Course.status == "publicado").order_by(
             Course.rating_avg.desc(),
             Course.rating_count.desc(),
             Course.created_at.desc(),
         ).limit(limit).all()
+        return [row.id for row in rows]
 
-    # Gather user signals
-    purchased_ids = [
-        o.course_id for o in db.query(Order).filter(
+    # Señales del usuario
+    purchased_ids = {
+        row.course_id for row in db.query(Order.course_id).filter(
             Order.user_id == user_id,
             Order.status == OrderStatus.paid,
-        ).all()
-    ]
-
-    favorite_ids = [
-        f.course_id for f in db.query(Favorite).filter(
+        )
+    }
+    favorite_ids = {
+        row.course_id for row in db.query(Favorite.course_id).filter(
             Favorite.user_id == user_id,
-        ).all()
-    ]
+        )
+    }
+    signal_ids = purchased_ids | favorite_ids
 
-    signal_ids = list(set(favorite_ids + purchased_ids))
+    categories, topics, levels, audiences = set(), set(), set(), set()
+    if signal_ids:
+        for c in db.query(
+            Course.category, Course.topic, Course.level, Course.target_audience
+        ).filter(Course.id.in_(signal_ids)):
+            if c.category:
+                categories.add(c.category)
+            if c.topic:
+                topics.add(c.topic)
+            if c.level:
+                levels.add(c.level)
+            audiences.update(c.target_audience or ())
 
-    # Extract preference signals
-    preferred_categories: list[str] = []
-    preferred_topics: list[str] = []
-    preferred_levels: list[str] = []
-    preferred_audiences: list[str] = []
+    matrix = get_feature_matrix(db)
+    score = matrix.score(
+        categories, topics, levels, audiences,
+        neighbor_weights=neighbor_scores(db, signal_ids),
+    )
+    return matrix.top_k(score, limit, exclude_ids=purchased_ids)
 
-    if signal_ids:
-        signal_courses = db.query(Course).filter(Course.id.in_(signal_ids)).all()
-        preferred_categories = list({c.category for c in signal_courses if c.category})
-        preferred_topics = list({c.topic for c in signal_courses if c.topic})
-        preferred_levels = list({c.level for c in signal_courses if c.level})
-        for c in signal_courses:
-            if c.target_audience:
-                preferred_audiences.extend(c.target_audience)
-        preferred_audiences = list(set(preferred_audiences))
-
-    # Exclude purchased courses
-    all_courses = base_query.all()
-    candidates = [c for c in all_courses if c.id not in set(purchased_ids)]
-
-    def score_course(course: Course) -> float:
-        s = 0.0
-        if course.category and course.category in preferred_categories:
-            s += 3.0
-        if course.topic and course.topic in preferred_topics:
-            s += 2.0
-        if course.level and course.level in preferred_levels:
-            s += 1.0
-        if course.target_audience and preferred_audiences:
-            overlap = len(set(course.target_audience) & set(preferred_audiences))
-            s += overlap * 0.5
-        if course.rating_avg and course.rating_avg > 0:
-            s += course.rating_avg / 5.0
-        if course.created_at:
-            days_old = (datetime.now(timezone.utc) - course.created_at).days
-            if days_old < 30:
-                s += 0.5
-            elif days_old < 90:
-                s += 0.2
-        return s
-
-    scored = sorted(candidates, key=score_course, reverse=True)
-    return scored[:limit]
+
+# ── Caché de listas recomendadas ──────────────────────────
+#
+# Clave: reco:list:{usuario|anon}:{versión usuario}:{versión publicados}:{limit}
+# - la versión de usuario sube con un pedido pagado o un cambio de favoritos
+# - la versión de publicados sube al publicar o despublicar un curso
+# Los aciertos y fallos se cuentan en el hash reco:stats.
+
+RECO_USER_TTL = 600
+RECO_ANON_TTL = 300
+RECO_PUBLISHED_VERSION_KEY = "reco:ver:published"
+RECO_STATS_KEY = "reco:stats"
+
+
+def _user_version_key(user_id: str) -> str:
+    return f"reco:ver:user:{user_id}"
+
+
+def invalidate_user_recommendations(user_id: str) -> None:
+    """Llamar tras un pedido pagado o al añadir/quitar un favorito."""
+    bump_versions(_user_version_key(user_id))
+
+
+def invalidate_published_recommendations() -> None:
+    """Llamar al publicar o despublicar un curso: invalida todas las listas."""
+    bump_versions(RECO_PUBLISHED_VERSION_KEY)
+
+
+def _cached_ids(db: Session, user_id: Optional[str], limit: int) -> list[str]:
+    audience = "user" if user_id else "anon"
+    try:
+        version_keys = [RECO_PUBLISHED_VERSION_KEY] + ([_user_version_key(user_id)] if user_id else [])
+        versions = ".".join(v or "0" for v in redis_client.mget(version_keys))
+        key = f"reco:list:{user_id or 'anon'}:{versions}:{limit}"
+        raw = redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Caché de recomendaciones no disponible: {e}")
+        return recommended_course_ids(db, user_id, limit)
+
+    if raw is not None:
+        try:
+            redis_client.hincrby(RECO_STATS_KEY, f"{audience}_hits", 1)
+        except redis.RedisError:
+            pass
+        return json.loads(raw)
+
+    course_ids = recommended_course_ids(db, user_id, limit)
+    try:
+        pipe = redis_client.pipeline()
+        pipe.setex(key, RECO_USER_TTL if user_id else RECO_ANON_TTL, json.dumps(course_ids))
+        pipe.hincrby(RECO_STATS_KEY, f"{audience}_misses", 1)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"No se pudo guardar en la caché de recomendaciones: {e}")
+    return course_ids
+
+
+def get_recommendations(
+    db: Session,
+    user_id: Optional[str] = None,
+    limit: int = 6,
+) -> list[Course]:
+    return _load_courses(db, _cached_ids(db, user_id, limit))
+
+
+def recommendation_cache_stats() -> dict:
+    """Aciertos, fallos y ratio de aciertos de la caché, por tipo de usuario.
+    Sin Redis los contadores salen a cero."""
+    try:
+        raw = redis_client.hgetall(RECO_STATS_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Estadísticas de la caché de recomendaciones no disponibles: {e}")
+        raw = {}
+    stats = {}
+    for audience in ("user", "anon"):
+        hits = int(raw.get(f"{audience}_hits", 0))
+        misses = int(raw.get(f"{audience}_misses", 0))
+        total = hits + misses
+        stats[audience] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+    return stats
@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.courses import Course, CourseReview
-from app.models.orders import Order, OrderStatus
+from app.services.entitlements import require_enrollment
 from app.models.users import User
 from app.schemas.courses import CourseReviewCreate, CourseReviewResponse
 from app.services.ratings import update_course_rating
@@ -20,14 +20,7 @@ def create_review(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    has_bought = db.query(Order).filter(
-        Order.user_id == current_user.id,
-        Order.course_id == course_id,
-        Order.status == OrderStatus.paid
-    ).first()
-
-    if not has_bought:
-        raise HTTPException(status_code=403, detail="Debes comprar el curso para valorarlo")
+    require_enrollment(db, current_user.id, course_id, "Debes comprar el curso para valorarlo")
 
     existing = db.query(CourseReview).filter(
         CourseReview.user_id == current_user.id,
@@ -1,15 +1,28 @@
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, UploadFile, File as FastAPIFile
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request, Response, UploadFile, File as FastAPIFile
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_, func as sqlfunc
 from typing import List, Optional
 from app.database import get_db
-from app.models.courses import Course, Module, Bibliography, CourseOffer, ContentBlock
+from app.models.courses import Course, Module, Bibliography, CourseOffer, ContentBlock, CourseCard, RelatedCourse, CourseNeighbor
 from app.models.orders import Order, OrderStatus
 from app.schemas.courses import CourseCreate, CourseResponse, CourseUpdate
 from app.dependencies import get_current_user, get_optional_user
 from app.models.users import User, UserRole
-from app.courses.recommendations import get_recommendations
+from app.courses.recommendations import get_recommendations, invalidate_published_recommendations
+from app.courses.search import search_courses, search_predicate
+from app.courses.detail import load_course_detail
+from app.courses.structure import sync_course_structure
+from app.courses.importer import import_course
+from app.core.pagination import paginate_keyset, cursor_meta, count_for_mode
+from app.core.cache import (
+    cached_response, invalidate_course, invalidate_course_structure, course_version_key, CATALOG_VERSION_KEY,
+)
+from app.services.course_stats import min_prices_by_course, total_blocks_by_course
+from app.services.course_cards import refresh_course_card, card_to_dict
+from app.services.platform_stats import get_platform_stats, bump_platform_stats
+from app.services.related_courses import refresh_related_courses, refresh_related_for_course
+from app.services.entitlements import invalidate_entitlements
 import uuid
 import logging
 
@@ -33,106 +46,79 @@ def create_course(
         raise HTTPException(status_code=403, detail="Solo los sellers pueden crear cursos")
 
     try:
-        # 2. Crear la cabecera del curso
-        new_course = Course(
-            title=course_data.titulo,
-            subtitle=course_data.subtitulo,
-            category=course_data.categoria,
-            topic=course_data.tema,
-            subtopic=course_data.subtema,
-            level=course_data.nivelCurso,
-            short_description=course_data.descripcionCorta,
-            long_description=course_data.descripcionDetallada,
-            target_audience=course_data.publicoObjetivo,
-            learning_goals=course_data.queAprendera,
-            requirements=course_data.requisitos,
-            status="borrador",
-            visibility=course_data.visibilidad,
-            has_forum=course_data.has_forum or False,
-            progression_type=course_data.progresionContenido or 'libre',
-            requires_professional_profile=course_data.requires_professional_profile or False,
-            seller_id=current_user.id
-        )
-        db.add(new_course)
-        db.flush() # Flush genera el ID del curso sin hacer commit todavía
-
-        # 3. Guardar Bibliografía
-        for bib in course_data.bibliografia:
-            new_bib = Bibliography(
-                course_id=new_course.id,
-                type=bib.tipo,
-                reference_text=bib.referencia,
-                doi_url=bib.enlaceDOI
-            )
-            db.add(new_bib)
-
-        # 4. Guardar Ofertas (Precios)
-        for offer in course_data.ofertas:
-            new_offer = CourseOffer(
-                course_id=new_course.id,
-                name_public=offer.name_public,
-                price_base=offer.price_base,
-                is_recommended=offer.is_recommended or False,
-                currency_origin=offer.currency_origin,
-                country_origin=offer.country_origin,
-                country_prices=offer.country_prices,
-                inscription_type=offer.inscription_type or 'siempre',
-                max_students=offer.max_students,
-                accompaniment=offer.accompaniment,
-                chat_questions_per_student=offer.chat_questions_per_student,
-                chat_response_time=offer.chat_response_time,
-                access_content=offer.access_content or 'vitalicio',
-                access_months=offer.access_months,
-                access_type=offer.access_type,
-                certificate_included=offer.certificate_included,
-                certificate_min_progress=offer.certificate_min_progress,
-                certificate_requires_exam=offer.certificate_requires_exam,
-            )
-            db.add(new_offer)
-
-        # 5. Guardar Módulos y sus Bloques (Jerarquía)
-        for i, mod_schema in enumerate(course_data.modulos):
-            new_module = Module(
-                course_id=new_course.id,
-                title=mod_schema.title,
-                description=mod_schema.description,
-                order=i
-            )
-            db.add(new_module)
-            db.flush() # Genera ID del módulo
-
-            for j, block_schema in enumerate(mod_schema.blocks):
-                new_block = ContentBlock(
-                    module_id=new_module.id,
-                    type=block_schema.type,
-                    title=block_schema.title,
-                    order=j,
-                    content_url=block_schema.content_url,
-                    body_text=block_schema.body_text,
-                    duration=block_schema.duration,
-                    quiz_data=block_schema.quiz_data
-                )
-                db.add(new_block)
+        # Curso, bibliografía, ofertas, módulos y bloques: un INSERT por tabla
+        course_id, _ = import_course(db, course_data, current_user.id)
 
+        refresh_course_card(db, course_id)
         db.commit()
-        db.refresh(new_course)
-        return new_course
+        invalidate_course(course_id)
+        return db.query(Course).filter(Course.id == course_id).first()
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         logger.error(f"Error creando curso: {e}")
         raise HTTPException(status_code=500, detail="Error interno al procesar la estructura del curso")
     
-@router.get("/")
+@router.post(
+    "/import",
+    status_code=status.HTTP_201_CREATED,
+    summary="Importar un curso completo",
+    description="Crea un borrador a partir de un documento de curso completo (cabecera, módulos con bloques y quizzes, ofertas con fechas de convocatoria y bibliografía). Los IDs se asignan antes de escribir y cada tabla se inserta con una única sentencia multi-fila."
+)
+def import_course_endpoint(
+    course_data: CourseCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if str(current_user.role) != UserRole.seller.value:
+        raise HTTPException(status_code=403, detail="Solo los sellers pueden crear cursos")
+
+    try:
+        course_id, inserted = import_course(db, course_data, current_user.id)
+        refresh_course_card(db, course_id)
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error importando curso: {e}")
+        raise HTTPException(status_code=500, detail="Error interno al importar el curso")
+
+    invalidate_course(course_id)
+    return {"id": course_id, "inserted": inserted}
+
+
+@router.get(
+    "/",
+    summary="Listar cursos",
+    description="Paginación por page/limit (por defecto) o por cursor: enviar `cursor=` vacío para la primera página y `next_cursor` para las siguientes. `count` controla el total en modo cursor: none (por defecto), estimated o exact."
+)
 def list_courses(
+    request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     seller_id: str | None = Query(None),
     category: str | None = Query(None),
     status: str | None = Query(None),
     search: str | None = Query(None),
+    view: str = Query("full", pattern="^(full|card)$", description="'card' sirve la proyección course_cards"),
+    cursor: str | None = Query(None, description="Cursor opaco (modo keyset)"),
+    count: str = Query("none", pattern="^(exact|estimated|none)$", description="Total en modo cursor"),
     db: Session = Depends(get_db),
 ):
+    if view == "card":
+        builder = lambda: _list_course_cards(page, limit, seller_id, category, status, search, cursor, count, db)
+    else:
+        builder = lambda: _list_courses_full(page, limit, seller_id, category, status, search, cursor, count, db)
+    return cached_response(request, "courses_list", [CATALOG_VERSION_KEY], builder)
+
+
+def _list_courses_full(page, limit, seller_id, category, status, search, cursor, count, db: Session):
+
     query = db.query(Course)
 
     if seller_id:
@@ -142,39 +128,155 @@ def list_courses(
     if status:
         query = query.filter(Course.status == status)
     if search:
-        query = query.filter(
-            Course.title.ilike(f"%{search}%")
-            | Course.short_description.ilike(f"%{search}%")
-        )
+        predicate = search_predicate(search)
+        if predicate is not None:
+            query = query.filter(predicate)
+
+    # Las relaciones que serializa CourseResponse se cargan con selectin
+    # (una consulta por relación para toda la página, no por curso)
+    eager = (
+        selectinload(Course.modules).selectinload(Module.blocks),
+        selectinload(Course.offers),
+        selectinload(Course.bibliography),
+    )
 
-    total = query.count()
-    courses_db = query.order_by(Course.created_at.desc()).offset(
-        (page - 1) * limit
-    ).limit(limit).all()
+    if cursor is not None:
+        courses_db, next_cursor = paginate_keyset(
+            query.options(*eager), [Course.created_at, Course.id], cursor, limit
+        )
+        pagination = cursor_meta(limit, next_cursor, count_for_mode(db, query, count), count)
+    else:
+        # El total viaja en la misma sentencia como COUNT(*) OVER ()
+        rows = query.add_columns(sqlfunc.count().over().label("total")).options(*eager).order_by(
+            Course.created_at.desc()
+        ).offset((page - 1) * limit).limit(limit).all()
+
+        courses_db = [row[0] for row in rows]
+        if rows:
+            total = rows[0].total
+        else:
+            # Página fuera de rango: no hay filas de las que leer el total
+            total = query.count() if page > 1 else 0
+        pagination = _offset_meta(page, limit, total)
+
+    # min_price y total_blocks de toda la página en una consulta agrupada cada uno
+    course_ids = [c.id for c in courses_db]
+    min_prices = min_prices_by_course(db, course_ids)
+    block_counts = total_blocks_by_course(db, course_ids)
 
-    # Compute min_price and total_blocks for each course
     result = []
     for course in courses_db:
         course_dict = CourseResponse.model_validate(course).model_dump()
+        course_dict["min_price"] = min_prices.get(course.id)
+        course_dict["total_blocks"] = block_counts.get(course.id, 0)
+        result.append(course_dict)
 
-        min_price = (
-            db.query(sqlfunc.min(CourseOffer.price_base))
-            .filter(CourseOffer.course_id == course.id)
-            .scalar()
-        )
-        total_blocks = (
-            db.query(sqlfunc.count(ContentBlock.id))
-            .join(Module, ContentBlock.module_id == Module.id)
-            .filter(Module.course_id == course.id)
-            .scalar() or 0
+    return {"data": result, "pagination": pagination}
+
+
+def _offset_meta(page: int, limit: int, total: int) -> dict:
+    return {
+        "page": page,
+        "limit": limit,
+        "total": total,
+        "pages": (total + limit - 1) // limit,
+        "has_next": page * limit < total,
+        "has_prev": page > 1,
+    }
+
+
+def _list_course_cards(page, limit, seller_id, category, status, search, cursor, count, db: Session):
+    """Listado servido desde course_cards: un único escaneo indexado, sin joins."""
+    query = db.query(CourseCard)
+
+    if seller_id:
+        query = query.filter(CourseCard.seller_id == seller_id)
+    if category:
+        query = query.filter(CourseCard.category.ilike(f"%{category}%"))
+    if status:
+        query = query.filter(CourseCard.status == status)
+    if search:
+        predicate = search_predicate(search)
+        if predicate is not None:
+            query = query.filter(CourseCard.course_id.in_(
+                db.query(Course.id).filter(predicate)
+            ))
+
+    if cursor is not None:
+        cards, next_cursor = paginate_keyset(
+            query, [CourseCard.created_at, CourseCard.course_id], cursor, limit
         )
+        return {
+            "data": [card_to_dict(card) for card in cards],
+            "pagination": cursor_meta(limit, next_cursor, count_for_mode(db, query, count), count),
+        }
 
-        course_dict["min_price"] = min_price
-        course_dict["total_blocks"] = total_blocks
-        result.append(course_dict)
+    rows = query.add_columns(sqlfunc.count().over().label("total")).order_by(
+        CourseCard.created_at.desc()
+    ).offset((page - 1) * limit).limit(limit).all()
+
+    if rows:
+        total = rows[0].total
+    else:
+        total = query.count() if page > 1 else 0
+
+    return {
+        "data": [card_to_dict(row[0]) for row in rows],
+        "pagination": _offset_meta(page, limit, total),
+    }
+
+# --- SEARCH ---
+@router.get(
+    "/search",
+    summary="Búsqueda full-text de cursos",
+    description="Búsqueda rankeada sobre título, subtítulo, descripciones, tema, categoría y público objetivo (español, sin acentos). El último término se busca como prefijo para autocompletado. Devuelve fragmentos resaltados con <mark>."
+)
+def search_courses_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=50),
+    category: str | None = Query(None),
+    status: str | None = Query("publicado"),
+    seller_id: str | None = Query(None),
+    prefix: bool = Query(True, description="Tratar el último término como prefijo"),
+    db: Session = Depends(get_db),
+):
+    rows, total = search_courses(
+        db, q,
+        category=category, status=status, seller_id=seller_id,
+        page=page, limit=limit, prefix=prefix,
+    )
+
+    course_ids = [row.Course.id for row in rows]
+    min_prices = min_prices_by_course(db, course_ids)
+    block_counts = total_blocks_by_course(db, course_ids)
+
+    data = []
+    for row in rows:
+        course = row.Course
+        data.append({
+            "id": course.id,
+            "title": course.title,
+            "subtitle": course.subtitle,
+            "short_description": course.short_description,
+            "category": course.category,
+            "level": course.level,
+            "banner_url": course.banner_url,
+            "seller_id": course.seller_id,
+            "status": course.status,
+            "rating_avg": float(course.rating_avg or 0),
+            "rating_count": int(course.rating_count or 0),
+            "min_price": min_prices.get(course.id),
+            "total_blocks": block_counts.get(course.id, 0),
+            "rank": float(row.rank),
+            "highlights": {
+                "title": row.title_highlight,
+                "description": row.description_highlight,
+            },
+        })
 
     return {
-        "data": result,
+        "data": data,
         "pagination": {
             "page": page,
             "limit": limit,
@@ -201,158 +303,60 @@ def get_course_recommendations(
 
 # --- PLATFORM STATS (public) ---
 @router.get("/platform-stats")
-def get_platform_stats(db: Session = Depends(get_db)):
+def platform_stats_endpoint(request: Request, db: Session = Depends(get_db)):
     """Estadísticas públicas de la plataforma. No requiere autenticación."""
-    from sqlalchemy import distinct
-
-    total_courses = db.query(sqlfunc.count(Course.id)).filter(
-        Course.status == "publicado"
-    ).scalar() or 0
-
-    total_users = db.query(sqlfunc.count(User.id)).filter(
-        User.is_active == True
-    ).scalar() or 0
-
-    total_instructors = db.query(sqlfunc.count(User.id)).filter(
-        User.role == UserRole.seller.value
-    ).scalar() or 0
-
-    total_specialties = db.query(
-        sqlfunc.count(distinct(Course.category))
-    ).filter(
-        Course.status == "publicado",
-        Course.category.isnot(None)
-    ).scalar() or 0
-
-    # Fallback: if no published courses have categories, count all categories
-    if total_specialties == 0:
-        total_specialties = db.query(
-            sqlfunc.count(distinct(Course.category))
-        ).filter(
-            Course.category.isnot(None),
-            Course.category != ''
-        ).scalar() or 0
-
-    return {
-        "total_courses": total_courses,
-        "total_users": total_users,
-        "total_instructors": total_instructors,
-        "total_specialties": total_specialties,
-    }
+    # Lectura O(1) de la instantánea platform_stats (ver services/platform_stats)
+    return cached_response(
+        request, "platform_stats", [CATALOG_VERSION_KEY], lambda: get_platform_stats(db), ttl=60
+    )
 
 # --- RELATED COURSES ---
 @router.get("/{course_id}/related")
 def get_related_courses(
     course_id: str,
-    limit: int = Query(4, le=8),
+    request: Request,
+    limit: int = Query(4, ge=1, le=8),
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user),
 ):
-    """Courses from the same category, ordered by rating."""
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Curso no encontrado")
+    """Cursos relacionados por categoría, tema, público objetivo y co-compra."""
+    return cached_response(
+        request, "course_related", [CATALOG_VERSION_KEY], lambda: _related_courses(db, course_id, limit)
+    )
 
-    related = db.query(Course).filter(
-        Course.id != course_id,
-        Course.category == course.category,
-        Course.status == "publicado",
-        Course.visibility == "publico",
-    ).order_by(
-        Course.rating_avg.desc(),
-        Course.rating_count.desc(),
-    ).limit(limit).all()
-
-    if len(related) < limit:
-        existing_ids = {c.id for c in related} | {course_id}
-        extra = db.query(Course).filter(
-            Course.id.notin_(existing_ids),
-            Course.status == "publicado",
-            Course.visibility == "publico",
-        ).order_by(
-            Course.rating_avg.desc(),
-        ).limit(limit - len(related)).all()
-        related.extend(extra)
-
-    return related
 
+def _related_courses(db: Session, course_id: str, limit: int) -> list:
+    # Una lectura por índice sobre la lista precalculada (services/related_courses)
+    related = db.query(CourseCard).join(
+        RelatedCourse, RelatedCourse.related_course_id == CourseCard.course_id
+    ).filter(
+        RelatedCourse.course_id == course_id,
+        CourseCard.status == "publicado",
+        CourseCard.visibility == "publico",
+    ).order_by(RelatedCourse.rank).limit(limit).all()
 
-# --- DETALLES ---
-from sqlalchemy.orm import joinedload
+    if not related and not db.query(CourseCard.course_id).filter(CourseCard.course_id == course_id).first():
+        raise HTTPException(status_code=404, detail="Curso no encontrado")
 
-@router.get("/{course_id}")
-def get_course(course_id: str, db: Session = Depends(get_db)):
-    course = db.query(Course).options(
-        joinedload(Course.modules).joinedload(Module.blocks),
-        joinedload(Course.offers),
-        joinedload(Course.bibliography)
-    ).filter(Course.id == course_id).first()
+    return [_related_card(c) for c in related]
 
-    if not course:
-        raise HTTPException(status_code=404, detail="Curso no encontrado")
 
-    course_data = CourseResponse.model_validate(course).model_dump()
-
-    # Buscar oferta con convocatoria activa o próxima
-    now = datetime.now(timezone.utc)
-    active_offer = db.query(CourseOffer).filter(
-        CourseOffer.course_id == course_id,
-        CourseOffer.inscription_type == 'convocatoria',
-    ).order_by(CourseOffer.course_start.asc()).first()
-
-    cohort_info = None
-    if active_offer:
-        enrolled = db.query(sqlfunc.count(Order.id)).filter(
-            Order.course_id == course_id,
-            Order.offer_id == active_offer.id,
-            Order.status == OrderStatus.paid,
-        ).scalar() or 0
-
-        spots_left = None
-        if active_offer.max_students:
-            spots_left = max(0, active_offer.max_students - enrolled)
-
-        cohort_info = {
-            "enrollment_start": active_offer.enrollment_start.isoformat() if active_offer.enrollment_start else None,
-            "enrollment_end": active_offer.enrollment_end.isoformat() if active_offer.enrollment_end else None,
-            "course_start": active_offer.course_start.isoformat() if active_offer.course_start else None,
-            "course_end": active_offer.course_end.isoformat() if active_offer.course_end else None,
-            "max_students": active_offer.max_students,
-            "enrolled_count": enrolled,
-            "spots_left": spots_left,
-            "enrollment_open": (
-                (not active_offer.enrollment_start or
-                 now >= active_offer.enrollment_start) and
-                (not active_offer.enrollment_end or
-                 now <= active_offer.enrollment_end)
-            ),
-            "course_started": (
-                active_offer.course_start is not None and
-                now >= active_offer.course_start
-            ),
-        }
+def _related_card(card: CourseCard) -> dict:
+    data = card_to_dict(card)
+    data["seller"] = {"full_name": card.seller_name} if card.seller_name else None
+    return data
 
-    course_data["cohort_info"] = cohort_info
-
-    # Seller profile info
-    from app.models.users import User as UserModel, ProfessionalProfile
-    seller = db.query(UserModel).filter(UserModel.id == course.seller_id).first()
-    seller_profile = None
-    if seller:
-        prof = db.query(ProfessionalProfile).filter(
-            ProfessionalProfile.user_id == seller.id
-        ).first()
-        seller_profile = {
-            "id": seller.id,
-            "name": seller.full_name or '',
-            "bio": prof.bio if prof else None,
-            "specialty": prof.specialties[0] if prof and prof.specialties else None,
-            "image": prof.profile_image if prof else None,
-            "credentials": prof.credentials if prof else None,
-        }
-    course_data["seller_profile"] = seller_profile
 
-    return course_data
+# --- DETALLES ---
+@router.get("/{course_id}")
+def get_course(course_id: str, request: Request, db: Session = Depends(get_db)):
+    def build():
+        payload = load_course_detail(db, course_id)
+        if payload is None:
+            raise HTTPException(status_code=404, detail="Curso no encontrado")
+        return payload
+
+    # cohort_info depende de la hora actual (enrollment_open): TTL corto
+    return cached_response(request, "course_detail", [course_version_key(course_id)], build, ttl=300)
 
 
 # --- DELETE ---
@@ -409,11 +413,32 @@ def delete_course(
     db.query(CourseAnnouncement).filter(CourseAnnouncement.course_id == course_id).delete(synchronize_session=False)
     db.query(TaskSubmission).filter(TaskSubmission.course_id == course_id).delete(synchronize_session=False)
 
+    # Listas de relacionados que lo incluían: se recalculan sin él
+    related_sources = [
+        r.course_id for r in db.query(RelatedCourse.course_id).filter(
+            RelatedCourse.related_course_id == course_id
+        ).all()
+    ]
+    db.query(RelatedCourse).filter(
+        (RelatedCourse.course_id == course_id) | (RelatedCourse.related_course_id == course_id)
+    ).delete(synchronize_session=False)
+
+    db.query(CourseNeighbor).filter(
+        (CourseNeighbor.course_id == course_id) | (CourseNeighbor.neighbor_id == course_id)
+    ).delete(synchronize_session=False)
+
     # Tablas directas
+    db.query(CourseCard).filter(CourseCard.course_id == course_id).delete(synchronize_session=False)
     db.query(CourseContent).filter(CourseContent.course_id == course_id).delete(synchronize_session=False)
     db.query(CourseReview).filter(CourseReview.course_id == course_id).delete(synchronize_session=False)
     db.query(UserProgress).filter(UserProgress.course_id == course_id).delete(synchronize_session=False)
     db.query(Bibliography).filter(Bibliography.course_id == course_id).delete(synchronize_session=False)
+    # Alumnos cuyo acceso cacheado incluye el curso
+    buyer_ids = [
+        o.user_id for o in db.query(Order.user_id).filter(
+            Order.course_id == course_id, Order.status == OrderStatus.paid
+        ).distinct()
+    ]
     db.query(Order).filter(Order.course_id == course_id).delete(synchronize_session=False)
     db.query(Favorite).filter(Favorite.course_id == course_id).delete(synchronize_session=False)
     db.query(CollectionCourse).filter(CollectionCourse.course_id == course_id).delete(synchronize_session=False)
@@ -422,9 +447,19 @@ def delete_course(
     # Flush para que los deletes se ejecuten en la DB antes del cascade
     db.flush()
 
+    was_published = course.status == "publicado"
+    if was_published:
+        bump_platform_stats(db, total_courses=-1)
+
     # 4. Borrar curso (cascade eliminará modules/blocks/offers)
     db.delete(course)
+    refresh_related_courses(db, related_sources)
     db.commit()
+    invalidate_course(course_id)
+    invalidate_course_structure(course_id)
+    invalidate_entitlements(db, *buyer_ids)
+    if was_published:
+        invalidate_published_recommendations()
 
     return None
 
@@ -433,11 +468,12 @@ def delete_course(
     "/{course_id}", 
     response_model=CourseResponse,
     summary="Actualizar un curso (Autoguardado)",
-    description="Actualiza parcialmente la información de un curso. Puede modificar la cabecera (título, descripción, visibilidad) y recrear módulos y ofertas si se proveen."
+    description="Actualiza parcialmente la información de un curso. Puede modificar la cabecera (título, descripción, visibilidad) y sincronizar módulos, bloques, ofertas y bibliografía si se proveen: los elementos se emparejan por ID y solo se escriben las filas que cambian. La cabecera X-Structure-Rows-Touched indica cuántas filas se tocaron."
 )
 def update_course(
     course_id: str,
     course_data: CourseUpdate, # Recibimos el JSON de actualización
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -475,76 +511,26 @@ def update_course(
         if key in field_mapping:
             setattr(course, field_mapping[key], value)
 
-    # Módulos — recrear si vienen
-    if "modulos" in update_data and course_data.modulos is not None:
-        for mod in course.modules:
-            db.delete(mod)
-        db.flush()
-        for i, mod_schema in enumerate(course_data.modulos):
-            new_module = Module(
-                course_id=course.id,
-                title=mod_schema.title,
-                description=mod_schema.description,
-                order=i
-            )
-            db.add(new_module)
-            db.flush()
-            for j, block_schema in enumerate(mod_schema.blocks):
-                new_block = ContentBlock(
-                    module_id=new_module.id,
-                    type=block_schema.type,
-                    title=block_schema.title,
-                    order=j,
-                    content_url=block_schema.content_url,
-                    body_text=block_schema.body_text,
-                    duration=block_schema.duration,
-                    quiz_data=block_schema.quiz_data
-                )
-                db.add(new_block)
-
-    # Ofertas — recrear si vienen
-    if "ofertas" in update_data and course_data.ofertas is not None:
-        for offer in course.offers:
-            db.delete(offer)
-        db.flush()
-        for offer_schema in course_data.ofertas:
-            new_offer = CourseOffer(
-                course_id=course.id,
-                name_public=offer_schema.name_public,
-                price_base=offer_schema.price_base,
-                is_recommended=offer_schema.is_recommended or False,
-                currency_origin=offer_schema.currency_origin,
-                country_origin=offer_schema.country_origin,
-                country_prices=offer_schema.country_prices,
-                inscription_type=offer_schema.inscription_type or 'siempre',
-                max_students=offer_schema.max_students,
-                accompaniment=offer_schema.accompaniment,
-                chat_questions_per_student=offer_schema.chat_questions_per_student,
-                chat_response_time=offer_schema.chat_response_time,
-                access_content=offer_schema.access_content or 'vitalicio',
-                access_months=offer_schema.access_months,
-                access_type=offer_schema.access_type,
-                certificate_included=offer_schema.certificate_included,
-                certificate_min_progress=offer_schema.certificate_min_progress,
-                certificate_requires_exam=offer_schema.certificate_requires_exam,
-            )
-            db.add(new_offer)
-
-    # Bibliografía — recrear si vienen
-    if "bibliografia" in update_data and course_data.bibliografia is not None:
-        for bib in course.bibliography:
-            db.delete(bib)
-        db.flush()
-        for bib_schema in course_data.bibliografia:
-            new_bib = Bibliography(
-                course_id=course.id,
-                type=bib_schema.type,
-                reference_text=bib_schema.reference_text,
-                doi_url=bib_schema.doi_url
-            )
-            db.add(new_bib)
-
+    # Estructura — sincronizar por diferencias (IDs estables)
+    sync_stats = sync_course_structure(
+        db,
+        course.id,
+        modulos=course_data.modulos if "modulos" in update_data else None,
+        ofertas=course_data.ofertas if "ofertas" in update_data else None,
+        bibliografia=course_data.bibliografia if "bibliografia" in update_data else None,
+    )
+    logger.info(f"Autoguardado curso {course.id}: {sync_stats['total']} filas de estructura tocadas {sync_stats}")
+    response.headers["X-Structure-Rows-Touched"] = str(sync_stats["total"])
+
+    refresh_course_card(db, course.id)
+    # Cambios en los atributos que puntúan la relación con otros cursos
+    relevance_keys = {"categoria", "tema", "subtema", "publicoObjetivo", "visibilidad"}
+    if course.status == "publicado" and relevance_keys & update_data.keys():
+        refresh_related_for_course(db, course.id)
     db.commit()
+    invalidate_course(course.id)
+    if {"modulos", "ofertas", "progresionContenido"} & update_data.keys():
+        invalidate_course_structure(course.id)
     db.refresh(course)
     return course
 
@@ -598,7 +584,9 @@ def publish_course(
         )
 
     course.status = "revision"
+    refresh_course_card(db, course.id)
     db.commit()
+    invalidate_course(course.id)
     db.refresh(course)
     return course
 
@@ -661,7 +649,9 @@ async def upload_banner(
 
     # Persist the S3 key
     course.banner_url = s3_key
+    refresh_course_card(db, course.id)
     db.commit()
+    invalidate_course(course.id)
     db.refresh(course)
 
     return {"banner_url": s3_key}
\ No newline at end of file
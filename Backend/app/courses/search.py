@@ -0,0 +1,91 @@
+import re
+from typing import Optional
+from sqlalchemy import func, select, literal_column
+from sqlalchemy.orm import Session
+
+from app.models.courses import Course
+
+SEARCH_CONFIG = "es_unaccent"
+
+# Solo letras/dígitos: el resto de caracteres tienen significado en tsquery
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2"
+
+
+def build_tsquery(text: str, prefix: bool = True):
+    """Convierte el texto del buscador en un tsquery.
+    Todos los términos son obligatorios (AND); con prefix=True el último término
+    se busca como prefijo para el autocompletado mientras el usuario escribe."""
+    terms = _TERM_RE.findall(text or "")
+    if not terms:
+        return None
+    parts = list(terms)
+    if prefix:
+        parts[-1] = f"{parts[-1]}:*"
+    return func.to_tsquery(SEARCH_CONFIG, " & ".join(parts))
+
+
+def search_predicate(text: str, prefix: bool = True):
+    """Predicado `search_vector @@ tsquery` que usa el índice GIN, o None si no hay términos."""
+    tsquery = build_tsquery(text, prefix=prefix)
+    if tsquery is None:
+        return None
+    return Course.search_vector.op("@@")(tsquery)
+
+
+def search_courses(
+    db: Session,
+    text: str,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    seller_id: Optional[str] = None,
+    page: int = 1,
+    limit: int = 20,
+    prefix: bool = True,
+) -> tuple[list, int]:
+    """Búsqueda rankeada con resaltado.
+    Ranking, total y paginación se resuelven en una subconsulta sobre el índice;
+    ts_headline (costoso) solo se calcula para las filas de la página."""
+    tsquery = build_tsquery(text, prefix=prefix)
+    if tsquery is None:
+        return [], 0
+
+    rank = func.ts_rank_cd(Course.search_vector, tsquery).label("rank")
+    ranked = select(
+        Course.id.label("id"),
+        rank,
+        func.count().over().label("total"),
+    ).where(Course.search_vector.op("@@")(tsquery))
+
+    # Filtros por igualdad sobre columnas con índice B-tree
+    if category:
+        ranked = ranked.where(Course.category == category)
+    if status:
+        ranked = ranked.where(Course.status == status)
+    if seller_id:
+        ranked = ranked.where(Course.seller_id == seller_id)
+
+    ranked = ranked.order_by(
+        literal_column("rank").desc(), Course.created_at.desc()
+    ).offset((page - 1) * limit).limit(limit).subquery()
+
+    rows = db.execute(
+        select(
+            Course,
+            ranked.c.rank,
+            ranked.c.total,
+            func.ts_headline(SEARCH_CONFIG, Course.title, tsquery, _HEADLINE_OPTIONS).label("title_highlight"),
+            func.ts_headline(
+                SEARCH_CONFIG,
+                func.coalesce(Course.short_description, ""),
+                tsquery,
+                _HEADLINE_OPTIONS,
+            ).label("description_highlight"),
+        )
+        .join(ranked, ranked.c.id == Course.id)
+        .order_by(ranked.c.rank.desc(), Course.created_at.desc())
+    ).all()
+
+    total = rows[0].total if rows else 0
+    return rows, total
@@ -0,0 +1,195 @@
+"""Sincronización por diferencias de la estructura de un curso.
+
+El autoguardado del editor envía la estructura completa (módulos con sus
+bloques, ofertas y bibliografía). En lugar de borrar y recrear todo, se
+compara con lo que hay en la base por ID y solo se emiten:
+
+- UPDATE (executemany) de las filas cuyo contenido cambió
+- INSERT multi-fila de los elementos nuevos (sin ID o con ID desconocido)
+- DELETE ... WHERE id IN (...) de los que ya no vienen
+
+Los IDs existentes se conservan, de modo que UserProgress.module_id (que
+guarda el ID del bloque) sigue apuntando a la lección correcta.
+"""
+import uuid
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.courses import Module, ContentBlock, CourseOffer, Bibliography
+from app.schemas.courses import ModuleBase, OfferBase, BibliographyBase
+from app.services.enrollment_progress import refresh_total_blocks
+
+MODULE_FIELDS = ("title", "description", "order")
+BLOCK_FIELDS = ("module_id", "type", "title", "order", "content_url", "body_text", "duration", "quiz_data")
+OFFER_FIELDS = (
+    "name_public", "price_base", "is_recommended", "currency_origin", "country_origin",
+    "country_prices", "inscription_type", "max_students", "accompaniment",
+    "chat_questions_per_student", "chat_response_time", "access_content",
+    "access_months", "access_type", "certificate_included",
+    "certificate_min_progress", "certificate_requires_exam",
+)
+BIBLIOGRAPHY_FIELDS = ("type", "reference_text", "doi_url")
+
+
+class _TableDiff:
+    """Acumula los cambios de una tabla y los aplica en bloque."""
+
+    def __init__(self, model, fields: tuple, existing: dict[str, dict]):
+        self.model = model
+        self.fields = fields
+        self.existing = existing
+        self.inserts: list[dict] = []
+        self.updates: list[dict] = []
+        self.seen: set[str] = set()
+
+    def resolve_id(self, item_id: Optional[str]) -> str:
+        """Devuelve el ID a usar: el del cliente si ya existe en este curso,
+        uno nuevo en otro caso (nunca se adoptan IDs ajenos)."""
+        if item_id and item_id in self.existing and item_id not in self.seen:
+            return item_id
+        return str(uuid.uuid4())
+
+    def put(self, row_id: str, values: dict, **extra) -> None:
+        values = {**values, **extra}
+        self.seen.add(row_id)
+        current = self.existing.get(row_id)
+        if current is None:
+            self.inserts.append({"id": row_id, **values})
+        elif any(current[f] != values[f] for f in self.fields):
+            self.updates.append({"id": row_id, **values})
+
+    @property
+    def deleted_ids(self) -> list[str]:
+        return [row_id for row_id in self.existing if row_id not in self.seen]
+
+    def apply_deletes(self, db: Session) -> None:
+        ids = self.deleted_ids
+        if ids:
+            db.query(self.model).filter(self.model.id.in_(ids)).delete(synchronize_session=False)
+
+    def apply_writes(self, db: Session) -> None:
+        if self.inserts:
+            db.bulk_insert_mappings(self.model, self.inserts)
+        if self.updates:
+            db.bulk_update_mappings(self.model, self.updates)
+
+    def stats(self) -> dict:
+        return {
+            "inserted": len(self.inserts),
+            "updated": len(self.updates),
+            "deleted": len(self.deleted_ids),
+        }
+
+
+def _existing(db: Session, model, fields: tuple, *criteria) -> dict[str, dict]:
+    columns = [model.id] + [getattr(model, f) for f in fields]
+    return {row.id: row._asdict() for row in db.query(*columns).filter(*criteria)}
+
+
+def sync_course_structure(
+    db: Session,
+    course_id: str,
+    modulos: Optional[list[ModuleBase]] = None,
+    ofertas: Optional[list[OfferBase]] = None,
+    bibliografia: Optional[list[BibliographyBase]] = None,
+) -> dict:
+    """Aplica la estructura recibida sobre la existente. Cada argumento a None
+    deja esa parte intacta. No hace commit.
+
+    Devuelve las filas tocadas por tabla, p. ej.
+    {"blocks": {"inserted": 1, "updated": 2, "deleted": 0}, ..., "total": 3}
+    """
+    diffs: dict[str, _TableDiff] = {}
+
+    if modulos is not None:
+        modules = _TableDiff(
+            Module, MODULE_FIELDS,
+            _existing(db, Module, MODULE_FIELDS, Module.course_id == course_id),
+        )
+        blocks = _TableDiff(
+            ContentBlock, BLOCK_FIELDS,
+            _existing(
+                db, ContentBlock, BLOCK_FIELDS, ContentBlock.module_id.in_(list(modules.existing)),
+            ) if modules.existing else {},
+        )
+        for i, mod_schema in enumerate(modulos):
+            module_id = modules.resolve_id(mod_schema.id)
+            modules.put(module_id, {
+                "title": mod_schema.title,
+                "description": mod_schema.description,
+                "order": i,
+            }, course_id=course_id)
+            for j, block_schema in enumerate(mod_schema.blocks):
+                # Un bloque puede cambiar de módulo conservando su ID
+                block_id = blocks.resolve_id(block_schema.id)
+                blocks.put(block_id, {
+                    "module_id": module_id,
+                    "type": block_schema.type,
+                    "title": block_schema.title,
+                    "order": j,
+                    "content_url": block_schema.content_url,
+                    "body_text": block_schema.body_text,
+                    "duration": block_schema.duration,
+                    "quiz_data": block_schema.quiz_data,
+                })
+        diffs["modules"] = modules
+        diffs["blocks"] = blocks
+
+    if ofertas is not None:
+        offers = _TableDiff(
+            CourseOffer, OFFER_FIELDS,
+            _existing(db, CourseOffer, OFFER_FIELDS, CourseOffer.course_id == course_id),
+        )
+        for offer_schema in ofertas:
+            offers.put(offers.resolve_id(offer_schema.id), {
+                "name_public": offer_schema.name_public,
+                "price_base": offer_schema.price_base,
+                "is_recommended": offer_schema.is_recommended or False,
+                "currency_origin": offer_schema.currency_origin,
+                "country_origin": offer_schema.country_origin,
+                "country_prices": offer_schema.country_prices,
+                "inscription_type": offer_schema.inscription_type or 'siempre',
+                "max_students": offer_schema.max_students,
+                "accompaniment": offer_schema.accompaniment,
+                "chat_questions_per_student": offer_schema.chat_questions_per_student,
+                "chat_response_time": offer_schema.chat_response_time,
+                "access_content": offer_schema.access_content or 'vitalicio',
+                "access_months": offer_schema.access_months,
+                "access_type": offer_schema.access_type,
+                "certificate_included": offer_schema.certificate_included,
+                "certificate_min_progress": offer_schema.certificate_min_progress,
+                "certificate_requires_exam": offer_schema.certificate_requires_exam,
+            }, course_id=course_id)
+        diffs["offers"] = offers
+
+    if bibliografia is not None:
+        bibliography = _TableDiff(
+            Bibliography, BIBLIOGRAPHY_FIELDS,
+            _existing(db, Bibliography, BIBLIOGRAPHY_FIELDS, Bibliography.course_id == course_id),
+        )
+        for bib_schema in bibliografia:
+            bibliography.put(bibliography.resolve_id(bib_schema.id), {
+                "type": bib_schema.type,
+                "reference_text": bib_schema.reference_text,
+                "doi_url": bib_schema.doi_url,
+            }, course_id=course_id)
+        diffs["bibliography"] = bibliography
+
+    # Módulos nuevos antes que sus bloques; los bloques que cambian de módulo
+    # se actualizan antes de borrar el módulo de origen
+    if "modules" in diffs:
+        diffs["modules"].apply_writes(db)
+        diffs["blocks"].apply_writes(db)
+        diffs["blocks"].apply_deletes(db)
+        diffs["modules"].apply_deletes(db)
+        if diffs["blocks"].inserts or diffs["blocks"].deleted_ids:
+            refresh_total_blocks(db, course_id)
+    for name in ("offers", "bibliography"):
+        if name in diffs:
+            diffs[name].apply_deletes(db)
+            diffs[name].apply_writes(db)
+
+    stats = {name: diff.stats() for name, diff in diffs.items()}
+    stats["total"] = sum(sum(s.values()) for s in stats.values())
+    return stats
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
@@ -6,8 +6,9 @@ from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.forum import ForumThread, ForumPost
 from app.models.courses import Course
-from app.models.orders import Order, OrderStatus
+from app.services.entitlements import require_enrollment
 from app.models.users import User, UserRole
+from app.core.pagination import paginate_keyset
 from app.schemas.forum import (
     ForumThreadCreate, ForumThreadResponse,
     ForumThreadDetail, ForumPostCreate, ForumPostResponse,
@@ -49,21 +50,7 @@ def check_course_access(
         return course
 
     # Estudiante: verificar orden paid
-    order = (
-        db.query(Order)
-        .filter(
-            Order.user_id == current_user.id,
-            Order.course_id == course_id,
-            Order.status == OrderStatus.paid,
-        )
-        .first()
-    )
-
-    if not order:
-        raise HTTPException(
-            status_code=403,
-            detail="Debes estar matriculado para acceder al foro",
-        )
+    require_enrollment(db, current_user.id, course_id, "Debes estar matriculado para acceder al foro")
     return course
 
 
@@ -118,21 +105,35 @@ def build_thread_response(
 )
 def list_threads(
     course_id: str,
+    response: Response,
     page: int = Query(1, ge=1),
-    limit: int = Query(20, le=50),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: str | None = Query(None, description="Cursor opaco (modo keyset); vacío para la primera página"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     check_course_access(course_id, current_user, db)
 
-    threads = (
-        db.query(ForumThread)
-        .filter(ForumThread.course_id == course_id)
-        .order_by(ForumThread.is_pinned.desc(), ForumThread.created_at.desc())
-        .offset((page - 1) * limit)
-        .limit(limit)
-        .all()
-    )
+    query = db.query(ForumThread).filter(ForumThread.course_id == course_id)
+
+    if cursor is not None:
+        # Fijados primero, luego por fecha: el cursor incluye is_pinned
+        threads, next_cursor = paginate_keyset(
+            query,
+            [ForumThread.is_pinned, ForumThread.created_at, ForumThread.id],
+            cursor,
+            limit,
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        threads = (
+            query
+            .order_by(ForumThread.is_pinned.desc(), ForumThread.created_at.desc())
+            .offset((page - 1) * limit)
+            .limit(limit)
+            .all()
+        )
 
     return [build_thread_response(t, db) for t in threads]
 
@@ -0,0 +1,25 @@
+"""Registro de las tareas periódicas que ejecuta app.core.scheduler."""
+from app.config import (
+    PLATFORM_STATS_REFRESH_SECONDS, RELATED_COURSES_REFRESH_SECONDS, COURSE_NEIGHBORS_REFRESH_SECONDS,
+    ANALYTICS_ROLLUP_REFRESH_SECONDS, PROGRESS_FLUSH_SECONDS, ENROLLMENT_PROGRESS_RECONCILE_SECONDS,
+)
+from app.core import scheduler
+from app.services.platform_stats import refresh_platform_stats
+from app.services.related_courses import rebuild_related_courses
+from app.services.course_neighbors import rebuild_course_neighbors
+from app.services.analytics_rollup import reconcile_recent_rollups
+from app.services.progress_ingest import buffered_mode, flush_buffered_completions
+from app.services.enrollment_progress import reconcile_enrollment_progress
+
+
+def register_jobs() -> None:
+    scheduler.register_job("platform-stats", PLATFORM_STATS_REFRESH_SECONDS, refresh_platform_stats)
+    # Recoge las señales de co-compra nuevas (los pedidos no refrescan en línea)
+    scheduler.register_job("related-courses", RELATED_COURSES_REFRESH_SECONDS, rebuild_related_courses)
+    scheduler.register_job("course-neighbors", COURSE_NEIGHBORS_REFRESH_SECONDS, rebuild_course_neighbors)
+    scheduler.register_job("analytics-rollups", ANALYTICS_ROLLUP_REFRESH_SECONDS, reconcile_recent_rollups)
+    scheduler.register_job(
+        "enrollment-progress", ENROLLMENT_PROGRESS_RECONCILE_SECONDS, reconcile_enrollment_progress
+    )
+    if buffered_mode():
+        scheduler.register_job("progress-flush", PROGRESS_FLUSH_SECONDS, flush_buffered_completions)
@@ -0,0 +1,92 @@
+"""Prueba de carga de la ingesta de progreso.
+
+Crea un vendedor, un curso y `users` alumnos sintéticos, y lanza `workers`
+hilos que registran `blocks` compleciones por alumno en peticiones de
+`batch` bloques, con la misma ruta de código que los endpoints (directa o
+encolada en Redis + volcado). Informa de las compleciones por segundo
+sostenidas y borra los datos al terminar.
+
+    python -m app.cli load-test-progress --users 500 --blocks 40 --batch 1 --workers 16
+    python -m app.cli load-test-progress --buffered
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import insert
+
+from app.database import SessionLocal
+from app.models.analytics import CourseDailyStats, CourseDailyLearner
+from app.models.courses import Course, UserProgress
+from app.models.users import User
+from app.services.progress_ingest import buffer_completions, flush_buffered_completions, record_completions
+
+
+def _seed(db, users: int) -> tuple[str, str, list[str]]:
+    seller_id, course_id = str(uuid.uuid4()), str(uuid.uuid4())
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    db.execute(insert(User), [
+        {"id": uid, "email": f"loadtest_{uid}@example.com", "password_hash": "x"}
+        for uid in [seller_id] + user_ids
+    ])
+    db.execute(insert(Course), [{"id": course_id, "title": "Prueba de carga", "seller_id": seller_id}])
+    db.commit()
+    return seller_id, course_id, user_ids
+
+
+def _cleanup(db, seller_id: str, course_id: str, user_ids: list[str]) -> None:
+    for model in (CourseDailyLearner, CourseDailyStats, UserProgress):
+        db.query(model).filter(model.course_id == course_id).delete(synchronize_session=False)
+    db.query(Course).filter(Course.id == course_id).delete(synchronize_session=False)
+    db.query(User).filter(User.id.in_(user_ids + [seller_id])).delete(synchronize_session=False)
+    db.commit()
+
+
+def run_progress_load_test(
+    users: int = 500,
+    blocks: int = 40,
+    batch: int = 1,
+    workers: int = 16,
+    buffered: bool = False,
+) -> dict:
+    db = SessionLocal()
+    seller_id, course_id, user_ids = _seed(db, users)
+    block_ids = [f"loadtest-block-{i}" for i in range(blocks)]
+    requests = [
+        (user_id, block_ids[start:start + batch])
+        for user_id in user_ids for start in range(0, blocks, batch)
+    ]
+
+    def send(request):
+        user_id, chunk = request
+        if buffered:
+            buffer_completions(user_id, course_id, chunk)
+            return
+        session = SessionLocal()
+        try:
+            record_completions(session, user_id, course_id, chunk)
+            session.commit()
+        finally:
+            session.close()
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(send, requests))
+        accepted = time.perf_counter() - started
+        if buffered:
+            flush_buffered_completions(db)
+        elapsed = time.perf_counter() - started
+
+        stored = db.query(UserProgress).filter(UserProgress.course_id == course_id).count()
+        return {
+            "mode": "buffered" if buffered else "direct",
+            "requests": len(requests),
+            "completions": stored,
+            "seconds": round(elapsed, 2),
+            "completions_per_second": round(stored / elapsed, 1),
+            "requests_per_second": round(len(requests) / accepted, 1),
+        }
+    finally:
+        _cleanup(db, seller_id, course_id, user_ids)
+        db.close()
@@ -5,7 +5,9 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from app.core.rate_limiter import limiter
 # Validar variables de entorno al arrancar
-from app.config import SECRET_KEY, ENVIRONMENT, ALLOWED_ORIGINS, IS_PRODUCTION  # noqa: F401
+from app.config import SECRET_KEY, ENVIRONMENT, ALLOWED_ORIGINS, IS_PRODUCTION, SCHEDULER_ENABLED  # noqa: F401
+from app.core import scheduler
+from app.jobs import register_jobs
 
 from app.auth.router import router as auth_router
 from app.users.router import router as users_router
@@ -22,7 +24,7 @@ from app.notifications.router import router as notifications_router
 from app.users.favorites_router import router as favorites_router
 from app.courses.review_routes import router as reviews_router
 from app.collections.router import router as collections_router
-from app.courses.progress_router import router as progress_router
+from app.courses.progress_router import router as progress_router, me_router as my_progress_router
 from app.profile.router import router as profile_router
 from app.messaging.router import router as messaging_router
 from app.users.students_router import router as students_router
@@ -42,6 +44,8 @@ from app.models.resources import Resource, FAQ, SupportTicket
 from app.models.webinars import Webinar, WebinarRegistration, SellerGoogleToken
 from app.models.forum import ForumThread, ForumPost
 from app.models.cohorts import Cohort, CohortMember
+from app.models.platform import PlatformStats
+from app.models.analytics import CourseDailyStats, CourseDailyLearner
 
 # Crear tablas automáticamente (solo en desarrollo)
 Base.metadata.create_all(bind=engine)
@@ -87,6 +91,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Structure-Rows-Touched", "X-Total-Count"],
 )
 
 # -----------------------------------------------------
@@ -123,6 +128,7 @@ app.include_router(favorites_router)
 app.include_router(reviews_router)
 app.include_router(collections_router)
 app.include_router(progress_router)
+app.include_router(my_progress_router)
 app.include_router(profile_router)
 app.include_router(messaging_router, prefix="/messaging", tags=["messaging"])
 app.include_router(students_router)
@@ -133,6 +139,21 @@ app.include_router(cohorts_router, prefix="/cohorts", tags=["cohorts"])
 
 
 
+# -----------------------------------------------------
+# Tareas periódicas
+# -----------------------------------------------------
+@app.on_event("startup")
+def start_scheduler():
+    if SCHEDULER_ENABLED:
+        register_jobs()
+        scheduler.start()
+
+
+@app.on_event("shutdown")
+def stop_scheduler():
+    scheduler.stop()
+
+
 @app.get("/")
 def root():
     return {"message": "API funcionando correctamente 🚀"}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func as sa_func
 from datetime import datetime, timezone
@@ -10,7 +10,9 @@ from app.dependencies import get_current_user
 from app.models.users import User
 from app.models.courses import Course, ContentBlock, Module as CourseModule
 from app.models.orders import Order, OrderStatus
+from app.services.entitlements import require_enrollment
 from app.models.messaging import Message, MessageReply, CourseAnnouncement, TaskSubmission
+from app.core.pagination import paginate_keyset
 from app.schemas.messaging import (
     MessageCreate, MessageResponse, MessageReplyCreate, MessageReplyResponse,
     AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse,
@@ -93,9 +95,12 @@ def _submission_to_response(sub: TaskSubmission) -> dict:
 
 @router.get("/messages", response_model=List[MessageResponse])
 def list_messages(
+    response: Response,
     course_id: Optional[str] = Query(None),
     is_read: Optional[bool] = Query(None),
     is_starred: Optional[bool] = Query(None),
+    cursor: Optional[str] = Query(None, description="Cursor opaco (modo keyset); vacío para la primera página"),
+    limit: int = Query(50, ge=1, le=100, description="Solo en modo cursor"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -106,7 +111,12 @@ def list_messages(
         q = q.filter(Message.is_read == is_read)
     if is_starred is not None:
         q = q.filter(Message.is_starred == is_starred)
-    messages = q.order_by(Message.created_at.desc()).all()
+    if cursor is not None:
+        messages, next_cursor = paginate_keyset(q, [Message.created_at, Message.id], cursor, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        messages = q.order_by(Message.created_at.desc()).all()
     return [_message_to_response(m) for m in messages]
 
 
@@ -248,16 +258,22 @@ def _get_recipient_count(db: Session, course_id: str) -> int:
 
 @router.get("/announcements", response_model=List[AnnouncementResponse])
 def list_announcements(
+    response: Response,
     seller_id: str = Query(...),
+    cursor: Optional[str] = Query(None, description="Cursor opaco (modo keyset); vacío para la primera página"),
+    limit: int = Query(50, ge=1, le=100, description="Solo en modo cursor"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    anns = (
-        db.query(CourseAnnouncement)
-        .filter(CourseAnnouncement.seller_id == seller_id)
-        .order_by(CourseAnnouncement.created_at.desc())
-        .all()
-    )
+    q = db.query(CourseAnnouncement).filter(CourseAnnouncement.seller_id == seller_id)
+    if cursor is not None:
+        anns, next_cursor = paginate_keyset(
+            q, [CourseAnnouncement.created_at, CourseAnnouncement.id], cursor, limit
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        anns = q.order_by(CourseAnnouncement.created_at.desc()).all()
     return [
         _announcement_to_response(a, _get_recipient_count(db, a.course_id))
         for a in anns
@@ -422,17 +438,7 @@ def submit_task(
     db: Session = Depends(get_db),
 ):
     # Validate student has access (paid order)
-    order = (
-        db.query(Order)
-        .filter(
-            Order.user_id == current_user.id,
-            Order.course_id == data.course_id,
-            Order.status == OrderStatus.paid,
-        )
-        .first()
-    )
-    if not order:
-        raise HTTPException(status_code=403, detail="No tienes acceso a este curso")
+    require_enrollment(db, current_user.id, data.course_id, "No tienes acceso a este curso")
     sub = TaskSubmission(
         block_id=data.block_id,
         course_id=data.course_id,
@@ -486,6 +492,7 @@ def get_submission_upload_url(
         raise HTTPException(status_code=404, detail="Bloque no encontrado")
     if block.type not in ["task", "file_task"]:
         raise HTTPException(status_code=400, detail="Este bloque no es una tarea")
+    require_enrollment(db, current_user.id, block.module.course_id, "No tienes acceso a este curso")
 
     extension = file_name.rsplit(".", 1)[-1] if "." in file_name else "bin"
     s3_key = f"submissions/{current_user.id}/{block_id}/{uuid_lib.uuid4()}.{extension}"
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Integer, Float, Date, ForeignKey, Index
+from app.database import Base
+
+
+class CourseDailyStats(Base):
+    """Hechos diarios por curso para las analíticas del vendedor.
+
+    Se mantiene en línea al pagar un pedido y al registrar progreso
+    (app/services/analytics_rollup.py) y se reconstruye con el backfill.
+    Los días son fechas UTC.
+    """
+    __tablename__ = "course_daily_stats"
+
+    course_id = Column(String, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    revenue = Column(Float, nullable=False, default=0)
+    purchases = Column(Integer, nullable=False, default=0)
+    new_students = Column(Integer, nullable=False, default=0)  # primer pedido pagado del alumno en el curso
+    blocks_completed = Column(Integer, nullable=False, default=0)
+    active_learners = Column(Integer, nullable=False, default=0)  # alumnos distintos con progreso ese día
+
+    __table_args__ = (
+        Index("ix_course_daily_stats_day", "day"),
+    )
+
+
+class CourseDailyLearner(Base):
+    """Alumnos con actividad por curso y día: deduplica active_learners."""
+    __tablename__ = "course_daily_learners"
+
+    course_id = Column(String, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Float, Boolean, ForeignKey, DateTime, ARRAY, Integer, UniqueConstraint, Text, JSON
+from sqlalchemy import Column, String, Float, Boolean, ForeignKey, DateTime, ARRAY, Integer, UniqueConstraint, Text, JSON, Index, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 import uuid
 
@@ -34,20 +35,73 @@ class Course(Base):
     has_forum = Column(Boolean, default=False)
     progression_type = Column(String, default='libre')  # libre|secuencial
     requires_professional_profile = Column(Boolean, default=False)
+    # Nº de bloques del curso, mantenido al editar la estructura (app/services/enrollment_progress.py)
+    total_blocks = Column(Integer, nullable=False, default=0, server_default="0")
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Búsqueda full-text (columna generada, ver COURSE_SEARCH_DDL)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "courses_search_vector(title, subtitle, short_description, long_description, "
+            "topic, category, target_audience)",
+            persisted=True,
+        ),
+    ))
+
+    __table_args__ = (
+        Index("ix_courses_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_courses_created_id", "created_at", "id"),
+    )
+
     # Relaciones
     modules = relationship("Module", back_populates="course", cascade="all, delete-orphan")
     offers = relationship("CourseOffer", back_populates="course", cascade="all, delete-orphan")
     bibliography = relationship("Bibliography", back_populates="course")
     favorited_by = relationship("Favorite", back_populates="course", cascade="all, delete-orphan")
-    
+
+
+# Configuración de texto en español sin acentos y función inmutable que construye
+# el tsvector ponderado (A: título, B: subtítulo/tema/categoría, C: descripción corta
+# y público, D: descripción larga). Debe existir antes de crear la tabla courses.
+COURSE_SEARCH_DDL = """
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+        ALTER TEXT SEARCH CONFIGURATION es_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+    END IF;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION courses_search_vector(
+    title text, subtitle text, short_description text, long_description text,
+    topic text, category text, target_audience text[]
+) RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT
+        setweight(to_tsvector('es_unaccent', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('es_unaccent', coalesce(subtitle, '')), 'B') ||
+        setweight(to_tsvector('es_unaccent', coalesce(topic, '')), 'B') ||
+        setweight(to_tsvector('es_unaccent', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('es_unaccent', coalesce(short_description, '')), 'C') ||
+        setweight(to_tsvector('es_unaccent', coalesce(array_to_string(target_audience, ' '), '')), 'C') ||
+        setweight(to_tsvector('es_unaccent', coalesce(long_description, '')), 'D')
+$$;
+"""
+
+event.listen(Course.__table__, "before_create", DDL(COURSE_SEARCH_DDL).execute_if(dialect="postgresql"))
+
+
 class Module(Base):
     __tablename__ = "course_modules"
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    course_id = Column(String, ForeignKey("courses.id"), nullable=False)
+    course_id = Column(String, ForeignKey("courses.id"), nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(Text)
     order = Column(Integer, default=0)
@@ -58,7 +112,7 @@ class Module(Base):
 class ContentBlock(Base):
     __tablename__ = "content_blocks"
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    module_id = Column(String, ForeignKey("course_modules.id"), nullable=False)
+    module_id = Column(String, ForeignKey("course_modules.id"), nullable=False, index=True)
     
     type = Column(String, nullable=False) # "video", "reading", "quiz", "task"
     title = Column(String, nullable=False)
@@ -115,13 +169,38 @@ class UserProgress(Base):
     is_completed = Column(Boolean, default=True)
     completed_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Una compleción por bloque: permite el upsert idempotente (ON CONFLICT DO NOTHING)
+        UniqueConstraint("user_id", "course_id", "module_id", name="uq_user_progress_block"),
+    )
+
     user = relationship("User", backref="progress_entries")
     course = relationship("Course", backref="progress_entries")
+
+
+class EnrollmentProgress(Base):
+    """Contadores de progreso por inscripción (alumno, curso).
+
+    Se actualizan en la misma transacción que user_progress
+    (app/services/enrollment_progress.py) y una tarea periódica los
+    contrasta con las filas originales.
+    """
+    __tablename__ = "enrollment_progress"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    course_id = Column(String, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    completed_count = Column(Integer, nullable=False, default=0)
+    last_block_id = Column(String, nullable=True)
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_enrollment_progress_course", "course_id"),
+    )
     
 class CourseOffer(Base):
     __tablename__ = "course_offers"
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    course_id = Column(String, ForeignKey("courses.id"), nullable=False)
+    course_id = Column(String, ForeignKey("courses.id"), nullable=False, index=True)
 
     # Identificación
     name_public = Column(String, nullable=False)
@@ -170,4 +249,66 @@ class Bibliography(Base):
     reference_text = Column(Text)
     doi_url = Column(String)
 
-    course = relationship("Course", back_populates="bibliography")    
\ No newline at end of file
+    course = relationship("Course", back_populates="bibliography")
+
+
+class CourseCard(Base):
+    """Proyección de lectura con los datos de la tarjeta de curso.
+    Se mantiene en cada escritura desde app/services/course_cards.py."""
+    __tablename__ = "course_cards"
+
+    course_id = Column(String, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    seller_id = Column(String, nullable=False, index=True)
+    seller_name = Column(String, nullable=True)
+
+    title = Column(String, nullable=False)
+    subtitle = Column(String)
+    short_description = Column(Text)
+    category = Column(String)
+    level = Column(String)
+    banner_url = Column(String, nullable=True)
+    status = Column(String)
+    visibility = Column(String)
+
+    rating_avg = Column(Float, default=0.0)
+    rating_count = Column(Integer, default=0)
+    min_price = Column(Float, nullable=True)
+    total_blocks = Column(Integer, default=0)
+
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_course_cards_status_created", "status", "created_at", "course_id"),
+        Index("ix_course_cards_category_rating", "category", "rating_avg"),
+    )
+
+
+class RelatedCourse(Base):
+    """Top-N de cursos relacionados por curso, precalculado por
+    app/services/related_courses.py. `rank` empieza en 1."""
+    __tablename__ = "related_courses"
+
+    course_id = Column(String, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    related_course_id = Column(String, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True, index=True)
+    rank = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_related_courses_course_rank", "course_id", "rank"),
+    )
+
+
+class CourseNeighbor(Base):
+    """Vecinos item-item por co-ocurrencia de compras pagadas y favoritos
+    (similitud coseno), top-N por curso. Lo recalcula
+    app/services/course_neighbors.py en batch."""
+    __tablename__ = "course_neighbors"
+
+    course_id = Column(String, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    neighbor_id = Column(String, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True, index=True)
+    rank = Column(Integer, nullable=False)
+    weight = Column(Float, nullable=False)
+    co_users = Column(Integer, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
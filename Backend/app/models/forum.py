@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Integer, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -13,12 +13,17 @@ class ForumThread(Base):
     author_id = Column(String, ForeignKey("users.id"), nullable=False)
     title = Column(String(300), nullable=False)
     body = Column(Text, nullable=False)
-    is_pinned = Column(Boolean, default=False)
+    # Parte del cursor del listado: nunca NULL
+    is_pinned = Column(Boolean, nullable=False, default=False, server_default="false")
     is_closed = Column(Boolean, default=False)
     views = Column(Integer, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_forum_threads_course_pinned_created", "course_id", "is_pinned", "created_at", "id"),
+    )
+
     course = relationship("Course", backref="forum_threads")
     author = relationship("User", foreign_keys=[author_id])
     posts = relationship(
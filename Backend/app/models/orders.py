@@ -1,6 +1,6 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, Float, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, String, Float, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -28,4 +28,11 @@ class Order(Base):
     # Relaciones
     user = relationship("User", backref="orders")
     course = relationship("Course")
-    offer = relationship("CourseOffer")
\ No newline at end of file
+    offer = relationship("CourseOffer")
+
+    __table_args__ = (
+        # Analíticas del vendedor: pedidos pagados de sus cursos por rango de fechas
+        Index("ix_orders_course_status_created", "course_id", "status", "created_at"),
+        # Accesos del alumno (app/services/entitlements.py)
+        Index("ix_orders_user_course_status", "user_id", "course_id", "status"),
+    )
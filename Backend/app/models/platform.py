@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class PlatformStats(Base):
+    """Instantánea de las estadísticas públicas (una sola fila, id=1).
+
+    La recalcula el scheduler periódicamente y se ajusta con incrementos
+    atómicos en los eventos que la cambian (alta de usuario, cambio de rol,
+    publicación de curso).
+    """
+    __tablename__ = "platform_stats"
+
+    id = Column(Integer, primary_key=True, default=1)
+    total_courses = Column(Integer, nullable=False, default=0)
+    total_users = Column(Integer, nullable=False, default=0)
+    total_instructors = Column(Integer, nullable=False, default=0)
+    total_specialties = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now())
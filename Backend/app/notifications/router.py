@@ -4,6 +4,7 @@ from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.notifications import Notification
 from app.models.users import User
+from app.core.pagination import paginate_keyset, cursor_meta, count_for_mode
 
 router = APIRouter()
 
@@ -13,6 +14,8 @@ def get_notifications(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=50),
     unread_only: bool = Query(False),
+    cursor: str | None = Query(None, description="Cursor opaco (modo keyset); vacío para la primera página"),
+    count: str = Query("none", pattern="^(exact|estimated|none)$", description="Total en modo cursor"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -23,10 +26,20 @@ def get_notifications(
     if unread_only:
         query = query.filter(Notification.is_read == False)
 
-    query = query.order_by(Notification.created_at.desc())
-
-    total = query.count()
-    notifs = query.offset((page - 1) * limit).limit(limit).all()
+    if cursor is not None:
+        notifs, next_cursor = paginate_keyset(
+            query, [Notification.created_at, Notification.id], cursor, limit
+        )
+        pagination = cursor_meta(limit, next_cursor, count_for_mode(db, query, count), count)
+    else:
+        total = query.count()
+        notifs = query.order_by(Notification.created_at.desc()).offset((page - 1) * limit).limit(limit).all()
+        pagination = {
+            "page": page,
+            "limit": limit,
+            "total": total,
+            "has_next": page * limit < total,
+        }
 
     unread_count = (
         db.query(Notification)
@@ -52,12 +65,7 @@ def get_notifications(
             for n in notifs
         ],
         "unread_count": unread_count,
-        "pagination": {
-            "page": page,
-            "limit": limit,
-            "total": total,
-            "has_next": page * limit < total,
-        },
+        "pagination": pagination,
     }
 
 
@@ -6,11 +6,15 @@ from typing import List
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.orders import Order, OrderStatus
-from app.models.courses import Course, CourseOffer
+from app.models.courses import Course, CourseOffer, CourseCard
 from app.models.users import User
 from app.models.cohorts import Cohort, CohortMember
 from app.schemas.orders import OrderCreate, OrderResponse
 from app.notifications.service import create_notification
+from app.core.cache import invalidate_course_detail
+from app.courses.recommendations import invalidate_user_recommendations
+from app.services.analytics_rollup import record_order_paid
+from app.services.entitlements import invalidate_entitlements
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
@@ -75,9 +79,17 @@ async def create_order(
         new_order.status = OrderStatus.paid
 
     db.add(new_order)
+    if new_order.status == OrderStatus.paid:
+        record_order_paid(db, new_order)
     db.commit()
     db.refresh(new_order)
 
+    if new_order.status == OrderStatus.paid:
+        # La ficha pública muestra matriculados y plazas libres
+        invalidate_course_detail(new_order.course_id)
+        invalidate_user_recommendations(current_user.id)
+        invalidate_entitlements(db, current_user.id)
+
     # 4. Send enrollment notification for free courses (paid immediately)
     if new_order.status == OrderStatus.paid:
         course = db.query(Course).filter(Course.id == order_in.course_id).first()
@@ -124,16 +136,17 @@ async def get_my_orders(
         Order.user_id == current_user.id
     ).order_by(Order.created_at.desc()).all()
 
+    course_ids = list({o.course_id for o in orders})
+    cards = {
+        card.course_id: card
+        for card in db.query(CourseCard).filter(CourseCard.course_id.in_(course_ids)).all()
+    } if course_ids else {}
+
     result = []
     for order in orders:
-        course = db.query(Course).filter(Course.id == order.course_id).first()
+        card = cards.get(order.course_id)
         status_val = order.status.value if hasattr(order.status, 'value') else order.status
 
-        seller_name = None
-        if course:
-            seller = db.query(User).filter(User.id == course.seller_id).first()
-            seller_name = seller.full_name if seller else None
-
         result.append({
             "id": order.id,
             "user_id": order.user_id,
@@ -143,14 +156,14 @@ async def get_my_orders(
             "status": status_val,
             "created_at": order.created_at.isoformat() if order.created_at else None,
             "course": {
-                "id": course.id,
-                "title": course.title,
-                "category": course.category,
-                "banner_url": course.banner_url,
-                "seller_id": course.seller_id,
-                "seller_name": seller_name,
-                "rating_avg": float(course.rating_avg or 0),
-            } if course else None,
+                "id": card.course_id,
+                "title": card.title,
+                "category": card.category,
+                "banner_url": card.banner_url,
+                "seller_id": card.seller_id,
+                "seller_name": card.seller_name,
+                "rating_avg": float(card.rating_avg or 0),
+            } if card else None,
         })
     return result
 
@@ -164,9 +177,14 @@ async def process_payment_mock(
     if not order:
         raise HTTPException(status_code=404, detail="Orden no encontrada")
 
-    order.status = OrderStatus.paid
+    if order.status != OrderStatus.paid:
+        order.status = OrderStatus.paid
+        record_order_paid(db, order)
     db.commit()
     db.refresh(order)
+    invalidate_course_detail(order.course_id)
+    invalidate_user_recommendations(current_user.id)
+    invalidate_entitlements(db, current_user.id)
 
     # Send enrollment notification
     course = db.query(Course).filter(Course.id == order.course_id).first()
@@ -9,6 +9,8 @@ from app.models.users import User, ProfessionalProfile, PrivacySettings
 from app.schemas.users import ProfessionalProfileUpdate
 from app.schemas.security import AccountUpdate, PrivacySettingsUpdate
 from app.services.s3_service import s3_service
+from app.services.course_cards import refresh_seller_cards
+from app.core.cache import invalidate_catalog
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
@@ -21,7 +23,8 @@ def update_account(
     db: Session = Depends(get_db),
 ):
     # Build full_name from firstName + lastName if provided
-    if data.firstName is not None or data.lastName is not None:
+    renamed = data.firstName is not None or data.lastName is not None
+    if renamed:
         # Split existing full_name to get current parts
         existing_parts = (current_user.full_name or "").split(" ", 1)
         current_first = existing_parts[0] if existing_parts else ""
@@ -30,6 +33,7 @@ def update_account(
         new_first = data.firstName if data.firstName is not None else current_first
         new_last = data.lastName if data.lastName is not None else current_last
         current_user.full_name = f"{new_first} {new_last}".strip()
+        refresh_seller_cards(db, current_user.id, current_user.full_name)
 
     if data.email is not None:
         current_user.email = data.email
@@ -49,6 +53,9 @@ def update_account(
         privacy.push_notifications = data.push_notifications
 
     db.commit()
+    if renamed:
+        # Las tarjetas cacheadas (catálogo, colecciones, relacionados) llevan el nombre
+        invalidate_catalog()
     db.refresh(current_user)
 
     # Return the updated fields
@@ -138,7 +145,8 @@ def update_professional_profile(
         db.add(profile)
 
     # Update full_name on User if firstName/lastName provided
-    if data.firstName is not None or data.lastName is not None:
+    renamed = data.firstName is not None or data.lastName is not None
+    if renamed:
         existing_parts = (current_user.full_name or "").split(" ", 1)
         current_first = existing_parts[0] if existing_parts else ""
         current_last = existing_parts[1] if len(existing_parts) > 1 else ""
@@ -146,6 +154,7 @@ def update_professional_profile(
         new_first = data.firstName if data.firstName is not None else current_first
         new_last = data.lastName if data.lastName is not None else current_last
         current_user.full_name = f"{new_first} {new_last}".strip()
+        refresh_seller_cards(db, current_user.id, current_user.full_name)
 
     # Map schema fields to model columns
     field_mapping = {
@@ -174,6 +183,8 @@ def update_professional_profile(
         profile.is_complete = True
 
     db.commit()
+    if renamed:
+        invalidate_catalog()
     return {
         "message": "Perfil actualizado con éxito",
         "is_complete": profile.is_complete,
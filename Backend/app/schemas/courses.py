@@ -300,3 +300,7 @@ class CourseContentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class BlockCompletionBatch(BaseModel):
+    block_ids: List[str] = Field(..., min_length=1, max_length=500)
@@ -1,18 +1,22 @@
+import json
+import logging
 from datetime import datetime, timezone
+from typing import Optional
+
+import redis
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.orders import Order, OrderStatus
 from app.models.courses import Course, Module, ContentBlock, CourseOffer, UserProgress
 from app.models.users import UserRole
+from app.core.cache import structure_version_key
+from app.core.redis_config import redis_client
+from app.services.entitlements import has_course, paid_offer_id
+
+logger = logging.getLogger(__name__)
 
 
 def user_has_course(db: Session, user_id: str, course_id: str) -> bool:
-    return db.query(Order).filter(
-        Order.user_id == user_id,
-        Order.course_id == course_id,
-        Order.status == OrderStatus.paid
-    ).first() is not None
+    return has_course(db, user_id, course_id)
 
 
 def require_course_access(db: Session, user_id: str, course_id: str):
@@ -38,6 +42,69 @@ def require_admin(current_user):
     return True
 
 
+# ── Plan de acceso ────────────────────────────────────────
+# Por curso: ritmo, IDs de bloque en orden de módulo y bloque y fecha de
+# inicio de las ofertas de convocatoria. Se guarda en
+# Redis con la versión de estructura con la que se leyó; si la versión actual
+# no coincide (invalidate_course_structure) se reconstruye.
+
+ACCESS_PLAN_TTL = 86400
+
+
+def _access_plan_key(course_id: str) -> str:
+    return f"access:plan:{course_id}"
+
+
+def _build_access_plan(db: Session, course_id: str) -> Optional[dict]:
+    progression = db.query(Course.progression_type).filter(Course.id == course_id).first()
+    if progression is None:
+        return None
+    block_ids = [
+        row.id for row in db.query(ContentBlock.id)
+        .join(Module, ContentBlock.module_id == Module.id)
+        .filter(Module.course_id == course_id)
+        .order_by(Module.order, ContentBlock.order)
+    ]
+    course_starts = {
+        row.id: row.course_start.isoformat()
+        for row in db.query(CourseOffer.id, CourseOffer.course_start).filter(
+            CourseOffer.course_id == course_id,
+            CourseOffer.inscription_type == 'convocatoria',
+            CourseOffer.course_start.isnot(None),
+        )
+    }
+    return {
+        "progression_type": progression.progression_type or "libre",
+        "block_ids": block_ids,
+        "course_starts": course_starts,
+    }
+
+
+def get_access_plan(db: Session, course_id: str) -> Optional[dict]:
+    """Plan de acceso del curso, o None si el curso no existe."""
+    version = None
+    try:
+        version, raw = redis_client.mget(structure_version_key(course_id), _access_plan_key(course_id))
+        version = version or "0"
+        if raw:
+            plan = json.loads(raw)
+            if plan["version"] == version:
+                return plan
+    except redis.RedisError as e:
+        logger.warning(f"Plan de acceso sin caché para {course_id}: {e}")
+
+    plan = _build_access_plan(db, course_id)
+    if plan is not None and version is not None:
+        # Se guarda con la versión leída antes de consultar: si la estructura
+        # cambia mientras tanto, el plan nace caducado
+        plan["version"] = version
+        try:
+            redis_client.setex(_access_plan_key(course_id), ACCESS_PLAN_TTL, json.dumps(plan))
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo guardar el plan de acceso de {course_id}: {e}")
+    return plan
+
+
 def get_accessible_blocks(
     course_id: str,
     user_id: str,
@@ -47,53 +114,36 @@ def get_accessible_blocks(
     Devuelve el set de block_ids accesibles para el usuario
     según el ritmo del curso (libre vs secuencial) y convocatoria.
     """
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
+    plan = get_access_plan(db, course_id)
+    if plan is None:
         return set()
 
-    # Obtener la orden del usuario para este curso
-    order = db.query(Order).join(CourseOffer).filter(
-        Order.user_id == user_id,
-        Order.course_id == course_id,
-        Order.status == OrderStatus.paid,
-    ).first()
-
-    if not order:
+    # Oferta del pedido pagado del usuario para este curso
+    offer_id = paid_offer_id(db, user_id, course_id)
+    if offer_id is None:
         return set()
 
-    offer = order.offer
-
     # Verificar fecha de inicio para convocatorias
-    if offer and offer.inscription_type == 'convocatoria':
-        if offer.course_start:
-            now = datetime.now(timezone.utc)
-            if now < offer.course_start:
-                return set()
-
-    # Obtener todos los bloques ordenados
-    all_blocks = db.query(ContentBlock)\
-        .join(Module, ContentBlock.module_id == Module.id)\
-        .filter(Module.course_id == course_id)\
-        .order_by(Module.order, ContentBlock.order)\
-        .all()
-
-    all_block_ids = [b.id for b in all_blocks]
+    course_start = plan["course_starts"].get(offer_id)
+    if course_start and datetime.now(timezone.utc) < datetime.fromisoformat(course_start):
+        return set()
 
-    if course.progression_type == 'libre' or not course.progression_type:
-        return set(all_block_ids)
+    block_ids = plan["block_ids"]
+    if plan["progression_type"] == 'libre':
+        return set(block_ids)
 
     # Secuencial: desbloquear hasta el primer bloque no completado
-    completed_ids = set(
-        p.module_id for p in db.query(UserProgress).filter(
+    completed_ids = {
+        row.module_id for row in db.query(UserProgress.module_id).filter(
             UserProgress.user_id == user_id,
             UserProgress.course_id == course_id,
-        ).all()
-    )
+        )
+    }
 
     accessible = set()
-    for block_id in all_block_ids:
+    for block_id in block_ids:
         accessible.add(block_id)
         if block_id not in completed_ids:
             break
 
-    return accessible
\ No newline at end of file
+    return accessible
@@ -0,0 +1,201 @@
+"""Tablas diarias de analíticas del vendedor (course_daily_stats).
+
+Una fila por curso y día UTC con ingresos, compras, alumnos nuevos, bloques
+completados y alumnos activos. Los endpoints de /analytics leen estas filas
+(unas pocas por día y curso) en vez de agregar orders y user_progress.
+
+Mantenimiento en línea, dentro de la transacción del evento (sin commit):
+- record_order_paid: al pasar un pedido a pagado
+- record_progress / record_progress_removed: al marcar o desmarcar un bloque
+
+backfill_rollups recalcula desde las tablas origen todo el histórico o los
+días a partir de `since`; el scheduler lo usa para reconciliar los últimos
+ANALYTICS_ROLLUP_RECONCILE_DAYS días.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, func, cast, Date, distinct, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import ANALYTICS_ROLLUP_RECONCILE_DAYS
+from app.models.analytics import CourseDailyStats, CourseDailyLearner
+from app.models.courses import Course, UserProgress
+from app.models.orders import Order, OrderStatus
+
+_STATS = CourseDailyStats.__table__
+
+
+def _utc_day(column):
+    return cast(func.timezone("UTC", column), Date)
+
+
+def _as_day(value: Optional[datetime]) -> date:
+    value = value or datetime.now(timezone.utc)
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _increment(db: Session, course_id: str, day: date, **deltas: int | float) -> None:
+    """Suma `deltas` a la fila (curso, día), creándola si no existe."""
+    stmt = pg_insert(_STATS).values(course_id=course_id, day=day, **deltas)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["course_id", "day"],
+        set_={name: _STATS.c[name] + stmt.excluded[name] for name in deltas},
+    ))
+
+
+# ── Eventos ───────────────────────────────────────────────
+
+def record_order_paid(db: Session, order: Order) -> None:
+    """Suma el pedido al día en que se creó. Llamar solo en la transición a
+    pagado (no al volver a marcar un pedido ya pagado)."""
+    db.flush()
+    repeat_buyer = db.query(Order.id).filter(
+        Order.user_id == order.user_id,
+        Order.course_id == order.course_id,
+        Order.status == OrderStatus.paid,
+        Order.id != order.id,
+    ).first() is not None
+
+    _increment(
+        db, order.course_id, _as_day(order.created_at),
+        revenue=float(order.price or 0),
+        purchases=1,
+        new_students=0 if repeat_buyer else 1,
+    )
+
+
+def record_progress(
+    db: Session, course_id: str, user_id: str, completed_at: Optional[datetime] = None, blocks: int = 1,
+) -> None:
+    """`blocks` bloques completados por un alumno: +blocks y, si es su primera
+    actividad del día en el curso, +1 alumno activo."""
+    day = _as_day(completed_at)
+    first_today = db.execute(
+        pg_insert(CourseDailyLearner.__table__)
+        .values(course_id=course_id, day=day, user_id=user_id)
+        .on_conflict_do_nothing()
+    ).rowcount
+    _increment(db, course_id, day, blocks_completed=blocks, active_learners=first_today)
+
+
+def record_progress_removed(db: Session, course_id: str, completed_at: Optional[datetime]) -> None:
+    """Un bloque desmarcado: resta la compleción del día en que se registró.
+    El alumno sigue contando como activo ese día."""
+    db.query(CourseDailyStats).filter(
+        CourseDailyStats.course_id == course_id,
+        CourseDailyStats.day == _as_day(completed_at),
+        CourseDailyStats.blocks_completed > 0,
+    ).update(
+        {CourseDailyStats.blocks_completed: CourseDailyStats.blocks_completed - 1},
+        synchronize_session=False,
+    )
+
+
+# ── Backfill ──────────────────────────────────────────────
+
+def backfill_rollups(db: Session, since: Optional[date] = None) -> int:
+    """Recalcula las filas desde `since` (todo el histórico si es None) en una
+    transacción. Devuelve las filas de course_daily_stats escritas."""
+    stats = db.query(CourseDailyStats)
+    learners = db.query(CourseDailyLearner)
+    if since is not None:
+        stats = stats.filter(CourseDailyStats.day >= since)
+        learners = learners.filter(CourseDailyLearner.day >= since)
+    stats.delete(synchronize_session=False)
+    learners.delete(synchronize_session=False)
+
+    def in_range(day_column):
+        return day_column >= since if since is not None else true()
+
+    # Ingresos y compras
+    order_day = _utc_day(Order.created_at)
+    orders_by_day = (
+        select(
+            Order.course_id,
+            order_day.label("day"),
+            func.sum(Order.price).label("revenue"),
+            func.count(Order.id).label("purchases"),
+        )
+        .where(Order.status == OrderStatus.paid, in_range(order_day))
+        .group_by(Order.course_id, order_day)
+    )
+    db.execute(
+        pg_insert(_STATS).from_select(["course_id", "day", "revenue", "purchases"], orders_by_day)
+    )
+
+    # Alumnos nuevos: día del primer pedido pagado de cada alumno en el curso
+    first_orders = (
+        select(Order.course_id, func.min(Order.created_at).label("first_at"))
+        .where(Order.status == OrderStatus.paid)
+        .group_by(Order.course_id, Order.user_id)
+        .subquery()
+    )
+    first_day = _utc_day(first_orders.c.first_at)
+    new_by_day = (
+        select(first_orders.c.course_id, first_day.label("day"), func.count().label("new_students"))
+        .where(in_range(first_day))
+        .group_by(first_orders.c.course_id, first_day)
+    )
+    stmt = pg_insert(_STATS).from_select(["course_id", "day", "new_students"], new_by_day)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["course_id", "day"],
+        set_={"new_students": stmt.excluded.new_students},
+    ))
+
+    # Actividad: alumnos distintos por día y bloques completados
+    progress_day = _utc_day(UserProgress.completed_at)
+    db.execute(
+        pg_insert(CourseDailyLearner.__table__).from_select(
+            ["course_id", "day", "user_id"],
+            select(UserProgress.course_id, progress_day, UserProgress.user_id)
+            .where(in_range(progress_day))
+            .distinct(),
+        )
+    )
+    progress_by_day = (
+        select(
+            UserProgress.course_id,
+            progress_day.label("day"),
+            func.count(UserProgress.id).label("blocks_completed"),
+            func.count(distinct(UserProgress.user_id)).label("active_learners"),
+        )
+        .where(in_range(progress_day))
+        .group_by(UserProgress.course_id, progress_day)
+    )
+    stmt = pg_insert(_STATS).from_select(
+        ["course_id", "day", "blocks_completed", "active_learners"], progress_by_day
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["course_id", "day"],
+        set_={
+            "blocks_completed": stmt.excluded.blocks_completed,
+            "active_learners": stmt.excluded.active_learners,
+        },
+    ))
+
+    written = stats.count()
+    db.commit()
+    return written
+
+
+def reconcile_recent_rollups(db: Session) -> int:
+    """Tarea periódica: rehace los últimos días por si algún evento se perdió."""
+    since = _as_day(None) - timedelta(days=ANALYTICS_ROLLUP_RECONCILE_DAYS)
+    return backfill_rollups(db, since=since)
+
+
+# ── Lectura ───────────────────────────────────────────────
+
+def seller_rollups(db: Session, seller_id: str, course_id: str, *columns):
+    """Consulta de `columns` sobre las filas diarias de los cursos del vendedor
+    (o solo `course_id` si no es "all")."""
+    query = db.query(*columns).select_from(CourseDailyStats).join(
+        Course, CourseDailyStats.course_id == Course.id
+    ).filter(Course.seller_id == seller_id)
+    if course_id != "all":
+        query = query.filter(CourseDailyStats.course_id == course_id)
+    return query
@@ -0,0 +1,108 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Optional
+
+from app.models.courses import Course, CourseCard, CourseOffer
+from app.models.users import User
+
+# Columnas de la tarjeta que se copian tal cual desde Course
+_COURSE_COLUMNS = (
+    "title", "subtitle", "short_description", "category", "level",
+    "banner_url", "status", "visibility", "rating_avg", "rating_count",
+    "created_at",
+)
+
+
+def _card_select(course_ids: Optional[list[str]] = None):
+    """SELECT que construye las filas de course_cards desde las tablas fuente.
+    El precio mínimo sale de una subconsulta agrupada y el número de bloques
+    de courses.total_blocks."""
+    prices = select(
+        CourseOffer.course_id,
+        func.min(CourseOffer.price_base).label("min_price"),
+    ).group_by(CourseOffer.course_id)
+
+    if course_ids is not None:
+        prices = prices.where(CourseOffer.course_id.in_(course_ids))
+
+    prices = prices.subquery()
+
+    query = (
+        select(
+            Course.id.label("course_id"),
+            Course.seller_id,
+            User.full_name.label("seller_name"),
+            *[getattr(Course, c) for c in _COURSE_COLUMNS],
+            prices.c.min_price,
+            Course.total_blocks,
+        )
+        .outerjoin(User, User.id == Course.seller_id)
+        .outerjoin(prices, prices.c.course_id == Course.id)
+    )
+    if course_ids is not None:
+        query = query.where(Course.id.in_(course_ids))
+    return query
+
+
+def _upsert_cards(db: Session, course_ids: Optional[list[str]] = None) -> int:
+    columns = ["course_id", "seller_id", "seller_name", *_COURSE_COLUMNS, "min_price", "total_blocks"]
+    stmt = pg_insert(CourseCard.__table__).from_select(columns, _card_select(course_ids))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["course_id"],
+        set_={
+            **{c: stmt.excluded[c] for c in columns if c != "course_id"},
+            "refreshed_at": func.now(),
+        },
+    )
+    return db.execute(stmt).rowcount
+
+
+def refresh_course_cards(db: Session, course_ids: list[str]) -> None:
+    """Recalcula las tarjetas de los cursos indicados (INSERT ... SELECT ... ON CONFLICT).
+    Hace flush antes para que la sesión vea los cambios pendientes; no hace commit."""
+    if not course_ids:
+        return
+    db.flush()
+    _upsert_cards(db, list(course_ids))
+
+
+def refresh_course_card(db: Session, course_id: str) -> None:
+    refresh_course_cards(db, [course_id])
+
+
+def refresh_seller_cards(db: Session, seller_id: str, seller_name: Optional[str]) -> None:
+    """Propaga un cambio de nombre del seller a todas sus tarjetas."""
+    db.execute(
+        update(CourseCard)
+        .where(CourseCard.seller_id == seller_id)
+        .values(seller_name=seller_name)
+    )
+
+
+def rebuild_course_cards(db: Session) -> int:
+    """Backfill completo de course_cards en una única sentencia. Hace commit."""
+    count = _upsert_cards(db)
+    db.commit()
+    return count
+
+
+def card_to_dict(card: CourseCard) -> dict:
+    return {
+        "id": card.course_id,
+        "title": card.title,
+        "subtitle": card.subtitle,
+        "short_description": card.short_description,
+        "category": card.category,
+        "level": card.level,
+        "banner_url": card.banner_url,
+        "status": card.status,
+        "visibility": card.visibility,
+        "rating_avg": float(card.rating_avg or 0),
+        "rating_count": int(card.rating_count or 0),
+        "min_price": card.min_price,
+        "total_blocks": int(card.total_blocks or 0),
+        "seller_id": card.seller_id,
+        "seller_name": card.seller_name,
+        "created_at": card.created_at.isoformat() if card.created_at else None,
+    }
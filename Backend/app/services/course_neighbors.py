@@ -0,0 +1,96 @@
+"""Modelo item-item de filtrado colaborativo (tabla course_neighbors).
+
+Cada interacción es un par (usuario, curso) con pedido pagado o favorito.
+Para cada par de cursos i, j:
+
+    weight = usuarios_en_común(i, j) / sqrt(usuarios(i) · usuarios(j))
+
+y se guardan los COURSE_NEIGHBORS_TOP_N vecinos de más peso por curso.
+Consultar los vecinos de los cursos de un usuario es una lectura por índice,
+sin recorrer el catálogo.
+"""
+from sqlalchemy import select, func, and_, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import COURSE_NEIGHBORS_TOP_N
+from app.models.courses import CourseNeighbor
+from app.models.orders import Order, OrderStatus
+from app.models.users import Favorite
+
+
+def _neighbors_select():
+    interactions = union(
+        select(Order.user_id, Order.course_id).where(Order.status == OrderStatus.paid),
+        select(Favorite.user_id, Favorite.course_id),
+    ).cte("interactions")
+
+    popularity = (
+        select(interactions.c.course_id, func.count().label("users"))
+        .group_by(interactions.c.course_id)
+        .cte("popularity")
+    )
+
+    a = interactions.alias("a")
+    b = interactions.alias("b")
+    pairs = (
+        select(
+            a.c.course_id.label("course_id"),
+            b.c.course_id.label("neighbor_id"),
+            func.count().label("co_users"),
+        )
+        .join(b, and_(b.c.user_id == a.c.user_id, b.c.course_id != a.c.course_id))
+        .group_by(a.c.course_id, b.c.course_id)
+        .subquery()
+    )
+
+    pa = popularity.alias("pa")
+    pb = popularity.alias("pb")
+    weight = pairs.c.co_users / func.sqrt(pa.c.users * pb.c.users)
+
+    ranked = (
+        select(
+            pairs.c.course_id,
+            pairs.c.neighbor_id,
+            pairs.c.co_users,
+            weight.label("weight"),
+            func.row_number().over(
+                partition_by=pairs.c.course_id,
+                order_by=(weight.desc(), pairs.c.co_users.desc(), pairs.c.neighbor_id),
+            ).label("rank"),
+        )
+        .join(pa, pa.c.course_id == pairs.c.course_id)
+        .join(pb, pb.c.course_id == pairs.c.neighbor_id)
+        .subquery()
+    )
+    return select(
+        ranked.c.course_id, ranked.c.neighbor_id, ranked.c.rank, ranked.c.weight, ranked.c.co_users,
+    ).where(ranked.c.rank <= COURSE_NEIGHBORS_TOP_N)
+
+
+def rebuild_course_neighbors(db: Session) -> int:
+    """Recalcula la tabla completa en una transacción (las lecturas ven la
+    versión anterior hasta el commit). Devuelve las filas escritas."""
+    db.query(CourseNeighbor).delete(synchronize_session=False)
+    result = db.execute(
+        pg_insert(CourseNeighbor.__table__).from_select(
+            ["course_id", "neighbor_id", "rank", "weight", "co_users"],
+            _neighbors_select(),
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def neighbor_scores(db: Session, course_ids) -> dict[str, float]:
+    """Suma de pesos de los vecinos de `course_ids`: {curso_vecino: peso}."""
+    course_ids = list(course_ids)
+    if not course_ids:
+        return {}
+    rows = db.query(
+        CourseNeighbor.neighbor_id,
+        func.sum(CourseNeighbor.weight).label("weight"),
+    ).filter(
+        CourseNeighbor.course_id.in_(course_ids)
+    ).group_by(CourseNeighbor.neighbor_id).all()
+    return {row.neighbor_id: float(row.weight) for row in rows}
@@ -0,0 +1,43 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from app.models.courses import Course, CourseOffer, EnrollmentProgress
+
+
+def min_prices_by_course(db: Session, course_ids: list[str]) -> dict[str, float]:
+    """MIN(price_base) por curso en una sola consulta agrupada."""
+    if not course_ids:
+        return {}
+    rows = (
+        db.query(CourseOffer.course_id, func.min(CourseOffer.price_base))
+        .filter(CourseOffer.course_id.in_(course_ids))
+        .group_by(CourseOffer.course_id)
+        .all()
+    )
+    return {course_id: min_price for course_id, min_price in rows}
+
+
+def total_blocks_by_course(db: Session, course_ids: list[str]) -> dict[str, int]:
+    """Número de bloques por curso (courses.total_blocks) en una consulta."""
+    if not course_ids:
+        return {}
+    rows = db.query(Course.id, Course.total_blocks).filter(Course.id.in_(course_ids)).all()
+    return {course_id: count for course_id, count in rows}
+
+
+def completers_by_course(db: Session, course_ids: list[str]) -> dict[str, int]:
+    """Alumnos que completaron todos los bloques, por curso, en una consulta
+    sobre los contadores de enrollment_progress."""
+    if not course_ids:
+        return {}
+    rows = (
+        db.query(EnrollmentProgress.course_id, func.count(EnrollmentProgress.user_id))
+        .join(Course, Course.id == EnrollmentProgress.course_id)
+        .filter(
+            EnrollmentProgress.course_id.in_(course_ids),
+            Course.total_blocks > 0,
+            EnrollmentProgress.completed_count >= Course.total_blocks,
+        )
+        .group_by(EnrollmentProgress.course_id)
+        .all()
+    )
+    return {course_id: count for course_id, count in rows}
@@ -0,0 +1,239 @@
+"""Contadores de progreso por inscripción y nº de bloques por curso.
+
+enrollment_progress guarda, por (alumno, curso), los bloques completados, el
+último bloque y la fecha de la última actividad; courses.total_blocks guarda
+el nº de bloques del curso. Las lecturas de progreso son una búsqueda por
+clave primaria en vez de contar user_progress y content_blocks.
+
+Mantenimiento en línea, dentro de la transacción del evento (sin commit):
+- record_completions_added: tras insertar compleciones (directas o volcadas)
+- record_completion_removed: al desmarcar un bloque
+- refresh_total_blocks: al cambiar la estructura del curso
+
+reconcile_enrollment_progress contrasta los contadores con las filas de
+user_progress y corrige las diferencias; el scheduler lo ejecuta cada
+ENROLLMENT_PROGRESS_RECONCILE_SECONDS.
+"""
+import logging
+from typing import Optional
+
+from sqlalchemy import select, func, case, or_, exists, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.courses import Course, Module, ContentBlock, UserProgress, EnrollmentProgress
+from app.models.orders import Order, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+_COUNTERS = EnrollmentProgress.__table__
+
+
+def progress_percentage(completed: int, total_blocks: int) -> int:
+    return round((completed / total_blocks * 100) if total_blocks > 0 else 0)
+
+
+def _block_count(course_id):
+    return (
+        select(func.count(ContentBlock.id))
+        .join(Module, ContentBlock.module_id == Module.id)
+        .where(Module.course_id == course_id)
+        .correlate(Course)
+        .scalar_subquery()
+    )
+
+
+# ── Eventos ───────────────────────────────────────────────
+
+def refresh_total_blocks(db: Session, course_id: str) -> None:
+    """Recuenta los bloques del curso tras editar su estructura."""
+    db.query(Course).filter(Course.id == course_id).update(
+        {Course.total_blocks: _block_count(course_id)}, synchronize_session=False
+    )
+
+
+def record_completions_added(db: Session, inserted: list) -> None:
+    """Suma las compleciones recién insertadas (filas con user_id, course_id,
+    module_id y completed_at) en un único upsert multi-fila."""
+    grouped: dict[tuple, dict] = {}
+    for row in inserted:
+        key = (row.user_id, row.course_id)
+        entry = grouped.setdefault(key, {
+            "user_id": row.user_id,
+            "course_id": row.course_id,
+            "completed_count": 0,
+            "last_block_id": row.module_id,
+            "last_activity_at": row.completed_at,
+        })
+        entry["completed_count"] += 1
+        if row.completed_at > entry["last_activity_at"]:
+            entry["last_block_id"] = row.module_id
+            entry["last_activity_at"] = row.completed_at
+    if not grouped:
+        return
+
+    stmt = pg_insert(_COUNTERS).values(list(grouped.values()))
+    is_newer = or_(
+        _COUNTERS.c.last_activity_at.is_(None),
+        stmt.excluded.last_activity_at >= _COUNTERS.c.last_activity_at,
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "course_id"],
+        set_={
+            "completed_count": _COUNTERS.c.completed_count + stmt.excluded.completed_count,
+            "last_block_id": case((is_newer, stmt.excluded.last_block_id), else_=_COUNTERS.c.last_block_id),
+            "last_activity_at": case((is_newer, stmt.excluded.last_activity_at), else_=_COUNTERS.c.last_activity_at),
+        },
+    ))
+
+
+def record_completion_removed(db: Session, user_id: str, course_id: str, block_id: str, removed: int = 1) -> None:
+    """Resta `removed` compleciones ya borradas de user_progress. Si el bloque
+    era el último, el último pasa a ser la compleción restante más reciente."""
+    db.flush()
+    latest = (
+        select(UserProgress)
+        .where(UserProgress.user_id == user_id, UserProgress.course_id == course_id)
+        .order_by(UserProgress.completed_at.desc().nulls_last(), UserProgress.id.desc())
+        .limit(1)
+        .subquery()
+    )
+    was_last = EnrollmentProgress.last_block_id == block_id
+    db.query(EnrollmentProgress).filter(
+        EnrollmentProgress.user_id == user_id,
+        EnrollmentProgress.course_id == course_id,
+    ).update({
+        EnrollmentProgress.completed_count: func.greatest(EnrollmentProgress.completed_count - removed, 0),
+        EnrollmentProgress.last_block_id: case(
+            (was_last, select(latest.c.module_id).scalar_subquery()), else_=EnrollmentProgress.last_block_id
+        ),
+        EnrollmentProgress.last_activity_at: case(
+            (was_last, select(latest.c.completed_at).scalar_subquery()), else_=EnrollmentProgress.last_activity_at
+        ),
+    }, synchronize_session=False)
+
+
+# ── Reconciliación ────────────────────────────────────────
+
+def reconcile_enrollment_progress(db: Session, course_id: Optional[str] = None) -> int:
+    """Recalcula total_blocks y los contadores que no cuadran con user_progress
+    (de todos los cursos o solo de `course_id`). Devuelve las filas corregidas.
+
+    Una compleción confirmada mientras se ejecuta puede quedar sin contar
+    hasta la siguiente pasada.
+    """
+    courses = db.query(Course).filter(Course.total_blocks != _block_count(Course.id))
+    if course_id is not None:
+        courses = courses.filter(Course.id == course_id)
+    fixed_courses = courses.update(
+        {Course.total_blocks: _block_count(Course.id)}, synchronize_session=False
+    )
+
+    # Recuento real y último bloque por inscripción (DISTINCT ON sobre la más reciente)
+    actual = (
+        select(
+            UserProgress.user_id,
+            UserProgress.course_id,
+            func.count().over(partition_by=(UserProgress.user_id, UserProgress.course_id)).label("completed_count"),
+            UserProgress.module_id.label("last_block_id"),
+            UserProgress.completed_at.label("last_activity_at"),
+        )
+        .distinct(UserProgress.user_id, UserProgress.course_id)
+        .order_by(
+            UserProgress.user_id, UserProgress.course_id,
+            UserProgress.completed_at.desc().nulls_last(), UserProgress.id.desc(),
+        )
+    )
+    if course_id is not None:
+        actual = actual.where(UserProgress.course_id == course_id)
+    actual = actual.subquery("actual")
+
+    mismatched = (
+        select(actual)
+        .outerjoin(_COUNTERS, and_(
+            _COUNTERS.c.user_id == actual.c.user_id,
+            _COUNTERS.c.course_id == actual.c.course_id,
+        ))
+        .where(or_(
+            _COUNTERS.c.user_id.is_(None),
+            _COUNTERS.c.completed_count != actual.c.completed_count,
+            # Con empates de fecha cualquier bloque vale como último
+            _COUNTERS.c.last_activity_at.is_distinct_from(actual.c.last_activity_at),
+        ))
+    )
+    stmt = pg_insert(_COUNTERS).from_select(
+        ["user_id", "course_id", "completed_count", "last_block_id", "last_activity_at"], mismatched
+    )
+    fixed_counters = db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "course_id"],
+        set_={
+            "completed_count": stmt.excluded.completed_count,
+            "last_block_id": stmt.excluded.last_block_id,
+            "last_activity_at": stmt.excluded.last_activity_at,
+        },
+    )).rowcount
+
+    # Contadores sin ninguna compleción detrás (p. ej. todo desmarcado)
+    orphans = db.query(EnrollmentProgress).filter(
+        EnrollmentProgress.completed_count != 0,
+        ~exists().where(
+            UserProgress.user_id == EnrollmentProgress.user_id,
+            UserProgress.course_id == EnrollmentProgress.course_id,
+        ),
+    )
+    if course_id is not None:
+        orphans = orphans.filter(EnrollmentProgress.course_id == course_id)
+    fixed_orphans = orphans.update(
+        {
+            EnrollmentProgress.completed_count: 0,
+            EnrollmentProgress.last_block_id: None,
+            EnrollmentProgress.last_activity_at: None,
+        },
+        synchronize_session=False,
+    )
+
+    db.commit()
+    fixed = fixed_courses + fixed_counters + fixed_orphans
+    if fixed:
+        logger.warning(
+            f"Progreso reconciliado: {fixed_courses} cursos, "
+            f"{fixed_counters + fixed_orphans} inscripciones corregidas"
+        )
+    return fixed
+
+
+# ── Lectura ───────────────────────────────────────────────
+
+def courses_progress_summary(db: Session, user_id: str) -> list[dict]:
+    """Progreso del alumno en todos sus cursos comprados, en una consulta:
+    los cursos con pedido pagado unidos a sus contadores por clave primaria.
+    Primero los de actividad más reciente."""
+    purchased = select(Order.course_id).where(Order.user_id == user_id, Order.status == OrderStatus.paid)
+    rows = (
+        db.query(
+            Course.id, Course.title, Course.total_blocks,
+            EnrollmentProgress.completed_count, EnrollmentProgress.last_block_id,
+        )
+        .outerjoin(EnrollmentProgress, and_(
+            EnrollmentProgress.course_id == Course.id,
+            EnrollmentProgress.user_id == user_id,
+        ))
+        .filter(Course.id.in_(purchased))
+        .order_by(EnrollmentProgress.last_activity_at.desc().nulls_last(), Course.title)
+        .all()
+    )
+
+    result = []
+    for row in rows:
+        completed = row.completed_count or 0
+        percentage = progress_percentage(completed, row.total_blocks)
+        result.append({
+            "course_id": row.id,
+            "course_title": row.title,
+            "percentage": percentage,
+            "completed_blocks": completed,
+            "total_blocks": row.total_blocks,
+            "last_block_id": row.last_block_id,
+            "is_complete": percentage == 100,
+        })
+    return result
@@ -0,0 +1,100 @@
+"""Cursos a los que tiene acceso cada usuario (pedidos pagados).
+
+Sustituye a las consultas sueltas a orders (user_id, course_id, paid) de las
+comprobaciones de acceso. Dos niveles:
+
+- Memo por sesión (Session.info): la sesión es la de la petición, así que
+  una página que comprueba el acceso varias veces consulta una sola vez.
+- Redis: {course_id: offer_id} del usuario en JSON, marcado con la versión
+  del usuario leída antes de consultar la base. invalidate_entitlements sube
+  esa versión (tras pagar, reembolsar o borrar un curso) y la entrada
+  anterior deja de valer.
+
+Si Redis no está disponible se consulta la base (una vez por petición).
+"""
+import json
+import logging
+
+import redis
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.cache import bump_versions
+from app.core.redis_config import redis_client
+from app.models.orders import Order, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+ENTITLEMENTS_TTL = 3600
+_MEMO = "entitlements"
+
+
+def _version_key(user_id: str) -> str:
+    return f"cache:ver:entitlements:{user_id}"
+
+
+def _entitlements_key(user_id: str) -> str:
+    return f"entitlements:user:{user_id}"
+
+
+def _load(db: Session, user_id: str) -> dict[str, str]:
+    rows = db.query(Order.course_id, Order.offer_id).filter(
+        Order.user_id == user_id,
+        Order.status == OrderStatus.paid,
+    ).order_by(Order.created_at)
+    return {course_id: offer_id for course_id, offer_id in rows}
+
+
+def _cached(db: Session, user_id: str) -> dict[str, str]:
+    version = None
+    try:
+        version, raw = redis_client.mget(_version_key(user_id), _entitlements_key(user_id))
+        version = version or "0"
+        if raw:
+            entry = json.loads(raw)
+            if entry["version"] == version:
+                return entry["courses"]
+    except redis.RedisError as e:
+        logger.warning(f"Caché de accesos no disponible para {user_id}: {e}")
+
+    courses = _load(db, user_id)
+    if version is not None:
+        try:
+            redis_client.setex(
+                _entitlements_key(user_id), ENTITLEMENTS_TTL,
+                json.dumps({"version": version, "courses": courses}),
+            )
+        except redis.RedisError as e:
+            logger.warning(f"No se pudo guardar la caché de accesos de {user_id}: {e}")
+    return courses
+
+
+def user_courses(db: Session, user_id: str) -> dict[str, str]:
+    """{course_id: offer_id} de los pedidos pagados del usuario."""
+    memo = db.info.setdefault(_MEMO, {})
+    if user_id not in memo:
+        memo[user_id] = _cached(db, user_id)
+    return memo[user_id]
+
+
+def has_course(db: Session, user_id: str, course_id: str) -> bool:
+    return course_id in user_courses(db, user_id)
+
+
+def paid_offer_id(db: Session, user_id: str, course_id: str):
+    """Oferta con la que el usuario compró el curso, o None."""
+    return user_courses(db, user_id).get(course_id)
+
+
+def require_enrollment(db: Session, user_id: str, course_id: str, detail: str = "No has comprado este curso.") -> None:
+    if not has_course(db, user_id, course_id):
+        raise HTTPException(status_code=403, detail=detail)
+
+
+def invalidate_entitlements(db: Session, *user_ids: str) -> None:
+    """Llamar después del commit que paga, reembolsa o borra pedidos."""
+    memo = db.info.get(_MEMO, {})
+    for user_id in user_ids:
+        memo.pop(user_id, None)
+    if user_ids:
+        bump_versions(*(_version_key(user_id) for user_id in user_ids))
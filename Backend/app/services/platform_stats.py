@@ -0,0 +1,89 @@
+"""Estadísticas públicas de la plataforma servidas desde una instantánea.
+
+- refresh_platform_stats: recálculo completo (scheduler, admin o lectura caducada)
+- bump_platform_stats: incremento atómico en la misma transacción del evento
+- get_platform_stats: lectura O(1) de la fila, con cota de antigüedad
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, distinct, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import PLATFORM_STATS_MAX_AGE_SECONDS
+from app.models.courses import Course
+from app.models.platform import PlatformStats
+from app.models.users import User, UserRole
+
+STATS_ROW_ID = 1
+STATS_FIELDS = ("total_courses", "total_users", "total_instructors", "total_specialties")
+
+
+def compute_platform_stats(db: Session) -> dict:
+    """Recalcula los contadores: una consulta sobre courses y otra sobre users."""
+    published = Course.status == "publicado"
+    has_category = (Course.category.isnot(None)) & (Course.category != '')
+
+    courses = db.execute(select(
+        func.count(Course.id).filter(published).label("total_courses"),
+        func.count(distinct(Course.category)).filter(published, Course.category.isnot(None)).label("published_specialties"),
+        func.count(distinct(Course.category)).filter(has_category).label("all_specialties"),
+    )).one()
+
+    users = db.execute(select(
+        func.count(User.id).filter(User.is_active == True).label("total_users"),
+        func.count(User.id).filter(User.role == UserRole.seller.value).label("total_instructors"),
+    )).one()
+
+    return {
+        "total_courses": courses.total_courses or 0,
+        "total_users": users.total_users or 0,
+        "total_instructors": users.total_instructors or 0,
+        # Si ningún curso publicado tiene categoría, se cuentan todas
+        "total_specialties": courses.published_specialties or courses.all_specialties or 0,
+    }
+
+
+def refresh_platform_stats(db: Session) -> dict:
+    """Recalcula y guarda la instantánea. Hace commit."""
+    values = compute_platform_stats(db)
+    stmt = pg_insert(PlatformStats.__table__).values(id=STATS_ROW_ID, refreshed_at=func.now(), **values)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={**values, "refreshed_at": func.now()},
+    ))
+    db.commit()
+    return values
+
+
+def bump_platform_stats(db: Session, **deltas: int) -> None:
+    """Suma `deltas` a la instantánea (p. ej. total_users=1). No hace commit:
+    va en la transacción del evento. Si aún no hay fila, no hace nada; el
+    siguiente refresco la creará con los valores exactos."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    unknown = set(deltas) - set(STATS_FIELDS)
+    if unknown:
+        raise ValueError(f"Campos de estadísticas desconocidos: {unknown}")
+
+    db.execute(
+        update(PlatformStats)
+        .where(PlatformStats.id == STATS_ROW_ID)
+        .values({getattr(PlatformStats, k): getattr(PlatformStats, k) + v for k, v in deltas.items()})
+    )
+
+
+def get_platform_stats(db: Session, max_age_seconds: Optional[int] = None) -> dict:
+    """Lee la instantánea; si no existe o supera la cota de antigüedad
+    (p. ej. el scheduler está parado) la recalcula en línea."""
+    max_age = PLATFORM_STATS_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+    row = db.query(PlatformStats).filter(PlatformStats.id == STATS_ROW_ID).first()
+
+    if row is None or row.refreshed_at is None or (
+        datetime.now(timezone.utc) - row.refreshed_at > timedelta(seconds=max_age)
+    ):
+        return refresh_platform_stats(db)
+
+    return {field: max(getattr(row, field) or 0, 0) for field in STATS_FIELDS}
@@ -0,0 +1,185 @@
+"""Escritura de progreso (bloques completados).
+
+- record_completions: INSERT ... ON CONFLICT DO NOTHING de uno o varios
+  bloques en una sentencia, idempotente gracias a uq_user_progress_block.
+  Solo las filas realmente insertadas suman en las analíticas diarias y en
+  los contadores de enrollment_progress.
+- Modo "buffered" (PROGRESS_WRITE_MODE): las peticiones solo hacen RPUSH
+  en Redis y flush_buffered_completions vuelca la cola por lotes. La cola se
+  renombra antes de procesarla y se borra tras el commit, así que un fallo a
+  mitad se reintenta en el siguiente volcado (el upsert lo hace seguro). Un
+  lock con token impide dos volcados a la vez sobre la misma cola.
+  Hasta el volcado, el progreso encolado no aparece en las lecturas.
+"""
+import json
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+import redis
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import PROGRESS_WRITE_MODE
+from app.core.cache import invalidate_course_progress
+from app.core.redis_config import redis_client
+from app.models.courses import Course, UserProgress
+from app.services.analytics_rollup import record_progress
+from app.services.enrollment_progress import record_completions_added
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_BUFFER_KEY = "progress:buffer"
+PROGRESS_FLUSHING_KEY = "progress:buffer:flushing"
+PROGRESS_FLUSH_LOCK_KEY = "progress:buffer:lock"
+FLUSH_LOCK_TTL = 60
+FLUSH_BATCH = 5000
+
+
+def buffered_mode() -> bool:
+    return PROGRESS_WRITE_MODE == "buffered"
+
+
+def _insert_rows(db: Session, rows: list[dict]) -> list:
+    """Inserta `rows` ignorando las compleciones ya registradas. Devuelve las
+    insertadas (user_id, course_id, module_id, completed_at)."""
+    if not rows:
+        return []
+    stmt = pg_insert(UserProgress.__table__).values(rows).on_conflict_do_nothing(
+        index_elements=["user_id", "course_id", "module_id"]
+    ).returning(
+        UserProgress.user_id, UserProgress.course_id, UserProgress.module_id, UserProgress.completed_at
+    )
+    return db.execute(stmt).all()
+
+
+def _record_rollups(db: Session, inserted: list) -> None:
+    grouped = defaultdict(int)
+    for row in inserted:
+        grouped[(row.course_id, row.user_id, row.completed_at.astimezone(timezone.utc).date())] += 1
+    for (course_id, user_id, day), blocks in grouped.items():
+        completed_at = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        record_progress(db, course_id, user_id, completed_at, blocks=blocks)
+
+
+def record_completions(
+    db: Session,
+    user_id: str,
+    course_id: str,
+    block_ids: Iterable[str],
+    completed_at: Optional[datetime] = None,
+) -> list[str]:
+    """Registra los bloques completados en una sentencia. No hace commit.
+    Devuelve los IDs de bloque nuevos (los repetidos se ignoran)."""
+    completed_at = completed_at or datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "course_id": course_id,
+            "module_id": block_id,
+            "is_completed": True,
+            "completed_at": completed_at,
+        }
+        for block_id in dict.fromkeys(block_ids)
+    ]
+    inserted = _insert_rows(db, rows)
+    _record_rollups(db, inserted)
+    record_completions_added(db, inserted)
+    return [row.module_id for row in inserted]
+
+
+# ── Modo buffered ─────────────────────────────────────────
+
+def buffer_completions(user_id: str, course_id: str, block_ids: Iterable[str]) -> bool:
+    """Encola las compleciones en Redis. False si Redis no está disponible
+    (el llamador debe escribir directamente)."""
+    now = datetime.now(timezone.utc).isoformat()
+    events = [
+        json.dumps({"u": user_id, "c": course_id, "b": block_id, "t": now})
+        for block_id in dict.fromkeys(block_ids)
+    ]
+    try:
+        redis_client.rpush(PROGRESS_BUFFER_KEY, *events)
+        return True
+    except redis.RedisError as e:
+        logger.warning(f"Cola de progreso no disponible, escritura directa: {e}")
+        return False
+
+
+# Lock propio del volcado, con token: solo su dueño lo renueva o lo libera.
+# El lock del scheduler dura menos que un volcado largo y no basta.
+_EXTEND_LOCK = redis_client.register_script(
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('expire', KEYS[1], ARGV[2]) end return 0"
+)
+_RELEASE_LOCK = redis_client.register_script(
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+)
+# Borra la cola volcada solo si el lock sigue siendo de quien la volcó
+_FINISH_FLUSH = redis_client.register_script(
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[2]) end return -1"
+)
+
+
+def flush_buffered_completions(db: Session, batch_size: int = FLUSH_BATCH) -> int:
+    """Vuelca la cola de Redis a user_progress por lotes de `batch_size`.
+    Devuelve cuántas compleciones nuevas se insertaron.
+
+    Un único volcado a la vez (PROGRESS_FLUSH_LOCK_KEY, renovado en cada
+    lote). Si otro proceso lo tiene, no hace nada. Si el lock se pierde a
+    mitad, se abandona sin borrar la cola: el siguiente volcado la retoma y
+    el upsert ignora lo ya insertado."""
+    token = uuid.uuid4().hex
+    if not redis_client.set(PROGRESS_FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_TTL):
+        return 0
+
+    inserted_count = 0
+    courses = set()
+    try:
+        if not redis_client.exists(PROGRESS_FLUSHING_KEY):
+            if not redis_client.exists(PROGRESS_BUFFER_KEY):
+                return 0
+            # Los RPUSH posteriores crean una cola nueva
+            redis_client.rename(PROGRESS_BUFFER_KEY, PROGRESS_FLUSHING_KEY)
+
+        total = redis_client.llen(PROGRESS_FLUSHING_KEY)
+        for start in range(0, total, batch_size):
+            if not _EXTEND_LOCK(keys=[PROGRESS_FLUSH_LOCK_KEY], args=[token, FLUSH_LOCK_TTL]):
+                logger.warning("Volcado de progreso abandonado: lock perdido")
+                return inserted_count
+            events = [
+                json.loads(raw)
+                for raw in redis_client.lrange(PROGRESS_FLUSHING_KEY, start, start + batch_size - 1)
+            ]
+            # Descarta eventos de cursos borrados (romperían el lote por la FK)
+            existing = {
+                row.id for row in db.query(Course.id).filter(Course.id.in_({e["c"] for e in events}))
+            }
+            rows = {
+                (e["u"], e["c"], e["b"]): {
+                    "id": str(uuid.uuid4()),
+                    "user_id": e["u"],
+                    "course_id": e["c"],
+                    "module_id": e["b"],
+                    "is_completed": True,
+                    "completed_at": datetime.fromisoformat(e["t"]),
+                }
+                for e in reversed(events)  # la primera compleción de cada bloque gana
+                if e["c"] in existing
+            }
+            inserted = _insert_rows(db, list(rows.values()))
+            _record_rollups(db, inserted)
+            record_completions_added(db, inserted)
+            db.commit()
+            inserted_count += len(inserted)
+            courses.update(row.course_id for row in inserted)
+
+        if _FINISH_FLUSH(keys=[PROGRESS_FLUSH_LOCK_KEY, PROGRESS_FLUSHING_KEY], args=[token]) < 0:
+            logger.warning("Volcado de progreso sin lock al terminar: la cola queda para el siguiente")
+    finally:
+        _RELEASE_LOCK(keys=[PROGRESS_FLUSH_LOCK_KEY], args=[token])
+        for course_id in courses:
+            invalidate_course_progress(course_id)
+    return inserted_count
@@ -1,6 +1,9 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.models.courses import CourseReview, Course
+from app.services.course_cards import refresh_course_card
+from app.core.cache import invalidate_course
+from app.services.related_courses import refresh_related_for_course
 
 
 def update_course_rating(db: Session, course_id: str):
@@ -17,5 +20,9 @@ def update_course_rating(db: Session, course_id: str):
     if course:
         course.rating_avg = round(avg or 0, 2)
         course.rating_count = count
+        refresh_course_card(db, course_id)
+        if course.status == "publicado":
+            refresh_related_for_course(db, course_id)
 
         db.commit()
+        invalidate_course(course_id)
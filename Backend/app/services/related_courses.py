@@ -0,0 +1,186 @@
+"""Índice precalculado de cursos relacionados (tabla related_courses).
+
+La relevancia de un candidato publicado `t` para un curso `s` combina:
+
+- misma categoría (3), mismo tema (2), mismo subtema (1.5)
+- 0.5 por cada público objetivo en común
+- co-compra: 2 · ln(1 + compradores de ambos cursos)
+- valoración del candidato (rating_avg / 5) como desempate
+
+Se guardan los RELATED_COURSES_TOP_N mejores por curso. Los candidatos sin
+ninguna señal siguen puntuando por valoración, así que la lista siempre se
+completa (lo que antes hacía la consulta de respaldo del endpoint).
+
+- rebuild_related_courses: recálculo completo (job periódico / CLI)
+- refresh_related_for_course: recálculo incremental tras publicar, despublicar
+  o cambiar la valoración de un curso
+"""
+from typing import Optional
+
+from sqlalchemy import select, func, and_, or_, case, distinct, exists, any_, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+
+from app.config import RELATED_COURSES_TOP_N
+from app.models.courses import Course, RelatedCourse
+from app.models.orders import Order, OrderStatus
+
+REBUILD_CHUNK = 500
+
+
+def _is_candidate(course):
+    return and_(course.status == "publicado", course.visibility == "publico")
+
+
+def _copurchase(source_ids: Optional[list[str]] = None, target_id: Optional[str] = None):
+    """Compradores (pedidos pagados) en común por par de cursos."""
+    a = aliased(Order)
+    b = aliased(Order)
+    query = (
+        select(
+            a.course_id.label("source_id"),
+            b.course_id.label("target_id"),
+            func.count(distinct(a.user_id)).label("buyers"),
+        )
+        .join(b, and_(b.user_id == a.user_id, b.course_id != a.course_id))
+        .where(a.status == OrderStatus.paid, b.status == OrderStatus.paid)
+        .group_by(a.course_id, b.course_id)
+    )
+    if source_ids is not None:
+        query = query.where(a.course_id.in_(source_ids))
+    if target_id is not None:
+        query = query.where(b.course_id == target_id)
+    return query.subquery()
+
+
+def _score(source, target, copurchase):
+    def same(column, weight):
+        s_col, t_col = getattr(source, column), getattr(target, column)
+        return case((and_(s_col.isnot(None), s_col == t_col), weight), else_=0)
+
+    audience = func.unnest(source.target_audience).table_valued("value")
+    audience_overlap = (
+        select(func.count())
+        .select_from(audience)
+        .where(audience.c.value == any_(target.target_audience))
+        .scalar_subquery()
+    )
+
+    return (
+        same("category", 3.0)
+        + same("topic", 2.0)
+        + same("subtopic", 1.5)
+        + 0.5 * func.coalesce(audience_overlap, 0)
+        + 2.0 * func.ln(1 + func.coalesce(copurchase.c.buyers, 0))
+        + func.coalesce(target.rating_avg, 0) / 5.0
+    )
+
+
+def _ranked_select(course_ids: list[str]):
+    source = aliased(Course)
+    target = aliased(Course)
+    copurchase = _copurchase(source_ids=course_ids)
+    score = _score(source, target, copurchase)
+
+    ranked = (
+        select(
+            source.id.label("course_id"),
+            target.id.label("related_course_id"),
+            score.label("score"),
+            func.row_number().over(
+                partition_by=source.id,
+                order_by=(score.desc(), target.rating_count.desc(), target.id),
+            ).label("rank"),
+        )
+        .select_from(source)
+        .join(target, and_(target.id != source.id, _is_candidate(target)))
+        .outerjoin(copurchase, and_(
+            copurchase.c.source_id == source.id,
+            copurchase.c.target_id == target.id,
+        ))
+        .where(source.id.in_(course_ids))
+        .subquery()
+    )
+    return select(
+        ranked.c.course_id, ranked.c.related_course_id, ranked.c.rank, ranked.c.score,
+    ).where(ranked.c.rank <= RELATED_COURSES_TOP_N)
+
+
+def refresh_related_courses(db: Session, course_ids: list[str]) -> None:
+    """Recalcula la lista de relacionados de los cursos indicados
+    (DELETE + INSERT ... SELECT). No hace commit."""
+    course_ids = list(course_ids)
+    if not course_ids:
+        return
+    db.flush()
+    db.query(RelatedCourse).filter(
+        RelatedCourse.course_id.in_(course_ids)
+    ).delete(synchronize_session=False)
+    db.execute(
+        pg_insert(RelatedCourse.__table__).from_select(
+            ["course_id", "related_course_id", "rank", "score"],
+            _ranked_select(course_ids),
+        )
+    )
+
+
+def _affected_sources(db: Session, course_id: str) -> list[str]:
+    """Cursos cuya lista puede cambiar por un cambio en `course_id`: los que
+    ya lo incluyen y aquellos en los que ahora superaría al último puesto."""
+    source = aliased(Course)
+    target = aliased(Course)
+    copurchase = _copurchase(target_id=course_id)
+
+    current = (
+        select(
+            RelatedCourse.course_id,
+            func.min(RelatedCourse.score).label("min_score"),
+            func.count().label("size"),
+        )
+        .group_by(RelatedCourse.course_id)
+        .subquery()
+    )
+    contains = exists().where(
+        RelatedCourse.course_id == source.id,
+        RelatedCourse.related_course_id == course_id,
+    )
+    beats_last = and_(
+        _is_candidate(target),
+        or_(
+            # Sin fila en current la lista está vacía: cualquier candidato entra
+            func.coalesce(current.c.size, 0) < RELATED_COURSES_TOP_N,
+            _score(source, target, copurchase) > current.c.min_score,
+        ),
+    )
+
+    rows = db.execute(
+        select(source.id)
+        .select_from(source)
+        .join(target, target.id == literal(course_id))
+        .outerjoin(current, current.c.course_id == source.id)
+        .outerjoin(copurchase, and_(
+            copurchase.c.source_id == source.id,
+            copurchase.c.target_id == target.id,
+        ))
+        .where(source.id != course_id, or_(contains, beats_last))
+    ).all()
+    return [row.id for row in rows]
+
+
+def refresh_related_for_course(db: Session, course_id: str) -> int:
+    """Actualización incremental tras publicar/despublicar un curso o cambiar
+    su valoración: su propia lista y las listas a las que entra o de las que
+    sale. No hace commit. Devuelve cuántas listas se recalcularon."""
+    db.flush()
+    course_ids = [course_id] + _affected_sources(db, course_id)
+    refresh_related_courses(db, course_ids)
+    return len(course_ids)
+
+
+def rebuild_related_courses(db: Session, chunk_size: int = REBUILD_CHUNK) -> int:
+    """Recálculo completo, por lotes de cursos con commit por lote."""
+    course_ids = [row.id for row in db.query(Course.id).order_by(Course.id)]
+    for start in range(0, len(course_ids), chunk_size):
+        refresh_related_courses(db, course_ids[start:start + chunk_size])
+        db.commit()
+    return len(course_ids)
@@ -0,0 +1,166 @@
+"""Progreso de los alumnos de un vendedor, agregado en SQL.
+
+Una fila por (alumno, curso) con pedido pagado: datos del alumno, fecha de
+inscripción, bloques completados, última actividad y porcentaje de progreso.
+El progreso sale de enrollment_progress y courses.total_blocks (búsqueda por
+clave primaria), no de contar user_progress y content_blocks.
+La búsqueda, los filtros de progreso, el orden y la paginación se aplican en
+la misma consulta; `total_count` (ventana COUNT(*) OVER ()) trae el total
+de filas que cumplen los filtros sin una segunda consulta.
+
+Lo usan /seller/students, su exportación y /analytics/students-ranking.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, func, case, cast, or_, Numeric, Select
+from sqlalchemy.orm import Session
+
+from app.models.courses import Course, EnrollmentProgress
+from app.models.orders import Order, OrderStatus
+from app.models.users import User
+
+SORT_FIELDS = ("progress", "last_activity", "enrolled_at", "name")
+
+
+def _enrollments_subquery(course_ids: list[str]):
+    return (
+        select(
+            Order.user_id,
+            Order.course_id,
+            func.min(Order.created_at).label("enrolled_at"),
+            func.sum(Order.price).label("order_price"),
+        )
+        .where(Order.course_id.in_(course_ids), Order.status == OrderStatus.paid)
+        .group_by(Order.user_id, Order.course_id)
+        .subquery("enrollments")
+    )
+
+
+def _with_progress(query, enrollments):
+    """Une los contadores de la inscripción (por clave primaria) y el curso."""
+    return (
+        query
+        .join(Course, Course.id == enrollments.c.course_id)
+        .outerjoin(EnrollmentProgress, (EnrollmentProgress.user_id == enrollments.c.user_id)
+                   & (EnrollmentProgress.course_id == enrollments.c.course_id))
+    )
+
+
+def student_progress_select(
+    course_ids: list[str],
+    search: Optional[str] = None,
+    progress_min: Optional[float] = None,
+    progress_max: Optional[float] = None,
+    enrolled_since: Optional[datetime] = None,
+    enrolled_until: Optional[datetime] = None,
+    sort: str = "enrolled_at",
+    descending: bool = True,
+    with_total: bool = True,
+) -> Select:
+    """SELECT de progreso por (alumno, curso) con filtros y orden aplicados.
+    `with_total` añade la columna total_count (COUNT(*) OVER ())."""
+    enrollments = _enrollments_subquery(course_ids)
+
+    completed = func.coalesce(EnrollmentProgress.completed_count, 0)
+    total_blocks = Course.total_blocks
+    percentage = case(
+        (total_blocks > 0, func.round(cast(completed, Numeric) * 100 / total_blocks, 1)),
+        else_=0,
+    )
+
+    columns = [
+        User.id.label("user_id"),
+        User.full_name,
+        User.email,
+        Course.id.label("course_id"),
+        Course.title.label("course_title"),
+        enrollments.c.enrolled_at,
+        enrollments.c.order_price,
+        completed.label("completed_blocks"),
+        total_blocks.label("total_blocks"),
+        percentage.label("progress_pct"),
+        EnrollmentProgress.last_activity_at.label("last_activity"),
+    ]
+    if with_total:
+        columns.append(func.count().over().label("total_count"))
+
+    query = _with_progress(
+        select(*columns).select_from(enrollments).join(User, User.id == enrollments.c.user_id),
+        enrollments,
+    )
+
+    if search:
+        # Subcadena literal: % y _ del texto buscado no son comodines
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        query = query.where(or_(
+            User.full_name.ilike(pattern, escape="\\"),
+            User.email.ilike(pattern, escape="\\"),
+        ))
+    if progress_min is not None:
+        query = query.where(percentage >= progress_min)
+    if progress_max is not None:
+        query = query.where(percentage <= progress_max)
+    if enrolled_since is not None:
+        query = query.where(enrollments.c.enrolled_at >= enrolled_since)
+    if enrolled_until is not None:
+        query = query.where(enrollments.c.enrolled_at < enrolled_until)
+
+    sort_column = {
+        "progress": percentage,
+        "last_activity": EnrollmentProgress.last_activity_at,
+        "enrolled_at": enrollments.c.enrolled_at,
+        "name": func.coalesce(User.full_name, User.email),
+    }[sort]
+    order = sort_column.desc().nulls_last() if descending else sort_column.asc().nulls_first()
+    return query.order_by(order, User.id, Course.id)
+
+
+def student_progress_rows(
+    db: Session,
+    course_ids: list[str],
+    limit: Optional[int] = None,
+    offset: int = 0,
+    **filters,
+):
+    """Filas de progreso de los alumnos de `course_ids` en una sola consulta.
+    `filters` son los de student_progress_select."""
+    if not course_ids:
+        return []
+    query = student_progress_select(course_ids, **filters)
+    if limit is not None:
+        query = query.limit(limit)
+    if offset:
+        query = query.offset(offset)
+    return db.execute(query).all()
+
+
+def student_progress_total(db: Session, course_ids: list[str], rows: list, **filters) -> int:
+    """Total de filas que cumplen los filtros. Sale de la ventana total_count
+    de `rows`; si la página pedida está más allá de la última, `rows` viene
+    vacía y se cuenta aparte."""
+    if rows:
+        return rows[0].total_count
+    if not course_ids:
+        return 0
+    query = student_progress_select(course_ids, **filters).order_by(None).subquery()
+    return db.execute(select(func.count()).select_from(query)).scalar()
+
+
+def student_progress_summary(db: Session, course_ids: list[str]):
+    """Media de progreso y nº de inscripciones con algún avance, en una consulta
+    sobre las mismas filas."""
+    enrollments = _enrollments_subquery(course_ids)
+    completed = func.coalesce(EnrollmentProgress.completed_count, 0)
+    total_blocks = Course.total_blocks
+    percentage = case((total_blocks > 0, cast(completed, Numeric) * 100 / total_blocks), else_=0)
+
+    return db.execute(_with_progress(
+        select(
+            func.count(func.distinct(enrollments.c.user_id)).label("total_students"),
+            func.count().filter(percentage > 0).label("active_students"),
+            func.coalesce(func.avg(percentage), 0).label("avg_completion"),
+        ).select_from(enrollments),
+        enrollments,
+    )).one()
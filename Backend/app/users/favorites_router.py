@@ -5,6 +5,7 @@ from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.users import Favorite
 from app.models.courses import Course
+from app.courses.recommendations import invalidate_user_recommendations
 
 router = APIRouter(prefix="/favorites", tags=["Favorites"])
 
@@ -29,6 +30,7 @@ def add_favorite(
     fav = Favorite(user_id=current_user.id, course_id=course_id)
     db.add(fav)
     db.commit()
+    invalidate_user_recommendations(current_user.id)
 
     return {"message": "Añadido a favoritos"}
 
@@ -49,6 +51,7 @@ def remove_favorite(
 
     db.delete(fav)
     db.commit()
+    invalidate_user_recommendations(current_user.id)
 
     return {"message": "Eliminado de favoritos"}
 
@@ -6,6 +6,8 @@ from app.models.users import User, UserRole, SellerRequest, ProfessionalProfile
 from app.core.security import verify_password, hash_password
 from app.schemas.users import UserResponse, UserUpdate, ChangePassword, ProfessionalProfileUpdate
 from app.models.orders import Order, OrderStatus
+from app.services.course_cards import refresh_seller_cards
+from app.core.cache import invalidate_catalog
 from typing import Annotated
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -26,8 +28,12 @@ def update_my_profile(
 ):
     if data.full_name:
         current_user.full_name = data.full_name
+        refresh_seller_cards(db, current_user.id, current_user.full_name)
 
     db.commit()
+    if data.full_name:
+        # Las tarjetas cacheadas (catálogo, colecciones, relacionados) llevan el nombre
+        invalidate_catalog()
     db.refresh(current_user)
     return current_user
 #__CAMBIAR PASSWORD__
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Optional
@@ -7,8 +7,12 @@ from datetime import datetime, timedelta
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.users import User, UserRole
-from app.models.courses import Course, UserProgress, ContentBlock, Module
+from app.models.courses import Course
 from app.models.orders import Order, OrderStatus
+from app.services.student_progress import (
+    student_progress_rows, student_progress_select, student_progress_summary, student_progress_total,
+)
+from app.core.export import export_response, select_columns
 
 router = APIRouter(prefix="/seller", tags=["seller-students"])
 
@@ -19,115 +23,112 @@ def require_seller_or_admin(current_user: User = Depends(get_current_user)):
     return current_user
 
 
-def _total_blocks_for_course(db: Session, course_id: str) -> int:
-    return (
-        db.query(func.count(ContentBlock.id))
-        .join(Module, ContentBlock.module_id == Module.id)
-        .filter(Module.course_id == course_id)
-        .scalar()
-        or 0
-    )
-
-
-def _completed_blocks_for_student(db: Session, user_id: str, course_id: str) -> int:
-    return (
-        db.query(func.count(UserProgress.id))
-        .filter(
-            UserProgress.user_id == user_id,
-            UserProgress.course_id == course_id,
-            UserProgress.is_completed == True,
-        )
-        .scalar()
-        or 0
-    )
-
-
 @router.get("/students")
 def get_seller_students(
+    response: Response,
     course_id: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     progress_min: Optional[float] = Query(None, ge=0, le=100),
     progress_max: Optional[float] = Query(None, ge=0, le=100),
+    sort: str = Query("enrolled_at", pattern="^(progress|last_activity|enrolled_at|name)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    page: int = Query(1, ge=1),
+    # Sin limit: todas las filas (el panel filtra en el cliente)
+    limit: Optional[int] = Query(None, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_seller_or_admin),
 ):
     # 1. Get seller's courses (optionally filtered by course_id)
-    courses_query = db.query(Course).filter(Course.seller_id == current_user.id)
+    courses_query = db.query(Course.id).filter(Course.seller_id == current_user.id)
     if course_id:
         courses_query = courses_query.filter(Course.id == course_id)
-    seller_courses = courses_query.all()
+    seller_course_ids = [row.id for row in courses_query]
 
-    if not seller_courses:
+    if not seller_course_ids:
+        response.headers["X-Total-Count"] = "0"
         return []
 
-    course_map = {c.id: c for c in seller_courses}
-    seller_course_ids = list(course_map.keys())
-
-    # 2. Get paid orders for those courses
-    orders = (
-        db.query(Order)
-        .filter(Order.course_id.in_(seller_course_ids), Order.status == OrderStatus.paid)
-        .all()
+    # 2. Una consulta: alumnos + progreso agregado, filtrado, ordenado y paginado
+    filters = dict(
+        search=search,
+        progress_min=progress_min,
+        progress_max=progress_max,
+        sort=sort,
+        descending=order == "desc",
     )
+    rows = student_progress_rows(
+        db, seller_course_ids,
+        limit=limit,
+        offset=(page - 1) * limit if limit else 0,
+        **filters,
+    )
+    response.headers["X-Total-Count"] = str(student_progress_total(db, seller_course_ids, rows, **filters))
+
+    return [
+        {
+            "student_id": r.user_id,
+            "student_name": r.full_name or r.email,
+            "student_email": r.email,
+            "course_id": r.course_id,
+            "course_title": r.course_title,
+            "enrolled_at": r.enrolled_at.isoformat() if r.enrolled_at else None,
+            "progress_percentage": float(r.progress_pct),
+            "completed_blocks": r.completed_blocks,
+            "total_blocks": r.total_blocks,
+            "last_activity": r.last_activity.isoformat() if r.last_activity else None,
+            "order_price": r.order_price or 0.0,
+        }
+        for r in rows
+    ]
 
-    results = []
-
-    for order in orders:
-        student = db.query(User).filter(User.id == order.user_id).first()
-        if not student:
-            continue
-
-        # Search filter
-        if search:
-            sl = search.lower()
-            name_ok = student.full_name and sl in student.full_name.lower()
-            email_ok = student.email and sl in student.email.lower()
-            if not name_ok and not email_ok:
-                continue
-
-        c_id = order.course_id
-        course = course_map[c_id]
-
-        total_blocks = _total_blocks_for_course(db, c_id)
-        completed_blocks = _completed_blocks_for_student(db, student.id, c_id)
 
-        progress_percentage = (
-            round((completed_blocks / total_blocks) * 100, 1) if total_blocks > 0 else 0.0
-        )
+STUDENT_EXPORT_COLUMNS = {
+    "user_id": "string",
+    "full_name": "string",
+    "email": "string",
+    "course_id": "string",
+    "course_title": "string",
+    "enrolled_at": "timestamp",
+    "order_price": "float",
+    "completed_blocks": "int",
+    "total_blocks": "int",
+    "progress_pct": "float",
+    "last_activity": "timestamp",
+}
 
-        # Progress range filters
-        if progress_min is not None and progress_percentage < progress_min:
-            continue
-        if progress_max is not None and progress_percentage > progress_max:
-            continue
-
-        # Last activity: MAX(completed_at) for that student+course
-        last_activity = (
-            db.query(func.max(UserProgress.completed_at))
-            .filter(
-                UserProgress.user_id == student.id,
-                UserProgress.course_id == c_id,
-            )
-            .scalar()
-        )
 
-        results.append(
-            {
-                "student_id": student.id,
-                "student_name": student.full_name or student.email,
-                "student_email": student.email,
-                "course_id": c_id,
-                "course_title": course.title,
-                "enrolled_at": order.created_at.isoformat() if order.created_at else None,
-                "progress_percentage": progress_percentage,
-                "completed_blocks": completed_blocks,
-                "total_blocks": total_blocks,
-                "last_activity": last_activity.isoformat() if last_activity else None,
-                "order_price": order.price or 0.0,
-            }
-        )
+@router.get("/students/export")
+def export_seller_students(
+    course_id: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    progress_min: Optional[float] = Query(None, ge=0, le=100),
+    progress_max: Optional[float] = Query(None, ge=0, le=100),
+    since: Optional[datetime] = Query(None, description="Inscritos desde esta fecha"),
+    until: Optional[datetime] = Query(None, description="Inscritos antes de esta fecha"),
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    columns: Optional[str] = Query(None, description="Columnas separadas por comas; todas si se omite"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_seller_or_admin),
+):
+    """Listado completo de alumnos en CSV o Parquet, enviado en streaming."""
+    selected = select_columns(columns, STUDENT_EXPORT_COLUMNS)
 
-    return results
+    courses_query = db.query(Course.id).filter(Course.seller_id == current_user.id)
+    if course_id:
+        courses_query = courses_query.filter(Course.id == course_id)
+    seller_course_ids = [row.id for row in courses_query]
+
+    statement = student_progress_select(
+        seller_course_ids,
+        search=search,
+        progress_min=progress_min,
+        progress_max=progress_max,
+        enrolled_since=since,
+        enrolled_until=until,
+        sort="enrolled_at",
+        with_total=False,
+    )
+    return export_response(statement, selected, format, "alumnos")
 
 
 @router.get("/students/summary")
@@ -148,15 +149,6 @@ def get_seller_students_summary(
             "students_this_month": 0,
         }
 
-    orders = (
-        db.query(Order)
-        .filter(Order.course_id.in_(seller_course_ids), Order.status == OrderStatus.paid)
-        .all()
-    )
-
-    unique_students = {o.user_id for o in orders}
-    total_students = len(unique_students)
-
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
     students_this_month = (
         db.query(func.count(Order.id))
@@ -169,23 +161,11 @@ def get_seller_students_summary(
         or 0
     )
 
-    active_students = 0
-    total_progress = 0.0
-    count = len(orders)
-
-    for order in orders:
-        total_blocks = _total_blocks_for_course(db, order.course_id)
-        completed = _completed_blocks_for_student(db, order.user_id, order.course_id)
-        pct = (completed / total_blocks * 100) if total_blocks > 0 else 0.0
-        if pct > 0:
-            active_students += 1
-        total_progress += pct
-
-    avg_completion = round(total_progress / count, 1) if count > 0 else 0.0
+    summary = student_progress_summary(db, seller_course_ids)
 
     return {
-        "total_students": total_students,
-        "active_students": active_students,
-        "avg_completion": avg_completion,
+        "total_students": summary.total_students,
+        "active_students": summary.active_students,
+        "avg_completion": round(float(summary.avg_completion), 1),
         "students_this_month": students_this_month,
     }
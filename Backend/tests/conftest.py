@@ -1,2 +1,182 @@
 import sys
 sys.path.insert(0, '/Users/luisdavidsenra/Desktop/proyectoMedico/Backend')
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, insert
+
+from app.database import SessionLocal, engine
+from app.models.courses import Course, CourseOffer
+from app.models.orders import Order, OrderStatus
+from app.models.users import User
+
+
+# ── Benchmarks ────────────────────────────────────────────
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", help="ejecuta también las pruebas de rendimiento")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: prueba de rendimiento; solo con --benchmark (tiempos en record_property)"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark: usa --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+# ── Transacción de prueba ─────────────────────────────────
+
+# Conexión de la transacción de prueba activa (None fuera de ella)
+_active = {"connection": None}
+
+
+@contextmanager
+def _transaction():
+    """Todo lo que se escribe dentro se deshace al salir.
+
+    Abre una transacción externa (o un savepoint, si ya hay una abierta a
+    nivel de módulo) y enlaza SessionLocal a esa conexión: las sesiones de
+    la prueba, de los endpoints (get_db) y de los servicios que abren la
+    suya comparten la transacción, y sus commit solo liberan savepoints.
+    """
+    outer = _active["connection"]
+    connection = outer or engine.connect()
+    transaction = connection.begin_nested() if outer else connection.begin()
+    if not outer:
+        SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+        _active["connection"] = connection
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        if transaction.is_active:
+            transaction.rollback()
+        if not outer:
+            SessionLocal.configure(bind=engine, join_transaction_mode="conservative_savepoint")
+            _active["connection"] = None
+            connection.close()
+
+
+@pytest.fixture
+def db():
+    """Sesión de la prueba; sus datos se deshacen al terminar."""
+    with _transaction() as session:
+        yield session
+
+
+@pytest.fixture(scope="module")
+def module_db():
+    """Sesión compartida por las pruebas de un módulo (datos grandes que se
+    siembran una vez). Cada prueba que pida `db` trabaja en un savepoint
+    dentro de esta transacción."""
+    with _transaction() as session:
+        yield session
+
+
+# ── Factorías ─────────────────────────────────────────────
+
+def _id(value):
+    return getattr(value, "id", value)
+
+
+class Factory:
+    """Filas mínimas válidas para las pruebas. Hace flush, no commit.
+    Acepta objetos o ids en las referencias."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def _add(self, row):
+        self.db.add(row)
+        self.db.flush()
+        return row
+
+    def user(self, role: str = "buyer", **fields) -> User:
+        user_id = fields.pop("id", None) or str(uuid.uuid4())
+        fields.setdefault("email", f"test_{user_id}@example.com")
+        return self._add(User(id=user_id, password_hash="x", role=role, **fields))
+
+    def users(self, n: int, **fields) -> list[str]:
+        """`n` usuarios en un INSERT; `fields` puede llevar callables f(i)."""
+        ids = [str(uuid.uuid4()) for _ in range(n)]
+        self.db.execute(insert(User), [
+            {
+                "id": user_id,
+                "email": f"test_{user_id}@example.com",
+                "password_hash": "x",
+                **{k: v(i) if callable(v) else v for k, v in fields.items()},
+            }
+            for i, user_id in enumerate(ids)
+        ])
+        return ids
+
+    def course(self, seller, **fields) -> Course:
+        fields.setdefault("title", "Curso de prueba")
+        return self._add(Course(id=fields.pop("id", None) or str(uuid.uuid4()), seller_id=_id(seller), **fields))
+
+    def offer(self, course, price: float = 10.0, **fields) -> CourseOffer:
+        fields.setdefault("name_public", "General")
+        return self._add(CourseOffer(
+            id=fields.pop("id", None) or str(uuid.uuid4()), course_id=_id(course), price_base=price, **fields,
+        ))
+
+    def order(self, user, offer: CourseOffer, status=OrderStatus.paid, **fields) -> Order:
+        fields.setdefault("price", offer.price_base)
+        return self._add(Order(user_id=_id(user), course_id=offer.course_id, offer_id=offer.id, status=status, **fields))
+
+
+@pytest.fixture
+def make(db):
+    return Factory(db)
+
+
+@pytest.fixture(scope="module")
+def module_make(module_db):
+    return Factory(module_db)
+
+
+# ── Contador de sentencias ────────────────────────────────
+
+# Sentencias de la propia transacción de prueba, no de la aplicación
+_SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class QueryCounter:
+    """Cuenta las sentencias SQL ejecutadas contra el engine de la app."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def reset(self):
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(_SAVEPOINT_STATEMENTS):
+            self.statements.append(statement)
+
+
+@pytest.fixture
+def query_counter(request):
+    # Una conexión ya abierta no ve los listeners que se añaden al engine
+    # después: dentro de una transacción de prueba se escucha la conexión
+    if "db" in request.fixturenames:
+        request.getfixturevalue("db")
+    target = _active["connection"] or engine
+    counter = QueryCounter()
+    event.listen(target, "before_cursor_execute", counter._on_execute)
+    yield counter
+    event.remove(target, "before_cursor_execute", counter._on_execute)
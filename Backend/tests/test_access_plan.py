@@ -0,0 +1,59 @@
+import uuid
+
+import pytest
+
+from app.core.cache import invalidate_course_structure
+from app.models.courses import Module, ContentBlock, UserProgress
+from app.services.access import get_accessible_blocks
+
+
+@pytest.fixture
+def sequential_course(db, make):
+    """Curso secuencial de 6 bloques comprado por un alumno."""
+    seller, student = make.user(role="seller"), make.user()
+    course = make.course(seller, title="Secuencial", progression_type="secuencial")
+    offer = make.offer(course)
+    modules = [Module(id=str(uuid.uuid4()), course_id=course.id, title=f"M{m}", order=m) for m in range(2)]
+    db.add_all(modules)
+    db.flush()
+    blocks = [
+        ContentBlock(id=str(uuid.uuid4()), module_id=module.id, type="video", title=f"B{m}.{b}", order=b)
+        for m, module in enumerate(modules) for b in range(3)
+    ]
+    db.add_all(blocks)
+    make.order(student, offer)
+    db.commit()
+    invalidate_course_structure(course.id)
+
+    return db, student.id, course.id, [b.id for b in blocks]
+
+
+def test_cached_plan_skips_structure_queries(sequential_course, query_counter):
+    db, user_id, course_id, block_ids = sequential_course
+    db.add_all([UserProgress(user_id=user_id, course_id=course_id, module_id=b) for b in block_ids[:2]])
+    db.commit()
+
+    query_counter.reset()
+    assert get_accessible_blocks(course_id, user_id, db) == set(block_ids[:3])
+    cold = query_counter.count
+
+    query_counter.reset()
+    assert get_accessible_blocks(course_id, user_id, db) == set(block_ids[:3])
+    # Plan y accesos en caché: solo el progreso del alumno
+    assert query_counter.count == 1 < cold
+
+
+def test_structure_change_invalidates_plan(sequential_course):
+    db, user_id, course_id, block_ids = sequential_course
+    assert get_accessible_blocks(course_id, user_id, db) == {block_ids[0]}
+
+    # El último bloque pasa a ser el primero del curso
+    first_module = db.query(ContentBlock.module_id).filter(ContentBlock.id == block_ids[0]).scalar()
+    db.query(ContentBlock).filter(ContentBlock.id == block_ids[-1]).update(
+        {ContentBlock.module_id: first_module, ContentBlock.order: -1}, synchronize_session=False,
+    )
+    db.commit()
+    assert get_accessible_blocks(course_id, user_id, db) == {block_ids[0]}  # plan aún en caché
+
+    invalidate_course_structure(course_id)
+    assert get_accessible_blocks(course_id, user_id, db) == {block_ids[-1]}
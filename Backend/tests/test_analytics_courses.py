@@ -0,0 +1,64 @@
+import uuid
+
+import pytest
+
+from app.analytics.router import get_courses_stats
+from app.models.courses import Course, Module, ContentBlock, UserProgress
+from app.services.analytics_rollup import record_order_paid
+from app.services.enrollment_progress import reconcile_enrollment_progress
+
+
+def _seed_seller(db, make, n_courses, blocks_per_course=3):
+    """Vendedor con `n_courses` cursos; en cada uno compran dos alumnos y uno
+    completa todos los bloques."""
+    seller = make.user(role="seller")
+    buyers = [make.user() for _ in range(2)]
+    for i in range(n_courses):
+        course = make.course(seller, title=f"Curso {i}", status="publicado")
+        offer = make.offer(course, price=30.0)
+        module = Module(id=str(uuid.uuid4()), course_id=course.id, title="M1", order=0)
+        db.add(module)
+        db.flush()
+        block_ids = [str(uuid.uuid4()) for _ in range(blocks_per_course)]
+        db.add_all([
+            ContentBlock(id=b, module_id=module.id, type="video", title=f"B{k}", order=k)
+            for k, b in enumerate(block_ids)
+        ])
+        for buyer in buyers:
+            record_order_paid(db, make.order(buyer, offer))
+        db.add_all([UserProgress(user_id=buyers[0].id, course_id=course.id, module_id=b) for b in block_ids])
+        db.add(UserProgress(user_id=buyers[1].id, course_id=course.id, module_id=block_ids[0]))
+    db.commit()
+    for (course_id,) in db.query(Course.id).filter(Course.seller_id == seller.id).all():
+        reconcile_enrollment_progress(db, course_id)
+    return seller
+
+
+@pytest.fixture
+def sellers(db, make):
+    small = _seed_seller(db, make, 1)
+    large = _seed_seller(db, make, 30)
+    # Recarga los vendedores tras el commit para no contar ese SELECT
+    db.refresh(small)
+    db.refresh(large)
+    return db, small, large
+
+
+def test_courses_stats_constant_statement_count(sellers, query_counter):
+    db, small, large = sellers
+
+    query_counter.reset()
+    stats_small = get_courses_stats(current_user=small, db=db)
+    small_count = query_counter.count
+
+    query_counter.reset()
+    stats_large = get_courses_stats(current_user=large, db=db)
+    large_count = query_counter.count
+
+    # Cursos + filas diarias + bloques + alumnos que completaron
+    assert small_count == large_count <= 4
+    assert len(stats_small) == 1 and len(stats_large) == 30
+    for stat in stats_large:
+        assert stat.student_count == 2
+        assert stat.revenue == 60.0
+        assert stat.completion_rate == 50.0
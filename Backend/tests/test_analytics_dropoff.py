@@ -0,0 +1,69 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.analytics.router import _dropoff_report
+from app.models.courses import Module, ContentBlock, UserProgress
+
+N_MODULES = 4
+BLOCKS_PER_MODULE = 10
+
+
+@pytest.fixture
+def funnel_course(db, make):
+    """4 alumnos; el alumno k completa los primeros 10·(k+1) bloques. El
+    progreso del alumno 0 es de hace 60 días, el resto de hace 2."""
+    now = datetime.now(timezone.utc)
+    seller = make.user(role="seller")
+    students = [make.user() for _ in range(4)]
+    course = make.course(seller, title="Embudo")
+    offer = make.offer(course, price=0)
+
+    block_ids = []
+    for m in range(N_MODULES):
+        module = Module(id=str(uuid.uuid4()), course_id=course.id, title=f"M{m}", order=m)
+        db.add(module)
+        db.flush()
+        for b in range(BLOCKS_PER_MODULE):
+            block = ContentBlock(id=str(uuid.uuid4()), module_id=module.id, type="video", title=f"B{m}.{b}", order=b)
+            db.add(block)
+            block_ids.append(block.id)
+
+    for k, student in enumerate(students):
+        make.order(student, offer)
+        completed_at = now - timedelta(days=60 if k == 0 else 2)
+        db.add_all([
+            UserProgress(user_id=student.id, course_id=course.id, module_id=block_id, completed_at=completed_at)
+            for block_id in block_ids[:BLOCKS_PER_MODULE * (k + 1)]
+        ])
+    db.commit()
+    db.refresh(course)
+
+    return db, course
+
+
+def test_funnel_in_one_statement(funnel_course, query_counter):
+    db, course = funnel_course
+
+    query_counter.reset()
+    report = _dropoff_report(db, course, None, None)
+    assert query_counter.count == 1
+
+    assert report["total_enrolled"] == 4
+    completed = [b["completed"] for b in report["blocks"]]
+    assert completed == [4] * 10 + [3] * 10 + [2] * 10 + [1] * 10
+    assert [b["order"] for b in report["blocks"]] == list(range(1, 41))
+    assert report["blocks"][10]["is_dropoff"] is True
+    assert report["blocks"][10]["module_title"] == "M1"
+
+
+def test_funnel_time_range(funnel_course):
+    db, course = funnel_course
+    since = datetime.now(timezone.utc) - timedelta(days=30)
+
+    recent = _dropoff_report(db, course, since, None)
+    assert [b["completed"] for b in recent["blocks"]][::10] == [3, 3, 2, 1]
+
+    before = _dropoff_report(db, course, None, since)
+    assert [b["completed"] for b in before["blocks"]][::10] == [1, 0, 0, 0]
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.analytics.router import get_retention_data
+from app.analytics.service import AnalyticsService
+from app.models.courses import UserProgress
+
+# Semanas con actividad de cada alumno tras inscribirse
+ACTIVITY = [[1, 2, 4, 8], [1, 4], [1], [], [2, 8]]
+
+
+@pytest.fixture
+def cohort(request, db, make):
+    seller = make.user(role="seller")
+    students = [make.user() for _ in ACTIVITY]
+    course = make.course(seller, title="Retención")
+    offer = make.offer(course)
+
+    # Por defecto todos se inscriben a mediados de un mes de hace ~4 meses
+    now = datetime.now(timezone.utc)
+    enrolled_at = getattr(request, "param", None)
+    if enrolled_at is None:
+        month_start = (now - timedelta(days=120)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        enrolled_at = month_start + timedelta(days=14)
+    for student, weeks in zip(students, ACTIVITY):
+        make.order(student, offer, created_at=enrolled_at)
+        for n in weeks:
+            db.add(UserProgress(user_id=student.id, course_id=course.id, module_id=f"b{n}",
+                                completed_at=enrolled_at + timedelta(days=7 * (n - 1) + 2)))
+    db.commit()
+    db.refresh(seller)
+
+    return db, seller, course.id
+
+
+def test_retention_triangle_in_one_statement(cohort, query_counter):
+    db, seller, course_id = cohort
+
+    query_counter.reset()
+    rows = AnalyticsService.get_retention_cohorts(
+        db, [course_id], since=datetime.now(timezone.utc) - timedelta(days=365)
+    )
+    assert query_counter.count == 1
+
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row.initial, row.w1, row.w2, row.w4, row.w8) == (5, 3, 2, 2, 2)
+
+
+def test_retention_endpoint_selected_week(cohort):
+    db, seller, course_id = cohort
+
+    [month] = get_retention_data(course_id=course_id, week=2, db=db, current_user=seller)
+    assert month["initial_active"] == 5
+    assert month["week_active"] == 2
+    assert month["week4_active"] == 2
+    assert month["retention_percent"] == 40
+    assert month["retention"] == {"1": 60, "2": 40, "4": 40, "8": 40}
+
+
+def _end_of_month_enrollment():
+    """Último día del mes que contiene hace 45 días: el mes acabó hace entre
+    2 y 6 semanas, pero empezó hace más de 6."""
+    now = datetime.now(timezone.utc)
+    month_start = (now - timedelta(days=45)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_end = (month_start + timedelta(days=32)).replace(day=1)
+    return month_end - timedelta(hours=12)
+
+
+@pytest.mark.parametrize("cohort", [_end_of_month_enrollment()], indirect=True)
+def test_retention_waits_for_end_of_month_enrollments(cohort):
+    db, seller, course_id = cohort
+    now = datetime.now(timezone.utc)
+    enrolled_at = _end_of_month_enrollment()
+
+    [month] = get_retention_data(course_id=course_id, week=4, db=db, current_user=seller)
+    for n in (1, 2, 4, 8):
+        # Solo se muestra la semana N cuando ha terminado también para los
+        # inscritos el último día del mes
+        elapsed = now >= enrolled_at + timedelta(weeks=n, hours=12)
+        assert (month["retention"][str(n)] is not None) == elapsed
+    assert month["retention"]["1"] == 60
+    assert month["retention"]["8"] is None
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.analytics import CourseDailyStats
+from app.models.courses import UserProgress
+from app.models.orders import Order, OrderStatus
+from app.services.analytics_rollup import (
+    record_order_paid, record_progress, record_progress_removed, backfill_rollups,
+)
+
+COLUMNS = ("revenue", "purchases", "new_students", "blocks_completed", "active_learners")
+
+
+@pytest.fixture
+def course(db, make):
+    seller = make.user()
+    buyers = [make.user().id for _ in range(3)]
+    course = make.course(seller, title="Curso rollup", status="publicado")
+    offer = make.offer(course, price=50.0)
+    db.commit()
+
+    return db, course.id, offer.id, buyers
+
+
+def _snapshot(db, course_id):
+    rows = db.query(CourseDailyStats).filter(CourseDailyStats.course_id == course_id).all()
+    return {r.day: tuple(getattr(r, c) for c in COLUMNS) for r in rows}
+
+
+def test_incremental_rollups_match_backfill(course):
+    db, course_id, offer_id, buyers = course
+    now = datetime.now(timezone.utc)
+
+    # Dos compras del mismo alumno (alumno nuevo una sola vez) y una de otro
+    for user_id, price in [(buyers[0], 50.0), (buyers[0], 20.0), (buyers[1], 50.0)]:
+        order = Order(user_id=user_id, course_id=course_id, offer_id=offer_id,
+                      price=price, status=OrderStatus.paid, created_at=now)
+        db.add(order)
+        record_order_paid(db, order)
+
+    # Progreso: tres bloques de un alumno, uno de otro, y uno desmarcado
+    for user_id, block in [(buyers[0], "b1"), (buyers[0], "b2"), (buyers[0], "b3"), (buyers[1], "b1")]:
+        db.add(UserProgress(user_id=user_id, course_id=course_id, module_id=block, completed_at=now))
+        record_progress(db, course_id, user_id, now)
+    db.commit()
+
+    removed = db.query(UserProgress).filter(
+        UserProgress.course_id == course_id, UserProgress.module_id == "b3"
+    ).one()
+    record_progress_removed(db, course_id, removed.completed_at)
+    db.delete(removed)
+    db.commit()
+
+    incremental = _snapshot(db, course_id)
+    assert incremental == {now.date(): (120.0, 3, 2, 3, 2)}
+
+    backfill_rollups(db, since=now.date() - timedelta(days=1))
+    assert _snapshot(db, course_id) == incremental
@@ -0,0 +1,87 @@
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert
+
+from app.analytics.service import AnalyticsService
+from app.models.orders import Order, OrderStatus
+from app.services.analytics_rollup import backfill_rollups
+
+N_ORDERS = 100_000
+N_BUYERS = 2_000
+N_COURSES = 10
+
+
+@pytest.fixture(scope="module")
+def seller_with_orders(module_db, module_make):
+    """Vendedor con 10 cursos y 100k pedidos repartidos en dos años."""
+    db = module_db
+    rng = random.Random(14)
+    now = datetime.now(timezone.utc)
+    seller_id = module_make.user(role="seller").id
+    buyer_ids = module_make.users(N_BUYERS)
+    courses = [module_make.course(seller_id, title=f"Curso {i}", status="publicado") for i in range(N_COURSES)]
+    offers = [module_make.offer(course, price=100.0) for course in courses]
+    course_ids = [c.id for c in courses]
+    offer_ids = [o.id for o in offers]
+
+    statuses = [OrderStatus.paid] * 8 + [OrderStatus.pending, OrderStatus.refunded]
+    orders = []
+    for _ in range(N_ORDERS):
+        c = rng.randrange(N_COURSES)
+        orders.append({
+            "id": str(uuid.uuid4()),
+            "user_id": rng.choice(buyer_ids),
+            "course_id": course_ids[c],
+            "offer_id": offer_ids[c],
+            "price": rng.choice([49.0, 99.0, 149.0]),
+            "status": rng.choice(statuses),
+            "created_at": now - timedelta(minutes=rng.randrange(730 * 24 * 60)),
+        })
+    for start in range(0, N_ORDERS, 10_000):
+        db.execute(insert(Order), orders[start:start + 10_000])
+    db.commit()
+    backfill_rollups(db)
+
+    return seller_id, course_ids, orders
+
+
+def test_stats_match_orders(seller_with_orders, db, query_counter):
+    seller_id, course_ids, orders = seller_with_orders
+    today = datetime.now(timezone.utc).date()
+    query_counter.reset()
+    stats = AnalyticsService.get_stats(db, seller_id, course_ids[0], 30)
+    # Filas diarias (KPIs + series) + valoraciones + últimas reseñas
+    assert query_counter.count == 3
+
+    paid = [o for o in orders if o["course_id"] == course_ids[0] and o["status"] == OrderStatus.paid]
+    # Los periodos se cortan por día UTC completo
+    recent = [o for o in paid if o["created_at"].date() >= today - timedelta(days=30)]
+    previous = [o for o in paid if today - timedelta(days=60) <= o["created_at"].date() < today - timedelta(days=30)]
+
+    metrics = stats["metrics"]
+    assert metrics["totalEnrolled"] == len(paid)
+    assert metrics["totalRevenue"] == pytest.approx(sum(o["price"] for o in recent))
+    assert sum(p["value"] for p in stats["enrollment_chart"]) == len(recent)
+    assert sum(p["value"] for p in stats["revenue_chart"]) == pytest.approx(metrics["totalRevenue"])
+    expected_change = (len(recent) - len(previous)) / len(previous) * 100
+    assert metrics["studentsChange"] == round(expected_change, 1)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("days", [30, 90, 3650])
+def test_stats_benchmark(seller_with_orders, db, days, record_property):
+    """Benchmark: resumen de un vendedor con 100k pedidos (leído de las filas diarias)."""
+    seller_id, _, _ = seller_with_orders
+    AnalyticsService.get_stats(db, seller_id, "all", days)
+    runs = 10
+    started = time.perf_counter()
+    for _ in range(runs):
+        stats = AnalyticsService.get_stats(db, seller_id, "all", days)
+    per_call = (time.perf_counter() - started) / runs
+
+    record_property("ms_per_call", round(per_call * 1000, 1))
+    assert stats["metrics"]["totalEnrolled"] > 0
@@ -0,0 +1,65 @@
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.courses import Module, ContentBlock
+
+client = TestClient(app)
+
+
+def _seed_course(db, make, seller, n_modules, n_blocks):
+    course = make.course(seller, title=f"Detalle {n_modules}x{n_blocks}")
+    convocatoria = make.offer(
+        course, price=0, name_public="Convocatoria", inscription_type="convocatoria", max_students=30,
+        course_start=datetime.now(timezone.utc) + timedelta(days=10),
+    )
+    make.offer(course, price=99, name_public="Siempre")
+    modules, blocks = [], []
+    for m in range(n_modules):
+        module_id = str(uuid.uuid4())
+        modules.append({"id": module_id, "course_id": course.id, "title": f"M{m}", "order": m})
+        for b in range(n_blocks):
+            blocks.append({
+                "id": str(uuid.uuid4()), "module_id": module_id,
+                "type": "video", "title": f"B{b}", "order": b,
+            })
+    db.bulk_insert_mappings(Module, modules)
+    db.bulk_insert_mappings(ContentBlock, blocks)
+    return course.id, convocatoria
+
+
+@pytest.fixture(scope="module")
+def detail_courses(module_db, module_make):
+    seller = module_make.user(role="seller", full_name="Dra. Detalle")
+    buyer = module_make.user()
+
+    small, _ = _seed_course(module_db, module_make, seller, 1, 1)
+    large, convocatoria = _seed_course(module_db, module_make, seller, 20, 25)
+    module_make.order(buyer, convocatoria)
+    module_db.commit()
+
+    return {"small": small, "large": large}
+
+
+def test_course_detail_statement_count_is_constant(detail_courses, query_counter):
+    """El número de sentencias no depende de cuántos módulos o bloques tenga el curso."""
+    counts = {}
+    for key, course_id in detail_courses.items():
+        query_counter.reset()
+        res = client.get(f"/courses/{course_id}")
+        assert res.status_code == 200
+        counts[key] = query_counter.count
+
+    assert counts["small"] == counts["large"]
+
+
+def test_course_detail_payload(detail_courses):
+    res = client.get(f"/courses/{detail_courses['large']}")
+    data = res.json()
+    assert len(data["modules"]) == 20
+    assert [m["order"] for m in data["modules"]] == list(range(20))
+    assert all(len(m["blocks"]) == 25 for m in data["modules"])
+    assert data["seller_profile"]["name"] == "Dra. Detalle"
+    assert data["cohort_info"]["enrolled_count"] == 1
+    assert data["cohort_info"]["spots_left"] == 29
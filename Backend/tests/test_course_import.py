@@ -0,0 +1,80 @@
+import time
+import pytest
+from app.models.courses import Module, ContentBlock, CourseOffer
+from app.schemas.courses import CourseCreate
+from app.courses.importer import import_course
+
+N_MODULES = 20
+BLOCKS_PER_MODULE = 25  # 500 bloques por curso
+N_COURSES = 5
+
+
+def _synthetic_course(n_modules=N_MODULES, blocks_per_module=BLOCKS_PER_MODULE) -> CourseCreate:
+    return CourseCreate.model_validate({
+        "titulo": "Curso sintético",
+        "categoria": "Cardiología",
+        "modulos": [
+            {
+                "nombre": f"Módulo {m}",
+                "bloques": [
+                    {
+                        "type": "quiz" if b % 5 == 0 else "video",
+                        "titulo": f"Lección {m}.{b}",
+                        "duracion": "10:00",
+                        "quiz_data": {"questions": [
+                            {"q": f"Pregunta {k}", "options": ["a", "b", "c"], "answer": k % 3}
+                            for k in range(5)
+                        ]} if b % 5 == 0 else None,
+                    }
+                    for b in range(blocks_per_module)
+                ],
+            }
+            for m in range(n_modules)
+        ],
+        "ofertas": [
+            {"nombrePublico": "General", "precioBase": 99},
+            {"nombrePublico": "Convocatoria", "precioBase": 149, "inscripcionTipo": "convocatoria",
+             "course_start": "2030-01-15T09:00:00Z", "max_students": 40},
+        ],
+        "bibliografia": [
+            {"type": "Artículo", "referencia": f"Referencia {i}"} for i in range(10)
+        ],
+    })
+
+
+@pytest.fixture(scope="module")
+def seller(module_db, module_make):
+    seller = module_make.user(role="seller")
+    module_db.commit()
+    return seller.id
+
+
+def test_import_writes_one_statement_per_table(seller, db, query_counter):
+    query_counter.reset()
+    course_id, inserted = import_course(db, _synthetic_course(), seller)
+    db.commit()
+    statements = query_counter.count
+
+    assert inserted == {"courses": 1, "modules": 20, "blocks": 500, "offers": 2, "bibliography": 10}
+    # 5 INSERT (uno por tabla) + COMMIT eventual del driver
+    assert statements <= 6
+    assert db.query(ContentBlock).join(Module).filter(Module.course_id == course_id).count() == 500
+    offer = db.query(CourseOffer).filter(
+        CourseOffer.course_id == course_id, CourseOffer.inscription_type == "convocatoria"
+    ).one()
+    assert offer.course_start is not None
+
+
+@pytest.mark.benchmark
+def test_import_throughput_500_block_courses(seller, db, record_property):
+    """Benchmark: cursos de 500 bloques importados por segundo."""
+    documents = [_synthetic_course() for _ in range(N_COURSES)]
+    started = time.perf_counter()
+    for document in documents:
+        import_course(db, document, seller)
+        db.commit()
+    elapsed = time.perf_counter() - started
+
+    blocks = N_COURSES * N_MODULES * BLOCKS_PER_MODULE
+    record_property("courses_per_second", round(N_COURSES / elapsed, 1))
+    record_property("blocks_per_second", round(blocks / elapsed))
@@ -0,0 +1,125 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.courses import Course, Module, ContentBlock, CourseOffer
+from app.services.course_cards import refresh_course_cards
+
+client = TestClient(app)
+
+N_COURSES = 3000
+
+
+@pytest.fixture(scope="module")
+def large_catalog(module_db, module_make):
+    """Siembra un catálogo de miles de cursos (con ofertas, módulos y bloques)
+    para un seller de prueba."""
+    db = module_db
+    seller_id = module_make.user(role="seller", full_name="Bench Seller").id
+
+    courses, offers, modules, blocks = [], [], [], []
+    for i in range(N_COURSES):
+        course_id = str(uuid.uuid4())
+        courses.append({
+            "id": course_id, "title": f"Curso bench {i}", "seller_id": seller_id,
+            "category": "Cardiología", "status": "publicado", "visibility": "publico",
+            "total_blocks": 6,
+        })
+        for price in (49.0, 99.0):
+            offers.append({
+                "id": str(uuid.uuid4()), "course_id": course_id,
+                "name_public": f"Oferta {price}", "price_base": price,
+            })
+        for m in range(2):
+            module_id = str(uuid.uuid4())
+            modules.append({"id": module_id, "course_id": course_id, "title": f"Módulo {m}", "order": m})
+            for b in range(3):
+                blocks.append({
+                    "id": str(uuid.uuid4()), "module_id": module_id,
+                    "type": "video", "title": f"Bloque {b}", "order": b,
+                })
+
+    db.bulk_insert_mappings(Course, courses)
+    db.bulk_insert_mappings(CourseOffer, offers)
+    db.bulk_insert_mappings(Module, modules)
+    db.bulk_insert_mappings(ContentBlock, blocks)
+    refresh_course_cards(db, [c["id"] for c in courses])
+    db.commit()
+
+    return seller_id
+
+
+def test_list_courses_query_count_is_flat(large_catalog, query_counter):
+    """El número de sentencias por página no depende del tamaño de página."""
+    counts = {}
+    for limit in (10, 50, 100):
+        query_counter.reset()
+        res = client.get(f"/courses/?seller_id={large_catalog}&limit={limit}&page=3")
+        assert res.status_code == 200
+        body = res.json()
+        assert len(body["data"]) == limit
+        assert body["pagination"]["total"] == N_COURSES
+        assert all(c["min_price"] == 49.0 for c in body["data"])
+        assert all(c["total_blocks"] == 6 for c in body["data"])
+        counts[limit] = query_counter.count
+
+    assert len(set(counts.values())) == 1
+
+
+def test_list_courses_page_out_of_range(large_catalog):
+    res = client.get(f"/courses/?seller_id={large_catalog}&limit=100&page=999")
+    assert res.status_code == 200
+    body = res.json()
+    assert body["data"] == []
+    assert body["pagination"]["total"] == N_COURSES
+    assert body["pagination"]["has_next"] is False
+
+
+def test_list_course_cards_single_statement(large_catalog, query_counter):
+    """La vista de tarjetas se sirve desde course_cards en una sola sentencia."""
+    res = client.get(f"/courses/?seller_id={large_catalog}&limit=100&view=card")
+    assert res.status_code == 200
+    body = res.json()
+    assert len(body["data"]) == 100
+    assert body["pagination"]["total"] == N_COURSES
+    card = body["data"][0]
+    assert card["min_price"] == 49.0
+    assert card["total_blocks"] == 6
+    assert card["seller_name"] == "Bench Seller"
+    assert query_counter.count == 1
+
+
+def test_search_courses_unaccent_and_prefix(large_catalog):
+    """La búsqueda ignora acentos (categoría 'Cardiología') y admite prefijos."""
+    res = client.get(f"/courses/search?q=cardiologia&seller_id={large_catalog}&limit=5")
+    assert res.status_code == 200
+    body = res.json()
+    assert body["pagination"]["total"] == N_COURSES
+
+    res = client.get(f"/courses/search?q=curso benc&seller_id={large_catalog}&limit=5")
+    assert res.status_code == 200
+    body = res.json()
+    assert len(body["data"]) == 5
+    assert "<mark>" in body["data"][0]["highlights"]["title"]
+
+
+def test_list_courses_cursor_walks_without_overlap(large_catalog):
+    """El modo cursor recorre páginas sin duplicados y no calcula total por defecto."""
+    seen = []
+    cursor = ""
+    for _ in range(3):
+        res = client.get(f"/courses/?seller_id={large_catalog}&limit=50&view=card&cursor={cursor}")
+        assert res.status_code == 200
+        body = res.json()
+        assert body["pagination"]["total"] is None
+        seen.extend(c["id"] for c in body["data"])
+        cursor = body["pagination"]["next_cursor"]
+        assert cursor
+    assert len(seen) == len(set(seen)) == 150
+
+    res = client.get(f"/courses/?seller_id={large_catalog}&limit=10&cursor=&count=estimated")
+    assert res.status_code == 200
+    assert res.json()["pagination"]["total_is_estimate"] is True
+
+    res = client.get("/courses/?cursor=no-es-un-cursor")
+    assert res.status_code == 400
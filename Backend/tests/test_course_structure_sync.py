@@ -0,0 +1,77 @@
+import pytest
+from app.models.courses import Course, Module, ContentBlock
+from app.schemas.courses import ModuleBase
+from app.courses.structure import sync_course_structure
+
+
+def _structure(db, course_id):
+    modules = db.query(Module).filter(Module.course_id == course_id).order_by(Module.order).all()
+    return [
+        {
+            "id": m.id,
+            "nombre": m.title,
+            "bloques": [
+                {"id": b.id, "type": b.type, "titulo": b.title}
+                for b in sorted(m.blocks, key=lambda b: b.order)
+            ],
+        }
+        for m in modules
+    ]
+
+
+def _modules(payload):
+    return [ModuleBase.model_validate(m) for m in payload]
+
+
+@pytest.fixture
+def db_course(db, make):
+    course = make.course(make.user(role="seller"), title="Sync")
+    sync_course_structure(db, course.id, modulos=_modules([
+        {"nombre": f"M{m}", "bloques": [{"type": "video", "titulo": f"B{m}.{b}"} for b in range(10)]}
+        for m in range(5)
+    ]))
+    db.commit()
+
+    return db, course.id
+
+
+def test_unchanged_autosave_touches_no_rows(db_course):
+    db, course_id = db_course
+    stats = sync_course_structure(db, course_id, modulos=_modules(_structure(db, course_id)))
+    assert stats["total"] == 0
+
+
+def test_single_edit_touches_single_row_and_keeps_ids(db_course):
+    db, course_id = db_course
+    before = _structure(db, course_id)
+    payload = _structure(db, course_id)
+    payload[2]["bloques"][3]["titulo"] = "Editado"
+
+    stats = sync_course_structure(db, course_id, modulos=_modules(payload))
+    db.commit()
+
+    assert stats["blocks"] == {"inserted": 0, "updated": 1, "deleted": 0}
+    assert stats["total"] == 1
+    after = _structure(db, course_id)
+    assert [b["id"] for m in after for b in m["bloques"]] == [b["id"] for m in before for b in m["bloques"]]
+    assert after[2]["bloques"][3]["titulo"] == "Editado"
+
+
+def test_move_insert_and_delete(db_course):
+    db, course_id = db_course
+    payload = _structure(db, course_id)
+    moved = payload[0]["bloques"].pop(0)
+    payload[1]["bloques"].append(moved)
+    payload[4]["bloques"].append({"type": "reading", "titulo": "Nuevo"})
+    removed = payload.pop(3)
+
+    stats = sync_course_structure(db, course_id, modulos=_modules(payload))
+    db.commit()
+
+    assert stats["modules"]["deleted"] == 1
+    assert stats["blocks"]["inserted"] == 1
+    assert stats["blocks"]["deleted"] == len(removed["bloques"])
+    moved_row = db.query(ContentBlock).filter(ContentBlock.id == moved["id"]).one()
+    assert moved_row.module_id == payload[1]["id"]
+    # courses.total_blocks sigue al recuento real
+    assert db.query(Course.total_blocks).filter(Course.id == course_id).scalar() == 50 + 1 - len(removed["bloques"])
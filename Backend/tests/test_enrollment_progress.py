@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.courses.content_router import delete_block_content
+from app.courses.progress_router import get_course_progress, mark_block_incomplete
+from app.models.courses import Course, Module, ContentBlock, EnrollmentProgress
+from app.services.enrollment_progress import reconcile_enrollment_progress
+from app.services.progress_ingest import record_completions
+
+N_BLOCKS = 8
+
+
+@pytest.fixture
+def course(db, make):
+    seller, student = make.user(), make.user()
+    course = make.course(seller, title="Contadores", total_blocks=N_BLOCKS)
+    module = Module(id=str(uuid.uuid4()), course_id=course.id, title="M", order=0)
+    db.add(module)
+    db.flush()
+    block_ids = [str(uuid.uuid4()) for _ in range(N_BLOCKS)]
+    db.add_all([
+        ContentBlock(id=b, module_id=module.id, type="video", title=f"B{k}", order=k)
+        for k, b in enumerate(block_ids)
+    ])
+    db.commit()
+    db.refresh(student)
+
+    return db, seller, student, course.id, block_ids
+
+
+def _counters(db, user_id, course_id):
+    db.expire_all()
+    return db.get(EnrollmentProgress, (user_id, course_id))
+
+
+def test_counters_follow_completions(course):
+    db, seller, student, course_id, block_ids = course
+    start = datetime.now(timezone.utc)
+
+    record_completions(db, student.id, course_id, block_ids[:3], completed_at=start)
+    record_completions(db, student.id, course_id, block_ids[2:5], completed_at=start + timedelta(minutes=1))
+    db.commit()
+    progress = _counters(db, student.id, course_id)
+    assert progress.completed_count == 5
+    assert progress.last_block_id in block_ids[3:5]
+
+    # Una compleción con fecha anterior (volcado tardío) no cambia el último bloque
+    record_completions(db, student.id, course_id, [block_ids[5]], completed_at=start - timedelta(days=1))
+    db.commit()
+    last = progress.last_block_id
+    progress = _counters(db, student.id, course_id)
+    assert progress.completed_count == 6 and progress.last_block_id == last
+
+    mark_block_incomplete(course_id, last, current_user=student, db=db)
+    progress = _counters(db, student.id, course_id)
+    assert progress.completed_count == 5
+    assert progress.last_block_id != last and progress.last_block_id is not None
+
+    assert reconcile_enrollment_progress(db, course_id) == 0
+
+
+def test_course_progress_reads_counters(course, query_counter):
+    db, seller, student, course_id, block_ids = course
+    record_completions(db, student.id, course_id, block_ids[:2])
+    db.commit()
+    db.refresh(student)
+
+    query_counter.reset()
+    body = get_course_progress(course_id, current_user=student, db=db)
+    assert query_counter.count == 2
+    assert body["completed_count"] == 2 and body["total_blocks"] == N_BLOCKS
+    assert body["percentage"] == 25
+
+
+def test_reconcile_repairs_drift(course):
+    db, seller, student, course_id, block_ids = course
+    record_completions(db, student.id, course_id, block_ids[:4])
+    db.commit()
+
+    # Contador y nº de bloques desincronizados a mano
+    db.query(EnrollmentProgress).filter(EnrollmentProgress.course_id == course_id).update(
+        {EnrollmentProgress.completed_count: 1}, synchronize_session=False
+    )
+    db.query(Course).filter(Course.id == course_id).update({Course.total_blocks: 3}, synchronize_session=False)
+    db.commit()
+
+    assert reconcile_enrollment_progress(db, course_id) == 2
+    assert _counters(db, student.id, course_id).completed_count == 4
+    assert db.query(Course.total_blocks).filter(Course.id == course_id).scalar() == N_BLOCKS
+    assert reconcile_enrollment_progress(db, course_id) == 0
+
+
+def test_deleting_completed_block_discounts_it(course):
+    db, seller, student, course_id, block_ids = course
+    record_completions(db, student.id, course_id, block_ids[:N_BLOCKS - 1])
+    db.commit()
+
+    delete_block_content(block_ids[0], current_user=seller, db=db)
+    progress = _counters(db, student.id, course_id)
+    assert progress.completed_count == N_BLOCKS - 2
+    assert db.query(Course.total_blocks).filter(Course.id == course_id).scalar() == N_BLOCKS - 1
+    assert reconcile_enrollment_progress(db, course_id) == 0
@@ -0,0 +1,59 @@
+import pytest
+from fastapi import HTTPException
+
+from app.database import SessionLocal
+from app.models.orders import OrderStatus
+from app.services.entitlements import has_course, invalidate_entitlements, require_enrollment
+
+
+@pytest.fixture
+def purchase(db, make):
+    """Alumno con un pedido pagado y otro pendiente."""
+    seller, student = make.user(role="seller"), make.user()
+    offers = [make.offer(make.course(seller, title=f"Curso {i}")) for i in range(2)]
+    paid = make.order(student, offers[0])
+    pending = make.order(student, offers[1], status=OrderStatus.pending)
+    db.commit()
+    invalidate_entitlements(db, student.id)
+    # Recarga tras el commit para no contar ese SELECT
+    db.refresh(pending)
+
+    return db, student.id, paid.course_id, pending
+
+
+def test_checks_hit_postgres_once(purchase, query_counter):
+    db, user_id, paid_course_id, pending = purchase
+
+    query_counter.reset()
+    for _ in range(5):
+        assert has_course(db, user_id, paid_course_id)
+        assert not has_course(db, user_id, pending.course_id)
+    assert query_counter.count == 1
+
+    # Otra petición (sesión nueva): los accesos salen de Redis
+    other = SessionLocal()
+    try:
+        query_counter.reset()
+        require_enrollment(other, user_id, paid_course_id)
+        assert query_counter.count == 0
+        with pytest.raises(HTTPException) as exc:
+            require_enrollment(other, user_id, pending.course_id)
+        assert exc.value.status_code == 403
+    finally:
+        other.close()
+
+
+def test_payment_invalidates(purchase):
+    db, user_id, _, pending = purchase
+    assert not has_course(db, user_id, pending.course_id)
+
+    pending.status = OrderStatus.paid
+    db.commit()
+    invalidate_entitlements(db, user_id)
+    assert has_course(db, user_id, pending.course_id)
+
+    other = SessionLocal()
+    try:
+        assert has_course(other, user_id, pending.course_id)
+    finally:
+        other.close()
@@ -0,0 +1,68 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import text
+
+from app.core.pagination import encode_cursor
+from app.forum.router import list_threads
+from app.models.forum import ForumThread
+
+N_THREADS = 25
+PINNED = 3
+
+
+@pytest.fixture
+def forum(db, make):
+    seller = make.user(role="seller")
+    course = make.course(seller, title="Foro")
+
+    # SQL directo sin is_pinned, como cualquier cliente que no pase por el ORM
+    now = datetime.now(timezone.utc)
+    db.execute(
+        text(
+            "INSERT INTO forum_threads (id, course_id, author_id, title, body, created_at) "
+            "VALUES (:id, :course_id, :author_id, :title, 'x', :created_at)"
+        ),
+        [
+            {"id": str(uuid.uuid4()), "course_id": course.id, "author_id": seller.id,
+             "title": f"Hilo {i}", "created_at": now - timedelta(minutes=i)}
+            for i in range(N_THREADS)
+        ],
+    )
+    db.query(ForumThread).filter(
+        ForumThread.course_id == course.id, ForumThread.title.in_([f"Hilo {i}" for i in range(PINNED)])
+    ).update({ForumThread.is_pinned: True}, synchronize_session=False)
+    db.commit()
+    db.refresh(seller)
+
+    return db, seller, course.id
+
+
+def test_thread_cursor_walks_pinned_and_unpinned(forum):
+    db, seller, course_id = forum
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = Response()
+        page = list_threads(course_id, response, limit=10, cursor=cursor, db=db, current_user=seller)
+        seen.extend(page)
+        cursor = response.headers.get("X-Next-Cursor")
+
+    assert len({t.id for t in seen}) == len(seen) == N_THREADS
+    assert [t.is_pinned for t in seen] == [True] * PINNED + [False] * (N_THREADS - PINNED)
+
+
+@pytest.mark.parametrize("limit, cursor", [
+    (0, ""),
+    (10, encode_cursor(["sí", datetime.now(timezone.utc), "x"])),
+    (10, encode_cursor([True, "ayer", "x"])),
+    (10, encode_cursor([True, datetime.now(timezone.utc)])),
+])
+def test_thread_cursor_rejects_bad_input(forum, limit, cursor):
+    db, seller, course_id = forum
+    with pytest.raises(HTTPException) as exc:
+        list_threads(course_id, Response(), limit=limit, cursor=cursor, db=db, current_user=seller)
+    assert exc.value.status_code == 400
@@ -0,0 +1,30 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.platform_stats import (
+    compute_platform_stats, refresh_platform_stats, bump_platform_stats, get_platform_stats,
+)
+
+client = TestClient(app)
+
+
+def test_platform_stats_endpoint_shape():
+    res = client.get("/courses/platform-stats")
+    assert res.status_code == 200
+    assert set(res.json()) == {"total_courses", "total_users", "total_instructors", "total_specialties"}
+
+
+def test_snapshot_matches_full_recount_and_bumps(db, query_counter):
+    refreshed = refresh_platform_stats(db)
+    assert refreshed == compute_platform_stats(db)
+
+    query_counter.reset()
+    assert get_platform_stats(db) == refreshed
+    # Lectura O(1): una sola sentencia sobre la fila de la instantánea
+    assert query_counter.count == 1
+
+    bump_platform_stats(db, total_users=1)
+    db.commit()
+    assert get_platform_stats(db)["total_users"] == refreshed["total_users"] + 1
+
+    # Una instantánea caducada se recalcula al leer
+    assert get_platform_stats(db, max_age_seconds=0) == compute_platform_stats(db)
@@ -0,0 +1,146 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.database import SessionLocal
+from app.loadtest import run_progress_load_test
+from app.models.analytics import CourseDailyStats
+from app.models.courses import UserProgress
+from app.core.redis_config import redis_client
+from app.services import progress_ingest
+from app.services.progress_ingest import (
+    buffer_completions, flush_buffered_completions, record_completions,
+    PROGRESS_BUFFER_KEY, PROGRESS_FLUSHING_KEY, PROGRESS_FLUSH_LOCK_KEY,
+)
+
+
+@pytest.fixture
+def enrolled(db, make):
+    student = make.user()
+    course = make.course(make.user(), title="Ingesta")
+    db.commit()
+
+    return db, student.id, course.id
+
+
+def _blocks_completed(db, course_id):
+    return db.query(CourseDailyStats.blocks_completed).filter(CourseDailyStats.course_id == course_id).scalar()
+
+
+def test_upsert_is_idempotent(enrolled, query_counter):
+    db, user_id, course_id = enrolled
+
+    query_counter.reset()
+    assert record_completions(db, user_id, course_id, ["b1", "b2", "b2", "b3"]) == ["b1", "b2", "b3"]
+    db.commit()
+    # INSERT ... RETURNING + filas diarias (learner + stats) + COMMIT
+    assert query_counter.count <= 4
+
+    assert record_completions(db, user_id, course_id, ["b3", "b4"]) == ["b4"]
+    assert record_completions(db, user_id, course_id, ["b1"]) == []
+    db.commit()
+
+    assert db.query(UserProgress).filter(UserProgress.course_id == course_id).count() == 4
+    assert _blocks_completed(db, course_id) == 4
+
+
+def test_buffered_flush(enrolled):
+    db, user_id, course_id = enrolled
+    flush_buffered_completions(db)  # vacía restos de otras pruebas
+
+    assert buffer_completions(user_id, course_id, ["b1", "b2"])
+    assert buffer_completions(user_id, course_id, ["b2", "b3"])
+    assert buffer_completions(user_id, "curso-borrado", ["b1"])
+    assert db.query(UserProgress).filter(UserProgress.course_id == course_id).count() == 0
+
+    assert flush_buffered_completions(db, batch_size=2) == 3
+    assert db.query(UserProgress).filter(UserProgress.course_id == course_id).count() == 3
+    assert _blocks_completed(db, course_id) == 3
+    assert flush_buffered_completions(db) == 0
+
+
+def test_overlapping_flushes_lose_nothing(enrolled, monkeypatch):
+    """Dos volcados solapados: el segundo no toca la cola mientras el primero
+    la procesa, y los eventos encolados entre medias sobreviven."""
+    db, user_id, course_id = enrolled
+    flush_buffered_completions(db)
+    assert buffer_completions(user_id, course_id, [f"b{i}" for i in range(10)])
+
+    # El primer volcado se detiene tras su primer lote
+    first_batch_done, resume = threading.Event(), threading.Event()
+    original_insert = progress_ingest._insert_rows
+
+    def slow_insert(session, rows):
+        inserted = original_insert(session, rows)
+        if threading.current_thread().name == "slow-flush" and not first_batch_done.is_set():
+            first_batch_done.set()
+            resume.wait(10)
+        return inserted
+
+    monkeypatch.setattr(progress_ingest, "_insert_rows", slow_insert)
+
+    def slow_flush():
+        threading.current_thread().name = "slow-flush"
+        session = SessionLocal()
+        try:
+            return flush_buffered_completions(session, batch_size=4)
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        slow = pool.submit(slow_flush)
+        assert first_batch_done.wait(10)
+
+        # Mientras tanto: llegan eventos nuevos y otro worker intenta volcar
+        assert buffer_completions(user_id, course_id, ["late-1", "late-2"])
+        other = SessionLocal()
+        try:
+            assert flush_buffered_completions(other) == 0
+        finally:
+            other.close()
+        assert redis_client.llen(PROGRESS_BUFFER_KEY) == 2
+
+        resume.set()
+        assert slow.result(10) == 10
+
+    assert not redis_client.exists(PROGRESS_FLUSHING_KEY)
+    assert not redis_client.exists(PROGRESS_FLUSH_LOCK_KEY)
+    assert flush_buffered_completions(db) == 2
+    assert db.query(UserProgress).filter(UserProgress.course_id == course_id).count() == 12
+
+
+def test_flush_keeps_queue_when_lock_is_lost(enrolled, monkeypatch):
+    db, user_id, course_id = enrolled
+    flush_buffered_completions(db)
+    assert buffer_completions(user_id, course_id, [f"b{i}" for i in range(6)])
+
+    # Otro proceso se queda el lock tras el primer lote (p. ej. expiró)
+    original_insert = progress_ingest._insert_rows
+
+    def steal_lock(session, rows):
+        redis_client.set(PROGRESS_FLUSH_LOCK_KEY, "otro", ex=60)
+        return original_insert(session, rows)
+
+    monkeypatch.setattr(progress_ingest, "_insert_rows", steal_lock)
+    assert flush_buffered_completions(db, batch_size=3) == 3
+    monkeypatch.setattr(progress_ingest, "_insert_rows", original_insert)
+
+    # La cola sigue ahí y el lock ajeno no se liberó
+    assert redis_client.llen(PROGRESS_FLUSHING_KEY) == 6
+    assert redis_client.get(PROGRESS_FLUSH_LOCK_KEY) == "otro"
+    redis_client.delete(PROGRESS_FLUSH_LOCK_KEY)
+
+    assert flush_buffered_completions(db, batch_size=3) == 3
+    assert not redis_client.exists(PROGRESS_FLUSHING_KEY)
+    assert db.query(UserProgress).filter(UserProgress.course_id == course_id).count() == 6
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("batch, buffered", [(1, False), (20, False), (1, True)])
+def test_ingestion_load(batch, buffered, record_property):
+    """Benchmark: compleciones por segundo sostenidas."""
+    report = run_progress_load_test(users=100, blocks=40, batch=batch, workers=8, buffered=buffered)
+    for key, value in report.items():
+        record_property(key, value)
+    assert report["completions"] == 100 * 40
@@ -0,0 +1,51 @@
+import pytest
+
+from app.courses.progress_router import get_my_progress
+from app.services.progress_ingest import record_completions
+
+N_BLOCKS = 4
+
+
+def _seed_student(db, make, seller, n_courses: int):
+    """Alumno con `n_courses` cursos pagados; en el curso i completa i % 5
+    de los 4 bloques (tope en 4)."""
+    student = make.user()
+    courses = [make.course(seller, title=f"Curso {i:02d}", total_blocks=N_BLOCKS) for i in range(n_courses)]
+    for course in courses:
+        make.order(student, make.offer(course))
+    for i, course in enumerate(courses):
+        record_completions(db, student.id, course.id, [f"b{k}" for k in range(min(i % 5, N_BLOCKS))])
+    db.commit()
+    return student
+
+
+@pytest.fixture
+def students(db, make):
+    seller = make.user()
+    small, large = _seed_student(db, make, seller, 1), _seed_student(db, make, seller, 50)
+    # Recarga tras los commit para no contar esos SELECT
+    db.refresh(small)
+    db.refresh(large)
+    return db, small, large
+
+
+def test_summary_constant_query_count(students, query_counter):
+    db, small, large = students
+
+    query_counter.reset()
+    small_summary = get_my_progress(current_user=small, db=db)
+    small_count = query_counter.count
+
+    query_counter.reset()
+    large_summary = get_my_progress(current_user=large, db=db)
+    large_count = query_counter.count
+
+    assert small_count == large_count == 1
+    assert len(small_summary) == 1 and len(large_summary) == 50
+
+    by_title = {entry["course_title"]: entry for entry in large_summary}
+    assert by_title["Curso 03"]["completed_blocks"] == 3
+    assert by_title["Curso 03"]["percentage"] == 75
+    assert by_title["Curso 03"]["last_block_id"] in {"b0", "b1", "b2"}
+    assert by_title["Curso 04"]["is_complete"]
+    assert by_title["Curso 05"]["completed_blocks"] == 0 and by_title["Curso 05"]["last_block_id"] is None
@@ -0,0 +1,132 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import redis
+
+from app.courses.recommendations import (
+    CourseFeatureMatrix, get_recommendations, recommendation_cache_stats, invalidate_published_recommendations,
+)
+from app.core.redis_config import redis_client
+
+CATEGORIES = [f"Categoría {i}" for i in range(25)]
+TOPICS = [f"Tema {i}" for i in range(120)]
+LEVELS = ["Básico", "Intermedio", "Avanzado"]
+AUDIENCES = [f"Público {i}" for i in range(30)]
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _synthetic_rows(n: int, seed: int = 7) -> list[tuple]:
+    rng = random.Random(seed)
+    return [
+        (
+            f"course-{i}",
+            rng.choice(CATEGORIES),
+            rng.choice(TOPICS),
+            rng.choice(LEVELS),
+            rng.sample(AUDIENCES, rng.randint(0, 3)),
+            round(rng.uniform(0, 5), 2),
+            NOW - timedelta(days=rng.randint(0, 720)),
+        )
+        for i in range(n)
+    ]
+
+
+def _reference_score(row, categories, topics, levels, audiences):
+    """Score del algoritmo original, curso a curso."""
+    _, category, topic, level, audience, rating, created = row
+    s = 0.0
+    if category in categories:
+        s += 3.0
+    if topic in topics:
+        s += 2.0
+    if level in levels:
+        s += 1.0
+    s += len(set(audience) & set(audiences)) * 0.5
+    s += rating / 5.0
+    days_old = (NOW - created).days
+    if days_old < 30:
+        s += 0.5
+    elif days_old < 90:
+        s += 0.2
+    return s
+
+
+def test_vectorized_score_matches_reference():
+    rows = _synthetic_rows(2000)
+    prefs = dict(categories={"Categoría 3"}, topics={"Tema 10", "Tema 11"}, levels={"Avanzado"}, audiences={"Público 1"})
+    matrix = CourseFeatureMatrix(rows)
+
+    score = matrix.score(now=NOW, **prefs)
+    expected = [_reference_score(r, **prefs) for r in rows]
+    assert max(abs(a - b) for a, b in zip(score, expected)) < 1e-3
+
+    excluded = {rows[0][0], rows[1][0]}
+    top = matrix.top_k(score, 10, exclude_ids=excluded)
+    assert not excluded & set(top)
+    ranked = sorted((r for r in rows if r[0] not in excluded), key=lambda r: _reference_score(r, **prefs), reverse=True)
+    assert abs(score[matrix.index[top[-1]]] - _reference_score(ranked[9], **prefs)) < 1e-3
+
+
+def test_top_k_with_small_catalog():
+    matrix = CourseFeatureMatrix(_synthetic_rows(3))
+    score = matrix.score(now=NOW)
+    assert len(matrix.top_k(score, 6)) == 3
+    assert matrix.top_k(score, 6, exclude_ids={"course-0", "course-1", "course-2"}) == []
+    assert CourseFeatureMatrix([]).top_k(score[:0], 6) == []
+
+
+def test_collaborative_signal_lifts_neighbors():
+    rows = _synthetic_rows(500)
+    matrix = CourseFeatureMatrix(rows)
+    base = matrix.score(now=NOW)
+    blended = matrix.score(now=NOW, neighbor_weights={"course-42": 0.8, "course-7": 0.4, "no-publicado": 1.0})
+
+    assert blended[matrix.index["course-42"]] - base[matrix.index["course-42"]] == pytest.approx(4.0)
+    assert blended[matrix.index["course-7"]] - base[matrix.index["course-7"]] == pytest.approx(2.0)
+    assert matrix.top_k(blended, 1) == ["course-42"]
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("n", [10_000, 100_000])
+def test_scoring_benchmark(n, record_property):
+    """Benchmark: construcción de la matriz y puntuación + top-k por petición."""
+    rows = _synthetic_rows(n)
+
+    started = time.perf_counter()
+    matrix = CourseFeatureMatrix(rows)
+    build = time.perf_counter() - started
+
+    runs = 20
+    started = time.perf_counter()
+    for i in range(runs):
+        score = matrix.score(
+            categories={CATEGORIES[i % 25]}, topics={TOPICS[i]}, levels={"Intermedio"},
+            audiences={AUDIENCES[i]}, now=NOW,
+        )
+        top = matrix.top_k(score, 6, exclude_ids={f"course-{i}"})
+    per_request = (time.perf_counter() - started) / runs
+
+    record_property("build_ms", round(build * 1000))
+    record_property("ms_per_request", round(per_request * 1000, 2))
+    assert len(top) == 6
+
+
+def test_anonymous_list_served_from_cache(db):
+    invalidate_published_recommendations()
+    first = [c.id for c in get_recommendations(db, None, 6)]
+    hits_before = recommendation_cache_stats()["anon"]["hits"]
+
+    second = [c.id for c in get_recommendations(db, None, 6)]
+    assert second == first
+    assert recommendation_cache_stats()["anon"]["hits"] == hits_before + 1
+
+
+def test_cache_stats_without_redis(monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise redis.ConnectionError("sin conexión")
+
+    monkeypatch.setattr(redis_client, "hgetall", unavailable)
+    stats = recommendation_cache_stats()
+    assert stats["user"] == stats["anon"] == {"hits": 0, "misses": 0, "hit_ratio": None}
@@ -0,0 +1,80 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.courses import Course, RelatedCourse
+from app.services.course_cards import refresh_course_cards
+from app.services.related_courses import refresh_related_courses, refresh_related_for_course
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def related_catalog(module_db, module_make):
+    db, make = module_db, module_make
+    tag = uuid.uuid4().hex[:8]
+    seller = make.user(role="seller")
+    buyer = make.user()
+
+    def course(name, **attrs):
+        return make.course(seller, title=name, status="publicado", visibility="publico", **attrs).id
+
+    ids = {
+        "source": course("Origen", category=f"cat-{tag}", topic=f"topic-{tag}", target_audience=["medicos"]),
+        "same_topic": course("Mismo tema", category=f"cat-{tag}", topic=f"topic-{tag}"),
+        "same_category": course("Misma categoría", category=f"cat-{tag}"),
+        "bought_together": course("Co-compra", category=f"otra-{tag}"),
+        "unrelated": course("Sin relación", category=f"otra-{tag}"),
+    }
+
+    for key in ("source", "bought_together"):
+        make.order(buyer, make.offer(ids[key]))
+
+    refresh_course_cards(db, list(ids.values()))
+    refresh_related_courses(db, list(ids.values()))
+    db.commit()
+
+    return ids
+
+
+def test_related_ranking_uses_attribute_and_copurchase_signals(db, related_catalog):
+    ranked = [
+        r.related_course_id for r in db.query(RelatedCourse).filter(
+            RelatedCourse.course_id == related_catalog["source"]
+        ).order_by(RelatedCourse.rank)
+    ]
+
+    position = {course_id: i for i, course_id in enumerate(ranked)}
+    assert position[related_catalog["same_topic"]] < position[related_catalog["same_category"]]
+    assert related_catalog["bought_together"] in position
+    if related_catalog["unrelated"] in position:
+        assert position[related_catalog["bought_together"]] < position[related_catalog["unrelated"]]
+
+
+def test_related_endpoint_is_single_lookup(related_catalog, query_counter):
+    query_counter.reset()
+    res = client.get(f"/courses/{related_catalog['source']}/related?limit=8")
+    assert res.status_code == 200
+    assert res.json()[0]["id"] == related_catalog["same_topic"]
+    assert query_counter.count <= 1
+
+
+def test_unpublished_course_leaves_related_lists(db, related_catalog):
+    db.query(Course).filter(Course.id == related_catalog["same_topic"]).update({"status": "borrador"})
+    refresh_related_for_course(db, related_catalog["same_topic"])
+    db.commit()
+    assert not db.query(RelatedCourse).filter(
+        RelatedCourse.related_course_id == related_catalog["same_topic"]
+    ).count()
+
+
+def test_empty_related_list_picks_up_published_course(db, related_catalog):
+    db.query(RelatedCourse).filter(
+        RelatedCourse.course_id == related_catalog["source"]
+    ).delete(synchronize_session=False)
+    refresh_related_for_course(db, related_catalog["same_topic"])
+    db.commit()
+    assert db.query(RelatedCourse).filter(
+        RelatedCourse.course_id == related_catalog["source"],
+        RelatedCourse.related_course_id == related_catalog["same_topic"],
+    ).count() == 1
@@ -0,0 +1,44 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.courses import Course
+from app.core.cache import invalidate_course
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def cached_course(db, make):
+    course = make.course(make.user(role="seller"), title="Antes")
+    db.commit()
+    return course.id
+
+
+def test_conditional_get_returns_304():
+    res = client.get("/catalogs/categories")
+    assert res.status_code == 200
+    etag = res.headers["etag"]
+    assert res.headers["last-modified"]
+
+    res = client.get("/catalogs/categories", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+
+
+def test_course_detail_invalidated_after_write(db, cached_course):
+    first = client.get(f"/courses/{cached_course}")
+    assert first.json()["title"] == "Antes"
+
+    db.query(Course).filter(Course.id == cached_course).update({"title": "Después"})
+    db.commit()
+    invalidate_course(cached_course)
+
+    res = client.get(f"/courses/{cached_course}", headers={"If-None-Match": first.headers["etag"]})
+    assert res.status_code == 200
+    assert res.json()["title"] == "Después"
+
+
+def test_missing_course_is_not_cached():
+    res = client.get(f"/courses/{uuid.uuid4()}")
+    assert res.status_code == 404
@@ -0,0 +1,101 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.courses import Module, ContentBlock, UserProgress
+from app.models.orders import Order, OrderStatus
+from app.services.enrollment_progress import reconcile_enrollment_progress
+from app.services.student_progress import student_progress_rows, student_progress_summary, student_progress_total
+
+N_STUDENTS = 50_000
+N_BLOCKS = 10
+
+
+@pytest.fixture(scope="module")
+def large_course(module_db, module_make):
+    """Curso con 50k alumnos; el alumno i completa i % 11 de los 10 bloques."""
+    db, make = module_db, module_make
+    now = datetime.now(timezone.utc)
+    student_ids = make.users(N_STUDENTS, full_name=lambda i: f"Alumno {i:05d}")
+    course = make.course(make.user(role="seller"), title="Masivo")
+    offer = make.offer(course)
+    module_id = str(uuid.uuid4())
+    block_ids = [str(uuid.uuid4()) for _ in range(N_BLOCKS)]
+
+    db.execute(insert(Module), [{"id": module_id, "course_id": course.id, "title": "M", "order": 0}])
+    db.execute(insert(ContentBlock), [
+        {"id": b, "module_id": module_id, "type": "video", "title": f"B{k}", "order": k}
+        for k, b in enumerate(block_ids)
+    ])
+    db.execute(insert(Order), [
+        {"id": str(uuid.uuid4()), "user_id": uid, "course_id": course.id, "offer_id": offer.id,
+         "price": 10.0, "status": OrderStatus.paid, "created_at": now - timedelta(days=i % 300)}
+        for i, uid in enumerate(student_ids)
+    ])
+    progress = [
+        {"id": str(uuid.uuid4()), "user_id": uid, "course_id": course.id, "module_id": b,
+         "is_completed": True, "completed_at": now - timedelta(days=i % 40)}
+        for i, uid in enumerate(student_ids) for b in block_ids[:i % 11]
+    ]
+    for start in range(0, len(progress), 20_000):
+        db.execute(insert(UserProgress), progress[start:start + 20_000])
+    db.commit()
+    # Siembra directa en user_progress: los contadores salen de la reconciliación
+    reconcile_enrollment_progress(db, course.id)
+
+    return course.id
+
+
+def test_filters_sort_and_page_in_one_statement(db, large_course, query_counter):
+
+    query_counter.reset()
+    rows = student_progress_rows(
+        db, [large_course], progress_min=50, progress_max=80,
+        sort="progress", descending=True, limit=20, offset=20,
+    )
+    assert query_counter.count == 1
+
+    # 5..8 bloques de 10 → 4 de cada 11 alumnos
+    expected_total = sum(1 for i in range(N_STUDENTS) if 5 <= i % 11 <= 8)
+    assert rows[0].total_count == expected_total
+    assert len(rows) == 20
+    assert all(50 <= float(r.progress_pct) <= 80 for r in rows)
+    assert [float(r.progress_pct) for r in rows] == sorted((float(r.progress_pct) for r in rows), reverse=True)
+
+    [match] = student_progress_rows(db, [large_course], search="alumno 00042")
+    assert match.completed_blocks == 42 % 11 and match.total_blocks == N_BLOCKS
+
+
+def test_total_past_last_page(db, large_course):
+    filters = dict(progress_min=100)
+    rows = student_progress_rows(db, [large_course], limit=50, offset=N_STUDENTS, **filters)
+    assert rows == []
+    assert student_progress_total(db, [large_course], rows, **filters) == sum(1 for i in range(N_STUDENTS) if i % 11 == 10)
+
+
+def test_search_is_literal_substring(db, large_course):
+    assert student_progress_rows(db, [large_course], search="alumno 0004_") == []
+    assert student_progress_rows(db, [large_course], search="%") == []
+    assert len(student_progress_rows(db, [large_course], search="alumno 0004")) == 10
+
+
+def test_summary(db, large_course):
+    summary = student_progress_summary(db, [large_course])
+    assert summary.total_students == N_STUDENTS
+    assert summary.active_students == sum(1 for i in range(N_STUDENTS) if i % 11)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("sort", ["progress", "last_activity", "name"])
+def test_ranking_benchmark(db, large_course, sort, record_property):
+    """Benchmark: primera página del ranking de un curso con 50k alumnos."""
+    runs = 5
+    started = time.perf_counter()
+    for _ in range(runs):
+        rows = student_progress_rows(db, [large_course], sort=sort, limit=50)
+    per_call = (time.perf_counter() - started) / runs
+    record_property("ms_per_page", round(per_call * 1000))
+    assert len(rows) == 50
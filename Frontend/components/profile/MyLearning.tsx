@@ -75,7 +75,7 @@ export function MyLearning() {
 
         const [ordersRes, progressRes] = await Promise.all([
           fetch(`${API_URL}/orders/my-orders`, { credentials: 'include' }),
-          fetch(`${API_URL}/courses/_/progress/summary`, { credentials: 'include' }),
+          fetch(`${API_URL}/me/progress`, { credentials: 'include' }),
         ]);
 
         const orders = ordersRes.ok ? await ordersRes.json() : [];
@@ -0,0 +1,74 @@
+"""add course_cards read model
+
+Revision ID: o3p4q5r6s7t8
+Revises: n2o3p4q5r6s7
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'o3p4q5r6s7t8'
+down_revision = 'n2o3p4q5r6s7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'course_cards',
+        sa.Column('course_id', sa.String(), sa.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('seller_id', sa.String(), nullable=False),
+        sa.Column('seller_name', sa.String(), nullable=True),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('subtitle', sa.String(), nullable=True),
+        sa.Column('short_description', sa.Text(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('level', sa.String(), nullable=True),
+        sa.Column('banner_url', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('visibility', sa.String(), nullable=True),
+        sa.Column('rating_avg', sa.Float(), server_default='0'),
+        sa.Column('rating_count', sa.Integer(), server_default='0'),
+        sa.Column('min_price', sa.Float(), nullable=True),
+        sa.Column('total_blocks', sa.Integer(), server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_course_cards_seller_id', 'course_cards', ['seller_id'])
+    op.create_index('ix_course_cards_status_created', 'course_cards', ['status', 'created_at'])
+    op.create_index('ix_course_cards_category_rating', 'course_cards', ['category', 'rating_avg'])
+
+    # Índices de FK usados por las agregaciones de la tarjeta
+    op.create_index('ix_course_modules_course_id', 'course_modules', ['course_id'])
+    op.create_index('ix_content_blocks_module_id', 'content_blocks', ['module_id'])
+    op.create_index('ix_course_offers_course_id', 'course_offers', ['course_id'])
+
+    # Backfill inicial (equivalente a `python -m app.cli rebuild-course-cards`)
+    op.execute("""
+        INSERT INTO course_cards (
+            course_id, seller_id, seller_name, title, subtitle, short_description,
+            category, level, banner_url, status, visibility, rating_avg, rating_count,
+            created_at, min_price, total_blocks
+        )
+        SELECT c.id, c.seller_id, u.full_name, c.title, c.subtitle, c.short_description,
+               c.category, c.level, c.banner_url, c.status, c.visibility, c.rating_avg,
+               c.rating_count, c.created_at, p.min_price, COALESCE(b.total_blocks, 0)
+        FROM courses c
+        LEFT JOIN users u ON u.id = c.seller_id
+        LEFT JOIN (
+            SELECT course_id, MIN(price_base) AS min_price
+            FROM course_offers GROUP BY course_id
+        ) p ON p.course_id = c.id
+        LEFT JOIN (
+            SELECT m.course_id, COUNT(cb.id) AS total_blocks
+            FROM course_modules m JOIN content_blocks cb ON cb.module_id = m.id
+            GROUP BY m.course_id
+        ) b ON b.course_id = c.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_course_offers_course_id', 'course_offers')
+    op.drop_index('ix_content_blocks_module_id', 'content_blocks')
+    op.drop_index('ix_course_modules_course_id', 'course_modules')
+    op.drop_table('course_cards')
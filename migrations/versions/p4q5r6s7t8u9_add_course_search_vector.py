@@ -0,0 +1,61 @@
+"""add full-text search vector to courses
+
+Revision ID: p4q5r6s7t8u9
+Revises: o3p4q5r6s7t8
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'p4q5r6s7t8u9'
+down_revision = 'o3p4q5r6s7t8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+                ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+            END IF;
+        END
+        $$;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION courses_search_vector(
+            title text, subtitle text, short_description text, long_description text,
+            topic text, category text, target_audience text[]
+        ) RETURNS tsvector
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT
+                setweight(to_tsvector('es_unaccent', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('es_unaccent', coalesce(subtitle, '')), 'B') ||
+                setweight(to_tsvector('es_unaccent', coalesce(topic, '')), 'B') ||
+                setweight(to_tsvector('es_unaccent', coalesce(category, '')), 'B') ||
+                setweight(to_tsvector('es_unaccent', coalesce(short_description, '')), 'C') ||
+                setweight(to_tsvector('es_unaccent', coalesce(array_to_string(target_audience, ' '), '')), 'C') ||
+                setweight(to_tsvector('es_unaccent', coalesce(long_description, '')), 'D')
+        $$;
+    """)
+    op.execute("""
+        ALTER TABLE courses ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            courses_search_vector(title, subtitle, short_description, long_description,
+                                  topic, category, target_audience)
+        ) STORED
+    """)
+    op.create_index(
+        'ix_courses_search_vector', 'courses', ['search_vector'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_courses_search_vector', 'courses')
+    op.drop_column('courses', 'search_vector')
+    op.execute("DROP FUNCTION IF EXISTS courses_search_vector(text, text, text, text, text, text, text[])")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS es_unaccent")
@@ -0,0 +1,38 @@
+"""add composite indexes for keyset pagination
+
+Revision ID: q5r6s7t8u9v0
+Revises: p4q5r6s7t8u9
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'q5r6s7t8u9v0'
+down_revision = 'p4q5r6s7t8u9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_courses_created_id', 'courses', ['created_at', 'id'])
+    op.drop_index('ix_course_cards_status_created', 'course_cards')
+    op.create_index('ix_course_cards_status_created', 'course_cards', ['status', 'created_at', 'course_id'])
+    op.create_index('ix_notifications_user_created', 'notifications', ['user_id', 'created_at', 'id'])
+    op.create_index(
+        'ix_forum_threads_course_pinned_created', 'forum_threads',
+        ['course_id', 'is_pinned', 'created_at', 'id'],
+    )
+    op.create_index('ix_messages_receiver_created', 'messages', ['receiver_id', 'created_at', 'id'])
+    op.create_index(
+        'ix_course_announcements_seller_created', 'course_announcements',
+        ['seller_id', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_course_announcements_seller_created', 'course_announcements')
+    op.drop_index('ix_messages_receiver_created', 'messages')
+    op.drop_index('ix_forum_threads_course_pinned_created', 'forum_threads')
+    op.drop_index('ix_notifications_user_created', 'notifications')
+    op.drop_index('ix_course_cards_status_created', 'course_cards')
+    op.create_index('ix_course_cards_status_created', 'course_cards', ['status', 'created_at'])
+    op.drop_index('ix_courses_created_id', 'courses')
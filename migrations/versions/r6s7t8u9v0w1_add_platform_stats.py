@@ -0,0 +1,31 @@
+"""add platform_stats snapshot table
+
+Revision ID: r6s7t8u9v0w1
+Revises: q5r6s7t8u9v0
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'r6s7t8u9v0w1'
+down_revision = 'q5r6s7t8u9v0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'platform_stats',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('total_courses', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_users', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_instructors', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_specialties', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+    # refreshed_at antiguo: la primera lectura o el scheduler la recalculan
+    op.execute("INSERT INTO platform_stats (id, refreshed_at) VALUES (1, 'epoch')")
+
+
+def downgrade() -> None:
+    op.drop_table('platform_stats')
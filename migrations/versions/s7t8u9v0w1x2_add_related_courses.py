@@ -0,0 +1,34 @@
+"""add related_courses precomputed index
+
+Revision ID: s7t8u9v0w1x2
+Revises: r6s7t8u9v0w1
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 's7t8u9v0w1x2'
+down_revision = 'r6s7t8u9v0w1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'related_courses',
+        sa.Column('course_id', sa.String(), sa.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('related_course_id', sa.String(), sa.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+    op.create_index('ix_related_courses_related_course_id', 'related_courses', ['related_course_id'])
+    op.create_index('ix_related_courses_course_rank', 'related_courses', ['course_id', 'rank'])
+    # Relleno inicial: python -m app.cli rebuild-related-courses
+    # (el scheduler también lo ejecuta al arrancar)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_related_courses_course_rank', 'related_courses')
+    op.drop_index('ix_related_courses_related_course_id', 'related_courses')
+    op.drop_table('related_courses')
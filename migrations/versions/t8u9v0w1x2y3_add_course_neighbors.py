@@ -0,0 +1,32 @@
+"""add course_neighbors item-item table
+
+Revision ID: t8u9v0w1x2y3
+Revises: s7t8u9v0w1x2
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 't8u9v0w1x2y3'
+down_revision = 's7t8u9v0w1x2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'course_neighbors',
+        sa.Column('course_id', sa.String(), sa.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('neighbor_id', sa.String(), sa.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=False),
+        sa.Column('co_users', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+    op.create_index('ix_course_neighbors_neighbor_id', 'course_neighbors', ['neighbor_id'])
+    # Relleno inicial: python -m app.cli rebuild-course-neighbors
+
+
+def downgrade() -> None:
+    op.drop_index('ix_course_neighbors_neighbor_id', 'course_neighbors')
+    op.drop_table('course_neighbors')
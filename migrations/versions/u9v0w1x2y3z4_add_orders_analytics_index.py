@@ -0,0 +1,20 @@
+"""add composite index on orders for seller analytics
+
+Revision ID: u9v0w1x2y3z4
+Revises: t8u9v0w1x2y3
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'u9v0w1x2y3z4'
+down_revision = 't8u9v0w1x2y3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_course_status_created', 'orders', ['course_id', 'status', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_course_status_created', 'orders')
@@ -0,0 +1,40 @@
+"""add course_daily_stats rollup tables for seller analytics
+
+Revision ID: v0w1x2y3z4a5
+Revises: u9v0w1x2y3z4
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'v0w1x2y3z4a5'
+down_revision = 'u9v0w1x2y3z4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'course_daily_stats',
+        sa.Column('course_id', sa.String(), sa.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('purchases', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('new_students', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('blocks_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('active_learners', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_course_daily_stats_day', 'course_daily_stats', ['day'])
+    op.create_table(
+        'course_daily_learners',
+        sa.Column('course_id', sa.String(), sa.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    )
+    # Relleno inicial: python -m app.cli backfill-analytics
+
+
+def downgrade() -> None:
+    op.drop_table('course_daily_learners')
+    op.drop_index('ix_course_daily_stats_day', 'course_daily_stats')
+    op.drop_table('course_daily_stats')
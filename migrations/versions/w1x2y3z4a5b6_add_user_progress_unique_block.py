@@ -0,0 +1,31 @@
+"""unique completion per (user, course, block) in user_progress
+
+Revision ID: w1x2y3z4a5b6
+Revises: v0w1x2y3z4a5
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'w1x2y3z4a5b6'
+down_revision = 'v0w1x2y3z4a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Conserva la primera compleción de cada bloque antes de crear la restricción
+    op.execute("""
+        DELETE FROM user_progress p
+        USING user_progress q
+        WHERE p.user_id = q.user_id
+          AND p.course_id = q.course_id
+          AND p.module_id = q.module_id
+          AND (COALESCE(p.completed_at, 'epoch'), p.id) > (COALESCE(q.completed_at, 'epoch'), q.id)
+    """)
+    op.create_unique_constraint(
+        'uq_user_progress_block', 'user_progress', ['user_id', 'course_id', 'module_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_user_progress_block', 'user_progress', type_='unique')
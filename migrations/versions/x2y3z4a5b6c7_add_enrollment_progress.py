@@ -0,0 +1,55 @@
+"""add enrollment_progress counters and courses.total_blocks
+
+Revision ID: x2y3z4a5b6c7
+Revises: w1x2y3z4a5b6
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'x2y3z4a5b6c7'
+down_revision = 'w1x2y3z4a5b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'courses',
+        sa.Column('total_blocks', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute("""
+        UPDATE courses c SET total_blocks = b.total
+        FROM (
+            SELECT m.course_id, COUNT(cb.id) AS total
+            FROM course_modules m JOIN content_blocks cb ON cb.module_id = m.id
+            GROUP BY m.course_id
+        ) b
+        WHERE b.course_id = c.id
+    """)
+
+    op.create_table(
+        'enrollment_progress',
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('course_id', sa.String(), sa.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_block_id', sa.String(), nullable=True),
+        sa.Column('last_activity_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_enrollment_progress_course', 'enrollment_progress', ['course_id'])
+    # Relleno inicial desde user_progress (la compleción más reciente es la última)
+    op.execute("""
+        INSERT INTO enrollment_progress (user_id, course_id, completed_count, last_block_id, last_activity_at)
+        SELECT DISTINCT ON (user_id, course_id)
+            user_id, course_id,
+            COUNT(*) OVER (PARTITION BY user_id, course_id),
+            module_id, completed_at
+        FROM user_progress
+        ORDER BY user_id, course_id, completed_at DESC NULLS LAST, id DESC
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_enrollment_progress_course', 'enrollment_progress')
+    op.drop_table('enrollment_progress')
+    op.drop_column('courses', 'total_blocks')
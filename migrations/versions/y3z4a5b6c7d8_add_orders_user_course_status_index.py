@@ -0,0 +1,20 @@
+"""composite index on orders (user_id, course_id, status) for access checks
+
+Revision ID: y3z4a5b6c7d8
+Revises: x2y3z4a5b6c7
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'y3z4a5b6c7d8'
+down_revision = 'x2y3z4a5b6c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_user_course_status', 'orders', ['user_id', 'course_id', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_user_course_status', 'orders')
@@ -0,0 +1,43 @@
+"""keyset pagination columns NOT NULL (forum is_pinned, created_at)
+
+La comparación de tuplas del cursor no encuentra filas con NULL en las
+claves: se rellenan los NULL existentes y se prohíben.
+
+Revision ID: z4a5b6c7d8e9
+Revises: y3z4a5b6c7d8
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'z4a5b6c7d8e9'
+down_revision = 'y3z4a5b6c7d8'
+branch_labels = None
+depends_on = None
+
+# Tablas cuyo listado pagina por cursor sobre created_at (course_cards copia
+# el de courses, así que va después)
+CREATED_AT_TABLES = ['forum_threads', 'notifications', 'messages', 'course_announcements', 'courses']
+
+
+def upgrade() -> None:
+    op.execute("UPDATE forum_threads SET is_pinned = false WHERE is_pinned IS NULL")
+    op.alter_column('forum_threads', 'is_pinned', nullable=False, server_default=sa.false())
+
+    for table in CREATED_AT_TABLES:
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+        op.alter_column(table, 'created_at', nullable=False)
+
+    op.execute(
+        "UPDATE course_cards SET created_at = courses.created_at "
+        "FROM courses WHERE courses.id = course_cards.course_id AND course_cards.created_at IS NULL"
+    )
+    op.execute("UPDATE course_cards SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('course_cards', 'created_at', nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('course_cards', 'created_at', nullable=True)
+    for table in reversed(CREATED_AT_TABLES):
+        op.alter_column(table, 'created_at', nullable=True)
+    op.alter_column('forum_threads', 'is_pinned', nullable=True, server_default=None)